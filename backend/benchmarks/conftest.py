@@ -0,0 +1,39 @@
+"""
+Fixtures compartidas de los benchmarks.
+
+Ejecutar (no corren con la suite normal):
+    python -m pytest benchmarks -m benchmark --benchmark-json=benchmarks/resultados/<commit>.json
+Contra Postgres local: exportar DB_ENGINE=postgres y las variables DB_*.
+"""
+import os
+
+import pytest
+from rest_framework.test import APIClient
+
+from core.sintetico import poblar, nit_sintetico
+
+# Tamaño máximo de los reportes PDF (100k filas tarda minutos en ReportLab)
+BENCH_MAX_FILAS = int(os.environ.get('BENCH_MAX_FILAS', 10000))
+BENCH_PRODUCTOS = int(os.environ.get('BENCH_PRODUCTOS', 1000))
+
+
+def pytest_collection_modifyitems(config, items):
+    for item in items:
+        if 'benchmarks' in str(item.fspath):
+            item.add_marker(pytest.mark.benchmark)
+
+
+@pytest.fixture
+def catalogo(db):
+    """Una empresa con BENCH_PRODUCTOS productos. Retorna el NIT."""
+    poblar(empresas=1, productos_por_empresa=BENCH_PRODUCTOS, semilla=42)
+    return nit_sintetico(0)
+
+
+@pytest.fixture
+def admin_client(db):
+    from users.models import User
+    admin = User.objects.create_superuser(email="bench@litethinking.com", password="benchpass123")
+    client = APIClient()
+    client.force_authenticate(user=admin)
+    return client
@@ -0,0 +1,38 @@
+from core.models import ProductoModel
+
+
+def test_listar_empresas(benchmark, admin_client, catalogo):
+    response = benchmark(admin_client.get, '/api/empresas/')
+    assert response.status_code == 200
+
+
+def test_listar_productos(benchmark, admin_client, catalogo):
+    response = benchmark(admin_client.get, f'/api/productos/?empresa={catalogo}')
+    assert response.status_code == 200
+
+
+def test_obtener_producto(benchmark, admin_client, catalogo):
+    producto = ProductoModel.objects.filter(empresa_id=catalogo).first()
+    response = benchmark(admin_client.get, f'/api/productos/{producto.id}/')
+    assert response.status_code == 200
+
+
+def test_obtener_empresa(benchmark, admin_client, catalogo):
+    response = benchmark(admin_client.get, f'/api/empresas/{catalogo}/')
+    assert response.status_code == 200
+
+
+def test_actualizar_producto(benchmark, admin_client, catalogo):
+    producto = ProductoModel.objects.filter(empresa_id=catalogo).first()
+    payload = {
+        "codigo": producto.codigo, "nombre": "Actualizado", "caracteristicas": "bench",
+        "empresa": catalogo, "precios": {"COP": 5000}
+    }
+    response = benchmark(admin_client.put, f'/api/productos/{producto.id}/', payload, format='json')
+    assert response.status_code == 200
+
+
+def test_actualizar_empresa(benchmark, admin_client, catalogo):
+    payload = {"nombre": "Empresa Bench", "direccion": "Calle 2", "telefono": "3007654321"}
+    response = benchmark(admin_client.put, f'/api/empresas/{catalogo}/', payload, format='json')
+    assert response.status_code == 200
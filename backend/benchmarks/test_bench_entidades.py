@@ -0,0 +1,72 @@
+from decimal import Decimal
+
+from core_domain.entities.empresa import Empresa
+from core_domain.entities.producto import Producto
+from core_domain.dinero import TablaTasas
+from core_domain.validacion import validar_lote_empresas, validar_lote_productos
+
+LOTE = 1000
+
+
+def _registrar_throughput(benchmark, cantidad):
+    # Entidades por segundo a partir de la media medida (sin stats con --benchmark-disable)
+    if benchmark.stats:
+        benchmark.extra_info['entidades_por_segundo'] = round(cantidad / benchmark.stats.stats.mean)
+
+
+def test_construccion_empresa(benchmark):
+    def construir():
+        for i in range(LOTE):
+            Empresa(nit=f"900{i:06d}-1", nombre="Empresa", direccion="Calle 1", telefono="3001234567")
+    benchmark(construir)
+    _registrar_throughput(benchmark, LOTE)
+
+
+def test_construccion_producto(benchmark):
+    precios = {"COP": Decimal("100000"), "USD": Decimal("24.10")}
+
+    def construir():
+        for i in range(LOTE):
+            Producto(codigo=f"P-{i}", nombre="Producto", caracteristicas="-", empresa_nit="900000000-1", precios=precios)
+    benchmark(construir)
+    _registrar_throughput(benchmark, LOTE)
+
+
+def test_reconstruccion_desde_persistencia(benchmark):
+    precios = {"COP": 100000}
+
+    def construir():
+        for i in range(LOTE):
+            Producto.desde_persistencia(f"P-{i}", "Producto", "-", "900000000-1", precios, i)
+    benchmark(construir)
+    _registrar_throughput(benchmark, LOTE)
+
+
+def test_validacion_lote_empresas(benchmark):
+    filas = [
+        {"nit": f"900{i:06d}-1", "nombre": "Empresa", "direccion": "Calle 1",
+         "telefono": "3001234567" if i % 10 else "abc"}
+        for i in range(LOTE * 10)
+    ]
+    resultado = benchmark(validar_lote_empresas, filas)
+    assert len(resultado.errores) == LOTE
+    _registrar_throughput(benchmark, len(filas))
+
+
+def test_validacion_lote_productos(benchmark):
+    filas = [
+        {"codigo": f"P-{i}" if i % 10 else "P inválido", "nombre": "Producto",
+         "empresa_nit": "900000000-1", "precios": {"COP": 1000}}
+        for i in range(LOTE * 10)
+    ]
+    resultado = benchmark(validar_lote_productos, filas)
+    assert resultado.errores
+    _registrar_throughput(benchmark, len(filas))
+
+
+def test_conversion_catalogo(benchmark):
+    tabla = TablaTasas({"USD": 4150, "EUR": 4350})
+    catalogo = [{"COP": (i + 1) * 1000, "USD": round((i + 1) * 0.24, 2)} if i % 2 else {"EUR": 10.5} for i in range(LOTE * 10)]
+    precios = benchmark(tabla.convertir_catalogo, catalogo, "USD")
+    assert all(precios)
+    _registrar_throughput(benchmark, LOTE * 10)
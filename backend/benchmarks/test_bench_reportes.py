@@ -0,0 +1,31 @@
+import random
+from types import SimpleNamespace
+
+import pytest
+
+from core.reports import generar_pdf_inventario
+from core.sintetico import precios_sinteticos
+from .conftest import BENCH_MAX_FILAS
+
+INFO_EMPRESA = {'nombre': 'Bench S.A.S', 'nit': '900000000-1', 'direccion': 'Calle 1', 'telefono': '3001234567'}
+
+
+def productos_en_memoria(cantidad):
+    rng = random.Random(cantidad)
+    empresa = SimpleNamespace(nombre=INFO_EMPRESA['nombre'])
+    return [
+        SimpleNamespace(
+            codigo=f"BEN-{i:07d}", nombre=f"Producto {i}", caracteristicas="Garantía 12 meses, Importado",
+            precios=precios_sinteticos(rng), empresa=empresa,
+        )
+        for i in range(cantidad)
+    ]
+
+
+@pytest.mark.parametrize('filas', [1000, 10000, 100000])
+def test_generar_pdf_inventario(benchmark, filas):
+    if filas > BENCH_MAX_FILAS:
+        pytest.skip(f"{filas} filas > BENCH_MAX_FILAS={BENCH_MAX_FILAS}")
+    productos = productos_en_memoria(filas)
+    buffer = benchmark.pedantic(generar_pdf_inventario, args=(productos, INFO_EMPRESA), rounds=3, iterations=1)
+    assert buffer.getbuffer().nbytes > 0
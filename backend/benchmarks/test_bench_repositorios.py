@@ -0,0 +1,21 @@
+from core.adapters import DjangoProductoRepository
+from core_domain.entities.producto import Producto
+
+
+def test_list_by_empresa(benchmark, catalogo):
+    repo = DjangoProductoRepository()
+    resultado = benchmark(repo.list_by_empresa, catalogo)
+    assert len(resultado) > 0
+
+
+def test_save_producto(benchmark, catalogo):
+    repo = DjangoProductoRepository()
+    contador = iter(range(10 ** 9))
+
+    def guardar():
+        n = next(contador)
+        repo.save(Producto(
+            codigo=f"BENCH-{n}", nombre="Producto bench", caracteristicas="-",
+            empresa_nit=catalogo, precios={"COP": 1000}
+        ))
+    benchmark(guardar)
@@ -0,0 +1,49 @@
+"""
+Camino de lectura de listados: anterior (modelo -> entidad validada -> asdict ->
+ProductoSerializer -> JSONRenderer) vs. actual (values_list -> entidad confiable
+-> proyección -> ORJSONRenderer). Usar `--benchmark-group-by=param` o comparar
+por nombre.
+"""
+from dataclasses import asdict
+
+from rest_framework.renderers import JSONRenderer
+
+from core.adapters import DjangoProductoRepository
+from core.models import ProductoModel
+from core.renderers import ORJSONRenderer
+from core.proyecciones import producto_a_json
+from core.serializers import ProductoSerializer
+from core_domain.entities.producto import Producto
+
+
+def _camino_anterior(nit):
+    entidades = [
+        Producto(id=m.id, codigo=m.codigo, nombre=m.nombre, caracteristicas=m.caracteristicas,
+                 empresa_nit=m.empresa_id, precios=m.precios)
+        for m in ProductoModel.objects.filter(empresa_id=nit)
+    ]
+    data = [asdict(p) for p in entidades]
+    return JSONRenderer().render(ProductoSerializer(data, many=True).data)
+
+
+def _camino_rapido(nit):
+    entidades = DjangoProductoRepository().list_by_empresa(nit)
+    return ORJSONRenderer().render([producto_a_json(p) for p in entidades])
+
+
+def test_listado_camino_anterior(benchmark, catalogo):
+    assert benchmark(_camino_anterior, catalogo)
+
+
+def test_listado_camino_rapido(benchmark, catalogo):
+    assert benchmark(_camino_rapido, catalogo)
+
+
+def test_solo_serializacion_anterior(benchmark, catalogo):
+    entidades = DjangoProductoRepository().list_by_empresa(catalogo)
+    benchmark(lambda: JSONRenderer().render(ProductoSerializer([asdict(p) for p in entidades], many=True).data))
+
+
+def test_solo_serializacion_rapida(benchmark, catalogo):
+    entidades = DjangoProductoRepository().list_by_empresa(catalogo)
+    benchmark(lambda: ORJSONRenderer().render([producto_a_json(p) for p in entidades]))
@@ -1,6 +1,8 @@
+from importlib.util import find_spec
 from pathlib import Path
-from decouple import config 
+from decouple import config, Csv
 from datetime import timedelta
+from corsheaders.defaults import default_headers
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -28,17 +30,33 @@ INSTALLED_APPS = [
     "core",
     'corsheaders',
     'drf_spectacular',
-    
+    'rest_framework_simplejwt.token_blacklist',
 ]
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'users.authentication.CachedJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticatedOrReadOnly',
     ],
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
+    # orjson si está instalado; si no, los de DRF (ver core/renderers.py)
+    'DEFAULT_RENDERER_CLASSES': [
+        'core.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'core.renderers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+    # Límites por IP para los endpoints de credenciales (ver users/throttles.py)
+    'DEFAULT_THROTTLE_RATES': {
+        'login': config('THROTTLE_LOGIN', default='10/min'),
+        'registro': config('THROTTLE_REGISTRO', default='20/hour'),
+        'refresh': config('THROTTLE_REFRESH', default='30/min'),
+    },
 }
 
 SIMPLE_JWT = {
@@ -58,6 +76,9 @@ SPECTACULAR_SETTINGS = {
 }
 
 MIDDLEWARE = [
+    'core.middleware.MetricasMiddleware',
+    'core.middleware.ReplicaMiddleware',
+    'core.middleware.CompresionMiddleware',
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -66,6 +87,8 @@ MIDDLEWARE = [
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
     'corsheaders.middleware.CorsMiddleware',
+    'core.middleware.DeadlineMiddleware',
+    'core.middleware.PerfiladoMiddleware',
 ]
 
 ROOT_URLCONF = "config.urls"
@@ -93,16 +116,39 @@ WSGI_APPLICATION = "config.wsgi.application"
 DB_ENGINE = config('DB_ENGINE', default='sqlite')
 
 if DB_ENGINE == 'postgres':
+    # Gestión de conexiones (ver estado en /api/system/readiness/):
+    # - Por defecto: conexiones persistentes (DB_CONN_MAX_AGE) con health check.
+    # - DB_POOL_MAX > 0: pool nativo de Django 5 con psycopg 3 (excluye CONN_MAX_AGE).
+    # - DB_PGBOUNCER: se conecta a un pgbouncer local en modo transaction.
+    DB_PGBOUNCER = config('DB_PGBOUNCER', default=False, cast=bool)
+    DB_POOL_MIN = config('DB_POOL_MIN', default=2, cast=int)
+    DB_POOL_MAX = config('DB_POOL_MAX', default=0, cast=int)
+
     DATABASES = {
         'default': {
             'ENGINE': 'django.db.backends.postgresql',
             'NAME': config('DB_NAME'),
             'USER': config('DB_USER'),
             'PASSWORD': config('DB_PASSWORD'),
-            'HOST': config('DB_HOST'),
-            'PORT': config('DB_PORT'),
+            'HOST': config('PGBOUNCER_HOST', default='127.0.0.1') if DB_PGBOUNCER else config('DB_HOST'),
+            'PORT': config('PGBOUNCER_PORT', default='6432') if DB_PGBOUNCER else config('DB_PORT'),
+            'CONN_MAX_AGE': config('DB_CONN_MAX_AGE', default=60, cast=int),
+            'CONN_HEALTH_CHECKS': config('DB_CONN_HEALTH_CHECKS', default=True, cast=bool),
+            'OPTIONS': {
+                'connect_timeout': config('DB_CONNECT_TIMEOUT', default=5, cast=int),
+            },
         }
     }
+    if DB_PGBOUNCER:
+        # En modo transaction los cursores del lado servidor no sobreviven entre transacciones
+        DATABASES['default']['DISABLE_SERVER_SIDE_CURSORS'] = True
+    elif DB_POOL_MAX > 0:
+        DATABASES['default']['CONN_MAX_AGE'] = 0
+        DATABASES['default']['OPTIONS']['pool'] = {
+            'min_size': min(DB_POOL_MIN, DB_POOL_MAX),
+            'max_size': DB_POOL_MAX,
+            'timeout': config('DB_POOL_TIMEOUT', default=10, cast=int),
+        }
 else:
     DATABASES = {
         'default': {
@@ -111,10 +157,47 @@ else:
         }
     }
 
+# Réplicas de solo lectura (core/replicas.py). En Postgres cada entrada es
+# "host" o "host:puerto"; en SQLite es la ruta del archivo (útil para probar en local).
+DB_REPLICA_HOSTS = config('DB_REPLICA_HOSTS', default='', cast=Csv())
+for _i, _replica in enumerate(DB_REPLICA_HOSTS):
+    _ajustes = {**DATABASES['default'], 'TEST': {'MIRROR': 'default'}}
+    if DB_ENGINE == 'postgres':
+        _host, _, _puerto = _replica.partition(':')
+        _ajustes.update(HOST=_host, PORT=_puerto or _ajustes['PORT'], OPTIONS=dict(_ajustes['OPTIONS']))
+        # El pool nativo se crea por alias; el modo pgbouncer no aplica a réplicas
+        _ajustes.pop('DISABLE_SERVER_SIDE_CURSORS', None)
+    else:
+        _ajustes['NAME'] = _replica
+    DATABASES[f'replica_{_i}'] = _ajustes
+
+DATABASE_ROUTERS = ['core.replicas.ReplicaRouter']
+
+
+# Caché: LocMem por proceso por defecto; en producción con varios workers
+# conviene un backend compartido (ej: django.core.cache.backends.redis.RedisCache).
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default='litethinking'),
+    }
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
 
+# Hashers con concurrencia acotada (users/hashers.py). El primero es el preferido:
+# los hashes con otro algoritmo se re-generan de forma transparente en el siguiente login.
+_HASHERS = {
+    'argon2': 'users.hashers.Argon2AcotadoHasher',
+    'pbkdf2': 'users.hashers.PBKDF2AcotadoHasher',
+}
+PASSWORD_HASHER = config('PASSWORD_HASHER', default='argon2' if find_spec('argon2') else 'pbkdf2')
+if PASSWORD_HASHER == 'argon2' and not find_spec('argon2'):
+    PASSWORD_HASHER = 'pbkdf2'
+PASSWORD_HASHERS = [_HASHERS[PASSWORD_HASHER]] + [h for k, h in _HASHERS.items() if k != PASSWORD_HASHER]
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         "NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator",
@@ -149,6 +232,10 @@ USE_TZ = True
 STATIC_URL = "static/"
 STATIC_ROOT = BASE_DIR / "staticfiles"
 
+# Uploads (audio de voz): por encima de este tamaño Django escribe a disco en
+# vez de mantener el archivo en memoria; el pipeline de voz lo envía por stream.
+FILE_UPLOAD_MAX_MEMORY_SIZE = config('FILE_UPLOAD_MAX_MEMORY_SIZE', default=512 * 1024, cast=int)
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/6.0/ref/settings/#default-auto-field
 
@@ -163,6 +250,9 @@ CORS_ALLOWED_ORIGINS = [
     "http://localhost:4173",  
     "http://127.0.0.1:4173",
 ]
+# Concurrencia optimista: el frontend lee el ETag y lo reenvía en If-Match
+CORS_ALLOW_HEADERS = (*default_headers, 'if-match')
+CORS_EXPOSE_HEADERS = ['ETag']
 
 CSRF_TRUSTED_ORIGINS = [
     "https://litethinking.nicklcs.dev",
@@ -0,0 +1,10 @@
+import pytest
+from django.core.cache import cache
+
+
+@pytest.fixture(autouse=True)
+def limpiar_cache():
+    """La caché LocMem sobrevive al rollback de cada test; se limpia para aislarlos."""
+    cache.clear()
+    yield
+    cache.clear()
@@ -1,24 +1,63 @@
-from typing import List, Optional
+from decimal import Decimal
+from typing import Any, Dict, Iterator, List, Optional
+
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from core_domain.dinero import ReglaPrecio, TablaTasas
+from core_domain.entities.cambio import (
+    Cambio, ENTIDAD_EMPRESA, ENTIDAD_PRODUCTO, OPERACION_ACTUALIZAR, OPERACION_CREAR, OPERACION_ELIMINAR,
+)
 from core_domain.entities.empresa import Empresa as EmpresaEntity
 from core_domain.entities.producto import Producto as ProductoEntity
-from core_domain.ports.repositories import EmpresaRepository, ProductoRepository
+from core_domain.entities.valoracion import Valoracion
+from core_domain.exceptions import BusinessRuleError, ConflictError
+from core_domain.ports.repositories import (
+    CambioRepository, EmpresaRepository, FiltroProductos, ProductoRepository, TasaCambioRepository,
+    ValoracionRepository,
+)
+from core_domain.validacion import CAMPOS_PRODUCTO
+
+from .cambios import cambios_desde, registrar_cambio
+from .estadisticas import estadisticas_empresas
 from .models import EmpresaModel, ProductoModel
+from .precios import actualizar_precios
+from .proyecciones import empresa_a_json, producto_a_json
+from .purga import programar_purga
+from .replicas import lectura_en_replica
+from .signals import producto_actualizado
+from .tasas import guardar_tasa, tabla_tasas
+from .valoracion import historial_valoracion, valoracion_empresa
 
 # =========================================================
 # ADAPTADOR EMPRESA (Repositorio)
 # =========================================================
 class DjangoEmpresaRepository(EmpresaRepository):
-    def save(self, empresa: EmpresaEntity) -> EmpresaEntity:
-        obj, created = EmpresaModel.objects.update_or_create(
-            nit=empresa.nit,
-            defaults={
-                'nombre': empresa.nombre,
-                'direccion': empresa.direccion,
-                'telefono': empresa.telefono
-            }
-        )
-        return self._to_entity(obj)
+    def save(self, empresa: EmpresaEntity, version: Optional[int] = None) -> EmpresaEntity:
+        if EmpresaModel.todas.filter(nit=empresa.nit, eliminado__isnull=False).exists():
+            raise BusinessRuleError(f"La empresa {empresa.nit} fue eliminada y se está purgando. Intente más tarde.")
+        campos = {'nombre': empresa.nombre, 'direccion': empresa.direccion, 'telefono': empresa.telefono}
+        with transaction.atomic():
+            # Un solo UPDATE condicional: sin bloqueos, el que llegue con una versión vieja no actualiza nada
+            qs = EmpresaModel.objects.filter(nit=empresa.nit)
+            if version is not None:
+                qs = qs.filter(version=version)
+            created = False
+            if qs.update(**campos, version=F('version') + 1):
+                nueva = version + 1 if version is not None else qs.values_list('version', flat=True).get()
+            elif version is not None:
+                raise ConflictError(
+                    f"La empresa {empresa.nit} fue modificada por otro usuario (versión {version} desactualizada)"
+                )
+            else:
+                nueva, created = EmpresaModel.objects.create(nit=empresa.nit, **campos).version, True
+            entidad = EmpresaEntity.desde_persistencia(empresa.nit, **campos, version=nueva)
+            registrar_cambio(ENTIDAD_EMPRESA, entidad.nit, OPERACION_CREAR if created else OPERACION_ACTUALIZAR,
+                             empresa_a_json(entidad))
+        return entidad
 
+    @lectura_en_replica
     def get_by_nit(self, nit: str) -> Optional[EmpresaEntity]:
         try:
             obj = EmpresaModel.objects.get(nit=nit)
@@ -26,40 +65,131 @@ class DjangoEmpresaRepository(EmpresaRepository):
         except EmpresaModel.DoesNotExist:
             return None
 
+    @lectura_en_replica
     def list_all(self) -> List[EmpresaEntity]:
-        qs = EmpresaModel.objects.all()
-        return [self._to_entity(obj) for obj in qs]
+        return self._entidades(EmpresaModel.objects.all())
+
+    @lectura_en_replica
+    def get_many_by_nits(self, nits: List[str]) -> List[EmpresaEntity]:
+        pedidos = list(dict.fromkeys(nits))
+        if not pedidos:
+            return []
+        por_nit = {e.nit: e for e in self._entidades(EmpresaModel.objects.filter(nit__in=pedidos))}
+        return [por_nit[nit] for nit in pedidos if nit in por_nit]
 
     def delete(self, nit: str) -> None:
-        EmpresaModel.objects.filter(nit=nit).delete()
+        # Borrado lógico: los productos se purgan en segundo plano (ver core/purga.py)
+        with transaction.atomic():
+            marcadas = EmpresaModel.objects.filter(nit=nit).update(eliminado=timezone.now())
+            if marcadas:
+                registrar_cambio(ENTIDAD_EMPRESA, nit, OPERACION_ELIMINAR)
+                programar_purga()
 
     def _to_entity(self, model: EmpresaModel) -> EmpresaEntity:
-        return EmpresaEntity(
+        return EmpresaEntity.desde_persistencia(
             nit=model.nit,
             nombre=model.nombre,
             direccion=model.direccion,
-            telefono=model.telefono
+            telefono=model.telefono,
+            version=model.version
         )
 
+    def _entidades(self, qs) -> List[EmpresaEntity]:
+        # Proyección directa a entidades: sin instanciar modelos ni revalidar
+        return [
+            EmpresaEntity.desde_persistencia(*fila)
+            for fila in qs.values_list('nit', 'nombre', 'direccion', 'telefono', 'version')
+        ]
+
 # =========================================================
 # ADAPTADOR PRODUCTO (Repositorio)
 # =========================================================
 class DjangoProductoRepository(ProductoRepository):
-    def save(self, producto: ProductoEntity) -> ProductoEntity:
+    # Columnas en el orden de ProductoEntity.desde_persistencia
+    _CAMPOS = ('codigo', 'nombre', 'caracteristicas', 'empresa_id', 'precios', 'id', 'version')
+    # Campo de la entidad -> columna
+    _COLUMNAS = {'empresa_nit': 'empresa_id'}
+
+    def save(self, producto: ProductoEntity, version: Optional[int] = None) -> ProductoEntity:
         if not EmpresaModel.objects.filter(nit=producto.empresa_nit).exists():
             raise ValueError(f"Empresa {producto.empresa_nit} no encontrada.")
 
-        obj, created = ProductoModel.objects.update_or_create(
-            codigo=producto.codigo,
-            defaults={
-                'nombre': producto.nombre,
-                'caracteristicas': producto.caracteristicas,
-                'empresa_id': producto.empresa_nit,
-                'precios': producto.precios
-            }
-        )
-        return self._to_entity(obj)
+        campos = {
+            'nombre': producto.nombre,
+            'caracteristicas': producto.caracteristicas,
+            'empresa_id': producto.empresa_nit,
+            'precios': producto.precios,
+        }
+        with transaction.atomic():
+            # `todos`: el código puede seguir ocupado por un producto de una empresa en purga
+            anterior = (ProductoModel.todos.filter(codigo=producto.codigo)
+                        .values_list('id', 'empresa_id', 'precios', 'version', 'empresa__eliminado').first())
+            if anterior is not None and anterior[4] is not None:
+                raise BusinessRuleError(
+                    f"El código {producto.codigo} pertenece a una empresa eliminada que se está purgando. "
+                    f"Intente más tarde."
+                )
+            if anterior is None:
+                if version is not None:
+                    raise ConflictError(f"El producto {producto.codigo} fue eliminado por otro usuario")
+                entidad = self._to_entity(ProductoModel.objects.create(codigo=producto.codigo, **campos))
+                registrar_cambio(ENTIDAD_PRODUCTO, entidad.id, OPERACION_CREAR, producto_a_json(entidad))
+                return entidad
 
+            # UPDATE ... WHERE version = <esperada>: la del cliente (If-Match) o la recién leída,
+            # así el delta de la valoración se calcula sobre los precios que realmente se reemplazan
+            pk, empresa_anterior, precios_anteriores, leida, _eliminado = anterior
+            esperada = leida if version is None else version
+            if not ProductoModel.objects.filter(pk=pk, version=esperada).update(**campos, version=F('version') + 1):
+                raise ConflictError(
+                    f"El producto {producto.codigo} fue modificado por otro usuario (versión {esperada} desactualizada)"
+                )
+            # queryset.update() no envía signals
+            producto_actualizado(producto.empresa_nit, producto.precios, empresa_anterior, precios_anteriores)
+            entidad = ProductoEntity.desde_persistencia(
+                producto.codigo, producto.nombre, producto.caracteristicas, producto.empresa_nit, producto.precios,
+                id=pk, version=esperada + 1,
+            )
+            registrar_cambio(ENTIDAD_PRODUCTO, entidad.id, OPERACION_ACTUALIZAR, producto_a_json(entidad))
+        return entidad
+
+    def update(self, id_producto: int, cambios: Dict[str, Any], version: Optional[int] = None) -> Optional[ProductoEntity]:
+        if 'empresa_nit' in cambios and not EmpresaModel.objects.filter(nit=cambios['empresa_nit']).exists():
+            raise ValueError(f"Empresa {cambios['empresa_nit']} no encontrada.")
+        try:
+            with transaction.atomic():
+                # Una lectura (existencia, versión y precios para el delta) y un solo UPDATE por id
+                fila = ProductoModel.objects.filter(pk=id_producto).values_list(*self._CAMPOS).first()
+                if fila is None:
+                    return None
+                actual = ProductoEntity.desde_persistencia(*fila)
+                esperada = actual.version if version is None else version
+                conflicto = ConflictError(
+                    f"El producto {id_producto} fue modificado por otro usuario (versión {esperada} desactualizada)"
+                )
+                if esperada != actual.version:
+                    raise conflicto
+                # PATCH: solo se escriben las columnas que cambian
+                cambiados = {campo: valor for campo, valor in cambios.items() if getattr(actual, campo) != valor}
+                if not cambiados:
+                    return actual
+                columnas = {self._COLUMNAS.get(campo, campo): valor for campo, valor in cambiados.items()}
+                if not ProductoModel.objects.filter(pk=id_producto, version=esperada).update(
+                        **columnas, version=F('version') + 1):
+                    raise conflicto
+
+                datos = {campo: getattr(actual, campo) for campo in CAMPOS_PRODUCTO}
+                datos.update(cambiados)
+                nuevo = ProductoEntity.desde_persistencia(**datos, id=actual.id, version=esperada + 1)
+                if 'precios' in cambiados or 'empresa_nit' in cambiados:
+                    # queryset.update() no envía signals
+                    producto_actualizado(nuevo.empresa_nit, nuevo.precios, actual.empresa_nit, actual.precios)
+                registrar_cambio(ENTIDAD_PRODUCTO, nuevo.id, OPERACION_ACTUALIZAR, producto_a_json(nuevo))
+        except IntegrityError:
+            raise BusinessRuleError(f"Ya existe un producto con el código {cambios.get('codigo')}")
+        return nuevo
+
+    @lectura_en_replica
     def get_by_codigo(self, codigo: str) -> Optional[ProductoEntity]:
         try:
             obj = ProductoModel.objects.get(codigo=codigo)
@@ -67,6 +197,7 @@ class DjangoProductoRepository(ProductoRepository):
         except ProductoModel.DoesNotExist:
             return None
 
+    @lectura_en_replica
     def get_by_id(self, id_producto: int) -> Optional[ProductoEntity]:
         try:
             obj = ProductoModel.objects.get(id=id_producto)
@@ -74,19 +205,87 @@ class DjangoProductoRepository(ProductoRepository):
         except ProductoModel.DoesNotExist:
             return None
 
+    @lectura_en_replica
+    def get_many_by_ids(self, ids: List[int]) -> List[ProductoEntity]:
+        pedidos = list(dict.fromkeys(int(i) for i in ids))
+        if not pedidos:
+            return []
+        por_id = {p.id: p for p in self._entidades(ProductoModel.objects.filter(id__in=pedidos))}
+        return [por_id[i] for i in pedidos if i in por_id]
+
+    @lectura_en_replica
+    def get_many_by_codigos(self, codigos: List[str]) -> List[ProductoEntity]:
+        pedidos = list(dict.fromkeys(codigos))
+        if not pedidos:
+            return []
+        return self._entidades(ProductoModel.objects.filter(codigo__in=pedidos))
+
+    @lectura_en_replica
     def list_by_empresa(self, nit_empresa: str) -> List[ProductoEntity]:
-        qs = ProductoModel.objects.filter(empresa_id=nit_empresa)
-        return [self._to_entity(obj) for obj in qs]
+        return self._entidades(ProductoModel.objects.filter(empresa_id=nit_empresa))
+
+    @lectura_en_replica
+    def list_by_empresas(self, nits_empresas: List[str]) -> List[ProductoEntity]:
+        pedidos = list(dict.fromkeys(nits_empresas))
+        if not pedidos:
+            return []
+        return self._entidades(ProductoModel.objects.filter(empresa_id__in=pedidos).order_by('empresa_id', 'id'))
+
+    @lectura_en_replica
+    def stats_by_empresas(self, nits_empresas: List[str]) -> Dict[str, dict]:
+        return estadisticas_empresas(nits_empresas)
+
+    def update_prices(self, filtro: FiltroProductos, regla: ReglaPrecio, tabla: TablaTasas) -> int:
+        return actualizar_precios(filtro, regla, tabla)
 
     def delete(self, id_producto: int) -> None:
-        ProductoModel.objects.filter(id=id_producto).delete()
+        with transaction.atomic():
+            borrados, _ = ProductoModel.objects.filter(id=id_producto).delete()
+            if borrados:
+                registrar_cambio(ENTIDAD_PRODUCTO, id_producto, OPERACION_ELIMINAR)
 
     def _to_entity(self, model: ProductoModel) -> ProductoEntity:
-        return ProductoEntity(
-            id=model.id, 
+        return ProductoEntity.desde_persistencia(
+            id=model.id,
             codigo=model.codigo,
             nombre=model.nombre,
             caracteristicas=model.caracteristicas,
             empresa_nit=model.empresa_id,
-            precios=model.precios
-        )
\ No newline at end of file
+            precios=model.precios,
+            version=model.version
+        )
+
+    def _entidades(self, qs) -> List[ProductoEntity]:
+        # Proyección directa a entidades: sin instanciar modelos ni revalidar
+        return [ProductoEntity.desde_persistencia(*fila) for fila in qs.values_list(*self._CAMPOS)]
+
+# =========================================================
+# ADAPTADOR TASAS DE CAMBIO (Repositorio)
+# =========================================================
+class DjangoTasaCambioRepository(TasaCambioRepository):
+    @lectura_en_replica
+    def get_tabla(self) -> TablaTasas:
+        return tabla_tasas()
+
+    def save(self, moneda: str, tasa: Decimal) -> TablaTasas:
+        return guardar_tasa(moneda, tasa)
+
+# =========================================================
+# ADAPTADOR VALORACIONES (Repositorio)
+# =========================================================
+class DjangoValoracionRepository(ValoracionRepository):
+    @lectura_en_replica
+    def get_by_nit(self, nit: str) -> Optional[Valoracion]:
+        return valoracion_empresa(nit)
+
+    @lectura_en_replica
+    def historial(self, nit: str, dias: int) -> List[Valoracion]:
+        return historial_valoracion(nit, dias)
+
+# =========================================================
+# ADAPTADOR REGISTRO DE CAMBIOS (Repositorio)
+# =========================================================
+class DjangoCambioRepository(CambioRepository):
+    def list_since(self, cursor: int, limite: int) -> Iterator[Cambio]:
+        # Iterador perezoso para el streaming: se consume fuera de @lectura_en_replica, así que lee del primario
+        return (Cambio(*fila) for fila in cambios_desde(cursor, limite))
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import EmpresaModel, ProductoModel
+from .models import EmpresaModel, ProductoModel, TasaCambioModel
 
 @admin.register(EmpresaModel)
 class EmpresaAdmin(admin.ModelAdmin):
@@ -10,4 +10,8 @@ class EmpresaAdmin(admin.ModelAdmin):
 class ProductoAdmin(admin.ModelAdmin):
     list_display = ('codigo', 'nombre', 'empresa')
     list_filter = ('empresa',)
-    search_fields = ('nombre', 'codigo')
\ No newline at end of file
+    search_fields = ('nombre', 'codigo')
+
+@admin.register(TasaCambioModel)
+class TasaCambioAdmin(admin.ModelAdmin):
+    list_display = ('moneda', 'tasa', 'actualizado')
@@ -0,0 +1,64 @@
+"""
+Registro de cambios (outbox) para sincronización incremental.
+
+Los repositorios insertan un evento en `cambios` dentro de la misma
+transacción que la escritura: si la escritura se revierte, el evento también.
+Los consumidores leen `GET /api/cambios/?since=<cursor>` y guardan el último
+id recibido como próximo cursor.
+
+Los ids se asignan al insertar, no al confirmar: una transacción lenta puede
+confirmar un id menor después de que otro mayor ya se entregó. Por eso el
+cursor no es el id sino `publicado`, que se asigna después de confirmar: al
+leer, publicar_pendientes numera en orden de id los eventos ya visibles que aún
+no tienen cursor, con la fila de `cambios_publicacion` bloqueada. Un evento que
+confirma tarde recibe un cursor mayor que todos los ya entregados, así que el
+consumidor lo recibe en su siguiente página.
+
+Los productos de una empresa eliminada no generan eventos propios: el evento
+'eliminar' de la empresa implica los de sus productos. Las cargas con
+bulk_create (seed_db) tampoco generan eventos; las actualizaciones masivas de
+precios (core/precios.py) sí, insertados por lote con registrar_cambios.
+"""
+from django.db import transaction
+
+from .models import CambioModel, PublicacionCambiosModel
+
+
+def registrar_cambio(entidad, clave, operacion, datos=None):
+    """Inserta un evento; llamar dentro de la transacción de la escritura."""
+    CambioModel.objects.create(entidad=entidad, clave=str(clave), operacion=operacion, datos=datos)
+
+
+def registrar_cambios(eventos):
+    """Inserta varios eventos (entidad, clave, operacion, datos) en una sola consulta."""
+    CambioModel.objects.bulk_create([
+        CambioModel(entidad=entidad, clave=str(clave), operacion=operacion, datos=datos)
+        for entidad, clave, operacion, datos in eventos
+    ])
+
+
+def publicar_pendientes(limite):
+    """Asigna cursor a hasta `limite` eventos confirmados sin publicar, en orden de id."""
+    pendientes = CambioModel.objects.filter(publicado__isnull=True)
+    if not pendientes.exists():
+        return 0
+    with transaction.atomic():
+        # Un publicador a la vez: el siguiente espera y ve los cursores ya confirmados
+        contador, _ = PublicacionCambiosModel.objects.select_for_update().get_or_create(id=1)
+        ids = list(pendientes.order_by('id').values_list('id', flat=True)[:limite])
+        if not ids:
+            return 0
+        CambioModel.objects.bulk_update(
+            [CambioModel(id=pk, publicado=contador.ultimo + i) for i, pk in enumerate(ids, 1)],
+            ['publicado'], batch_size=1000,
+        )
+        contador.ultimo += len(ids)
+        contador.save(update_fields=['ultimo'])
+    return len(ids)
+
+
+def cambios_desde(cursor, limite):
+    """Filas (cursor, entidad, clave, operacion, datos, fecha) con cursor > `cursor`, en orden."""
+    publicar_pendientes(limite)
+    qs = CambioModel.objects.filter(publicado__gt=cursor).order_by('publicado')[:limite]
+    return qs.values_list('publicado', 'entidad', 'clave', 'operacion', 'datos', 'fecha').iterator(chunk_size=1000)
@@ -1,5 +1,8 @@
 from decouple import config
-from .adapters import DjangoEmpresaRepository, DjangoProductoRepository
+from .adapters import (
+    DjangoEmpresaRepository, DjangoProductoRepository, DjangoTasaCambioRepository, DjangoValoracionRepository,
+    DjangoCambioRepository,
+)
 
 # =============================================================================
 # --- INYECTORES DE PRODUCCIÓN  ---
@@ -18,6 +21,24 @@ def get_producto_repository():
     """
     return DjangoProductoRepository()
 
+def get_tasa_cambio_repository():
+    """
+    Retorna el repositorio de tasas de cambio (tabla en memoria, ver core/tasas.py).
+    """
+    return DjangoTasaCambioRepository()
+
+def get_valoracion_repository():
+    """
+    Retorna el repositorio de valoraciones de inventario precalculadas.
+    """
+    return DjangoValoracionRepository()
+
+def get_cambio_repository():
+    """
+    Retorna el repositorio del registro de cambios (outbox).
+    """
+    return DjangoCambioRepository()
+
 
 
 
@@ -0,0 +1,102 @@
+"""
+Estadísticas de productos por empresa (conteo y total/min/max por moneda).
+
+Se calculan en una sola consulta agrupada extrayendo cada moneda del JSON de
+precios. Con EMPRESA_STATS_MATERIALIZADAS=True se guardan en la tabla
+`empresas_resumen`, que se refresca en cada escritura de productos.
+
+El resumen se lee donde toque (réplica o primario), pero siempre se calcula y
+se escribe en el primario: una réplica atrasada no debe quedar congelada en la
+tabla, y el llenado no cuenta como escritura del cliente (no lo fija al primario).
+"""
+from decimal import Decimal
+
+from decouple import config, Csv
+from django.db import transaction
+from django.db.models import Count, DecimalField, Max, Min, Sum
+from django.db.models.fields.json import KT
+from django.db.models.functions import Cast
+
+from .models import EmpresaResumenModel, ProductoModel
+from .replicas import PRIMARIO
+
+MONEDAS_ESTADISTICAS = config('MONEDAS_ESTADISTICAS', default='COP,USD,EUR', cast=Csv())
+EMPRESA_STATS_MATERIALIZADAS = config('EMPRESA_STATS_MATERIALIZADAS', default=False, cast=bool)
+
+
+def _anotaciones():
+    anotaciones = {'productos': Count('id')}
+    for moneda in MONEDAS_ESTADISTICAS:
+        valor = Cast(KT(f'precios__{moneda}'), DecimalField(max_digits=20, decimal_places=2))
+        anotaciones[f'{moneda}_productos'] = Count(valor)
+        anotaciones[f'{moneda}_total'] = Sum(valor)
+        anotaciones[f'{moneda}_min'] = Min(valor)
+        anotaciones[f'{moneda}_max'] = Max(valor)
+    return anotaciones
+
+
+def _a_json(valor):
+    # Decimal -> int/float para poder guardarlo en el JSONField del resumen
+    if isinstance(valor, Decimal):
+        return int(valor) if valor == valor.to_integral_value() else float(valor)
+    return valor
+
+
+def estadisticas_vacias():
+    return {'productos': 0, 'precios': {}}
+
+
+def calcular_estadisticas(nits=None, using=None):
+    """Retorna {nit: {'productos': n, 'precios': {moneda: {...}}}} en una consulta."""
+    qs = ProductoModel.objects.using(using) if using else ProductoModel.objects.all()
+    if nits is not None:
+        qs = qs.filter(empresa_id__in=list(nits))
+    filas = qs.order_by().values('empresa_id').annotate(**_anotaciones())
+
+    resultado = {}
+    for fila in filas:
+        precios = {}
+        for moneda in MONEDAS_ESTADISTICAS:
+            if fila[f'{moneda}_productos']:
+                precios[moneda] = {
+                    campo: _a_json(fila[f'{moneda}_{campo}'])
+                    for campo in ('productos', 'total', 'min', 'max')
+                }
+        resultado[fila['empresa_id']] = {'productos': fila['productos'], 'precios': precios}
+    return resultado
+
+
+def refrescar_resumen(nits):
+    """Recalcula y guarda el resumen de las empresas indicadas."""
+    nits = list(nits)
+    calculadas = calcular_estadisticas(nits, using=PRIMARIO)
+    filas = [
+        EmpresaResumenModel(empresa_id=nit, **calculadas.get(nit, estadisticas_vacias()))
+        for nit in nits
+    ]
+    EmpresaResumenModel.objects.using(PRIMARIO).bulk_create(
+        filas, update_conflicts=True, unique_fields=['empresa'], update_fields=['productos', 'precios', 'actualizado'],
+    )
+    return calculadas
+
+
+def programar_refresco(nit):
+    """Refresca el resumen de `nit` cuando se confirme la transacción en curso."""
+    transaction.on_commit(lambda: refrescar_resumen([nit]))
+
+
+def estadisticas_empresas(nits):
+    """Estadísticas para `nits`, desde el resumen o calculadas al vuelo."""
+    nits = list(nits)
+    if not EMPRESA_STATS_MATERIALIZADAS:
+        return calcular_estadisticas(nits)
+
+    resultado = {
+        r.empresa_id: {'productos': r.productos, 'precios': r.precios}
+        for r in EmpresaResumenModel.objects.filter(empresa_id__in=nits)
+    }
+    faltantes = [nit for nit in nits if nit not in resultado]
+    if faltantes:
+        # Empresas sin resumen (ej: cargadas con bulk_create): se llenan ahora
+        resultado.update(refrescar_resumen(faltantes))
+    return resultado
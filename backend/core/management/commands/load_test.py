@@ -0,0 +1,181 @@
+import asyncio
+import json
+import math
+import random
+import time
+from datetime import datetime
+from pathlib import Path
+
+import httpx
+from django.core.management.base import BaseCommand, CommandError
+
+# Mezcla por defecto (pesos relativos) inspirada en el uso real del dashboard
+MEZCLA_POR_DEFECTO = "empresas=25,productos=30,producto=20,actualizar=10,reporte=5,chat=10"
+OPERACIONES = ('empresas', 'productos', 'producto', 'actualizar', 'reporte', 'chat')
+
+
+def parsear_mezcla(texto):
+    mezcla = {}
+    for parte in texto.split(','):
+        nombre, _, peso = parte.partition('=')
+        nombre = nombre.strip()
+        if nombre not in OPERACIONES:
+            raise CommandError(f"Operación desconocida en --mix: {nombre}")
+        try:
+            mezcla[nombre] = float(peso)
+        except ValueError:
+            raise CommandError(f"Peso inválido para {nombre}: {peso}")
+    if not any(mezcla.values()):
+        raise CommandError("La mezcla debe tener al menos un peso mayor a cero.")
+    return mezcla
+
+
+def percentil(valores_ordenados, p):
+    """Percentil por rango más cercano sobre una lista ya ordenada."""
+    if not valores_ordenados:
+        return 0.0
+    indice = max(0, min(len(valores_ordenados) - 1, math.ceil(p / 100 * len(valores_ordenados)) - 1))
+    return valores_ordenados[indice]
+
+
+def resumir(muestras, duracion):
+    """
+    muestras: lista de (operacion, latencia_s, ok).
+    Retorna métricas globales y por operación.
+    """
+    def bloque(items):
+        latencias = sorted(lat for _, lat, _ in items)
+        errores = sum(1 for _, _, ok in items if not ok)
+        total = len(items)
+        return {
+            'requests': total,
+            'errores': errores,
+            'tasa_error': round(errores / total, 4) if total else 0.0,
+            'rps': round(total / duracion, 2) if duracion else 0.0,
+            'p50_ms': round(percentil(latencias, 50) * 1000, 2),
+            'p90_ms': round(percentil(latencias, 90) * 1000, 2),
+            'p99_ms': round(percentil(latencias, 99) * 1000, 2),
+            'max_ms': round(latencias[-1] * 1000, 2) if latencias else 0.0,
+        }
+
+    por_operacion = {}
+    for muestra in muestras:
+        por_operacion.setdefault(muestra[0], []).append(muestra)
+    return {
+        'global': bloque(muestras),
+        'operaciones': {op: bloque(items) for op, items in sorted(por_operacion.items())},
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        'Prueba de carga contra un servidor local. Iniciar el servidor con '
+        'SIMULAR_SERVICIOS_EXTERNOS=True para no llamar a Groq/Resend.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default='http://127.0.0.1:8000', help='URL base del backend.')
+        parser.add_argument('--email', default='nicklcsdev@gmail.com', help='Usuario staff para login.')
+        parser.add_argument('--password', default='nicklcsdev')
+        parser.add_argument('--duration', type=float, default=30.0, help='Segundos de carga.')
+        parser.add_argument('--concurrency', type=int, default=10, help='Clientes virtuales simultáneos.')
+        parser.add_argument('--mix', default=MEZCLA_POR_DEFECTO, help='Pesos: operacion=peso,...')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--timeout', type=float, default=30.0, help='Timeout por request.')
+        parser.add_argument('--output', help='Archivo JSON donde guardar los resultados.')
+
+    def handle(self, *args, **opts):
+        mezcla = parsear_mezcla(opts['mix'])
+        resultado = asyncio.run(self.ejecutar(opts, mezcla))
+
+        g = resultado['resumen']['global']
+        self.stdout.write(self.style.SUCCESS(
+            f"{g['requests']} requests en {resultado['duracion_s']}s | {g['rps']} req/s | "
+            f"p50 {g['p50_ms']}ms p90 {g['p90_ms']}ms p99 {g['p99_ms']}ms | errores {g['tasa_error']:.2%}"
+        ))
+        for op, datos in resultado['resumen']['operaciones'].items():
+            self.stdout.write(
+                f"  {op:<11} {datos['requests']:>7} req  p50 {datos['p50_ms']:>8}ms  "
+                f"p99 {datos['p99_ms']:>8}ms  errores {datos['tasa_error']:.2%}"
+            )
+
+        if opts.get('output'):
+            salida = Path(opts['output'])
+            salida.parent.mkdir(parents=True, exist_ok=True)
+            salida.write_text(json.dumps(resultado, ensure_ascii=False, indent=2), encoding='utf-8')
+            self.stdout.write(f"Resultados guardados en {salida}")
+
+    async def ejecutar(self, opts, mezcla):
+        base = opts['url'].rstrip('/') + '/api'
+        async with httpx.AsyncClient(timeout=opts['timeout']) as client:
+            login = await client.post(f"{base}/auth/login/", json={'email': opts['email'], 'password': opts['password']})
+            if login.status_code != 200:
+                raise CommandError(f"Login fallido ({login.status_code}): {login.text[:200]}")
+            client.headers['Authorization'] = f"Bearer {login.json()['access']}"
+
+            catalogo = await self.descubrir_catalogo(client, base)
+            muestras = []
+            fin = time.monotonic() + opts['duration']
+            inicio = time.monotonic()
+            await asyncio.gather(*[
+                self.cliente_virtual(client, base, catalogo, mezcla, random.Random(f"{opts['seed']}:{i}"), fin, muestras)
+                for i in range(opts['concurrency'])
+            ])
+            duracion = time.monotonic() - inicio
+
+        return {
+            'fecha': datetime.now().isoformat(),
+            'url': opts['url'],
+            'concurrencia': opts['concurrency'],
+            'mezcla': mezcla,
+            'seed': opts['seed'],
+            'duracion_s': round(duracion, 2),
+            'resumen': resumir(muestras, duracion),
+        }
+
+    async def descubrir_catalogo(self, client, base):
+        """Empresas y productos reales para construir requests válidos."""
+        empresas = (await client.get(f"{base}/empresas/")).json()
+        if not empresas:
+            raise CommandError("No hay empresas. Ejecute seed_db antes de la prueba de carga.")
+        nits = ','.join(e['nit'] for e in empresas[:20])
+        productos = (await client.get(f"{base}/productos/", params={'empresas': nits})).json()
+        return {'nits': [e['nit'] for e in empresas], 'productos': productos}
+
+    def construir_request(self, operacion, base, catalogo, rng):
+        nit = rng.choice(catalogo['nits'])
+        producto = rng.choice(catalogo['productos']) if catalogo['productos'] else None
+
+        if operacion == 'empresas':
+            return 'GET', f"{base}/empresas/", {}
+        if operacion == 'productos':
+            return 'GET', f"{base}/productos/", {'params': {'empresa': nit}}
+        if operacion == 'reporte':
+            return 'GET', f"{base}/productos/descargar_reporte/", {'params': {'empresa': nit}}
+        if operacion == 'chat':
+            historial = [{"role": "user", "content": "¿Cuál es el producto más caro?"}]
+            return 'POST', f"{base}/productos/chat_inventario/", {'json': {'nit': nit, 'historial': historial}}
+        if producto is None:
+            return None
+        if operacion == 'producto':
+            return 'GET', f"{base}/productos/{producto['id']}/", {}
+        # actualizar: reenvía los mismos datos para no alterar el dataset
+        return 'PUT', f"{base}/productos/{producto['id']}/", {'json': {
+            k: producto[k] for k in ('codigo', 'nombre', 'caracteristicas', 'empresa', 'precios')
+        }}
+
+    async def cliente_virtual(self, client, base, catalogo, mezcla, rng, fin, muestras):
+        operaciones, pesos = zip(*mezcla.items())
+        while time.monotonic() < fin:
+            operacion = rng.choices(operaciones, weights=pesos)[0]
+            request = self.construir_request(operacion, base, catalogo, rng)
+            if request is None:
+                continue
+            metodo, url, kwargs = request
+            inicio = time.perf_counter()
+            try:
+                response = await client.request(metodo, url, **kwargs)
+                ok = response.status_code < 400
+            except httpx.HTTPError:
+                ok = False
+            muestras.append((operacion, time.perf_counter() - inicio, ok))
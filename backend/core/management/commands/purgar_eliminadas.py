@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from core.purga import PURGA_TAMANO_LOTE, purgar_eliminadas
+
+
+class Command(BaseCommand):
+    help = (
+        'Borra definitivamente las empresas eliminadas (borrado lógico) y sus productos '
+        'con DELETE por lotes. Pensado para cron o tras un reinicio con purgas pendientes.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lote', type=int, default=PURGA_TAMANO_LOTE, help='Filas por DELETE.')
+
+    def handle(self, *args, **opts):
+        resultado = purgar_eliminadas(opts['lote'])
+        if not resultado:
+            self.stdout.write("No hay empresas pendientes de purga.")
+            return
+        for nit, tablas in resultado.items():
+            detalle = ", ".join(f"{tabla}: {filas}" for tabla, filas in tablas.items() if filas)
+            self.stdout.write(self.style.SUCCESS(f"Empresa {nit} purgada ({detalle})"))
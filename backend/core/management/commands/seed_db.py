@@ -1,18 +1,44 @@
 import random
+import time
+from concurrent.futures import ProcessPoolExecutor
 from django.core.management.base import BaseCommand
 from django.contrib.auth import get_user_model
+from django.db import connections
 from core.models import EmpresaModel, ProductoModel
+from core.sintetico import poblar
+from core.purga import marcar_todas_eliminadas, purgar_eliminadas
+
+
+def _poblar_bloque(inicio, empresas, productos_por_empresa, semilla, tamano_lote):
+    """Worker de proceso: cada uno abre su propia conexión a la BD."""
+    import django
+    django.setup()
+    connections.close_all()
+    return poblar(empresas, productos_por_empresa, semilla=semilla, tamano_lote=tamano_lote, inicio=inicio)
+
 
 class Command(BaseCommand):
     help = 'Poblar la base de datos (Empresas, Productos, Usuarios)'
 
+    def add_arguments(self, parser):
+        parser.add_argument('--companies', type=int, help='Modo sintético: número de empresas a generar.')
+        parser.add_argument('--products-per-company', type=int, default=100, help='Productos por empresa (modo sintético).')
+        parser.add_argument('--seed', type=int, default=0, help='Semilla para datos reproducibles.')
+        parser.add_argument('--offset', type=int, default=0, help='Índice inicial de empresas (para ampliar un dataset existente).')
+        parser.add_argument('--batch-size', type=int, default=2000, help='Filas por bulk_create.')
+        parser.add_argument('--workers', type=int, default=1, help='Procesos en paralelo (modo sintético).')
+        parser.add_argument('--wipe', action='store_true', help='Modo sintético: borrar empresas y productos antes de generar.')
+
     def handle(self, *args, **kwargs):
+        if kwargs.get('companies'):
+            return self.seed_sintetico(**kwargs)
+
         User = get_user_model()
         self.stdout.write(self.style.WARNING('--- INICIANDO SEEDING DE DATOS ---'))
 
         self.stdout.write("Limpiando datos antiguos...")
-        ProductoModel.objects.all().delete()
-        EmpresaModel.objects.all().delete()
+        marcar_todas_eliminadas()
+        purgar_eliminadas()
         User.objects.filter(email__in=['nicklcsdev@gmail.com', 'visitante@test.com']).delete()
 
         self.stdout.write("Creando usuarios...")
@@ -104,4 +130,52 @@ class Command(BaseCommand):
         self.stdout.write(self.style.SUCCESS('✅ Admin: nicklcsdev@gmail.com / nicklcsdev'))
         self.stdout.write(self.style.SUCCESS(
     'User: visitante@test.com / 123456 (Nota: Se pueden crear más usuarios externos mediante el registro)'
-))
\ No newline at end of file
+))
+
+    def seed_sintetico(self, companies, products_per_company, seed, offset, batch_size, workers, wipe, **kwargs):
+        """
+        Genera catálogos grandes para pruebas de carga. Los datos se producen
+        con generadores y se insertan por lotes, así la memoria no crece con
+        el tamaño total. No borra nada salvo que se pase --wipe.
+        """
+        self.stdout.write(self.style.WARNING(
+            f'--- SEED SINTÉTICO: {companies} empresas x {products_per_company} productos (seed={seed}) ---'
+        ))
+        if wipe:
+            self.stdout.write("Limpiando empresas y productos...")
+            # DELETE por lotes sin cargar filas en Python ni enviar signals (ver core/purga.py)
+            marcar_todas_eliminadas()
+            purgar_eliminadas(batch_size)
+
+        inicio = time.perf_counter()
+        workers = max(1, min(workers, companies))
+        if workers == 1:
+            total_emp, total_prod = poblar(
+                companies, products_per_company, semilla=seed, tamano_lote=batch_size, inicio=offset
+            )
+        else:
+            # Cada worker recibe un rango contiguo de empresas (NITs y códigos no se pisan)
+            connections.close_all()
+            por_worker, resto = divmod(companies, workers)
+            bloques, cursor = [], offset
+            for i in range(workers):
+                cantidad = por_worker + (1 if i < resto else 0)
+                bloques.append((cursor, cantidad))
+                cursor += cantidad
+            total_emp = total_prod = 0
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futuros = [
+                    pool.submit(_poblar_bloque, ini, cant, products_per_company, seed, batch_size)
+                    for ini, cant in bloques
+                ]
+                for futuro in futuros:
+                    emp, prod = futuro.result()
+                    total_emp += emp
+                    total_prod += prod
+
+        duracion = time.perf_counter() - inicio
+        filas = total_emp + total_prod
+        self.stdout.write(self.style.SUCCESS(
+            f'SEED SINTÉTICO COMPLETADO: {total_emp} Empresas, {total_prod} Productos '
+            f'en {duracion:.1f}s ({filas / duracion if duracion else 0:,.0f} filas/s).'
+        ))
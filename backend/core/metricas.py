@@ -0,0 +1,209 @@
+"""
+Métricas en memoria con exportación en formato de texto de Prometheus.
+
+No depende de servicios externos: cada proceso acumula sus contadores e
+histogramas y los expone en /api/system/metrics/ para que Prometheus (o
+cualquier scraper) los recoja.
+"""
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+from .parser_voz import estadisticas_parser
+from .resiliencia import estado_guardias, CERRADO, SEMI_ABIERTO, ABIERTO
+
+BUCKETS_POR_DEFECTO = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+BUCKETS_CONSULTAS = (0, 1, 2, 5, 10, 20, 50, 100, 500)
+
+
+def _escapar(valor):
+    return str(valor).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _formatear_labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{k}="{_escapar(v)}"' for k, v in labels) + '}'
+
+
+def _formatear_numero(valor):
+    if valor == float('inf'):
+        return '+Inf'
+    if isinstance(valor, float) and valor.is_integer():
+        return str(int(valor))
+    return repr(valor) if isinstance(valor, float) else str(valor)
+
+
+class Contador:
+    tipo = 'counter'
+
+    def __init__(self, nombre, ayuda):
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self._lock = threading.Lock()
+        self._valores = {}
+
+    def inc(self, valor=1, **labels):
+        clave = tuple(sorted(labels.items()))
+        with self._lock:
+            self._valores[clave] = self._valores.get(clave, 0) + valor
+
+    def valor(self, **labels):
+        with self._lock:
+            return self._valores.get(tuple(sorted(labels.items())), 0)
+
+    def exportar(self):
+        with self._lock:
+            valores = list(self._valores.items())
+        for labels, valor in sorted(valores):
+            yield f'{self.nombre}{_formatear_labels(labels)} {_formatear_numero(valor)}'
+
+
+class Histograma:
+    tipo = 'histogram'
+
+    def __init__(self, nombre, ayuda, buckets=BUCKETS_POR_DEFECTO):
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        # clave -> [conteos por bucket..., suma, total]
+        self._series = {}
+
+    def observar(self, valor, **labels):
+        clave = tuple(sorted(labels.items()))
+        with self._lock:
+            serie = self._series.get(clave)
+            if serie is None:
+                serie = self._series[clave] = [0] * len(self.buckets) + [0.0, 0]
+            for i, limite in enumerate(self.buckets):
+                if valor <= limite:
+                    serie[i] += 1
+            serie[-2] += valor
+            serie[-1] += 1
+
+    def conteo(self, **labels):
+        with self._lock:
+            serie = self._series.get(tuple(sorted(labels.items())))
+            return serie[-1] if serie else 0
+
+    def exportar(self):
+        with self._lock:
+            series = [(k, list(v)) for k, v in self._series.items()]
+        for labels, serie in sorted(series):
+            for limite, conteo in zip(self.buckets + (float('inf'),), serie[:-2] + [serie[-1]]):
+                etiquetas = labels + (('le', _formatear_numero(float(limite))),)
+                yield f'{self.nombre}_bucket{_formatear_labels(etiquetas)} {conteo}'
+            yield f'{self.nombre}_sum{_formatear_labels(labels)} {_formatear_numero(serie[-2])}'
+            yield f'{self.nombre}_count{_formatear_labels(labels)} {serie[-1]}'
+
+
+class MetricaCalculada:
+    """Valor leído al momento de exportar (ej: estado de un circuito)."""
+
+    def __init__(self, nombre, ayuda, funcion, tipo='gauge'):
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.funcion = funcion
+        self.tipo = tipo
+
+    def exportar(self):
+        for labels, valor in self.funcion():
+            yield f'{self.nombre}{_formatear_labels(tuple(sorted(labels.items())))} {_formatear_numero(valor)}'
+
+
+class Registro:
+    def __init__(self):
+        self._metricas = {}
+
+    def registrar(self, metrica):
+        self._metricas[metrica.nombre] = metrica
+        return metrica
+
+    def exportar(self):
+        lineas = []
+        for metrica in self._metricas.values():
+            lineas.append(f'# HELP {metrica.nombre} {metrica.ayuda}')
+            lineas.append(f'# TYPE {metrica.nombre} {metrica.tipo}')
+            lineas.extend(metrica.exportar())
+        return '\n'.join(lineas) + '\n'
+
+
+REGISTRO = Registro()
+
+HTTP_LATENCIA = REGISTRO.registrar(Histograma(
+    'http_request_duration_seconds', 'Latencia de requests HTTP por ruta.'))
+HTTP_REQUESTS = REGISTRO.registrar(Contador(
+    'http_requests_total', 'Requests HTTP por ruta, método y código de estado.'))
+DB_CONSULTAS = REGISTRO.registrar(Histograma(
+    'db_queries_per_request', 'Consultas SQL ejecutadas por request.', buckets=BUCKETS_CONSULTAS))
+DB_TIEMPO = REGISTRO.registrar(Histograma(
+    'db_query_duration_per_request_seconds', 'Tiempo total en SQL por request.'))
+OPERACION_LATENCIA = REGISTRO.registrar(Histograma(
+    'operation_duration_seconds', 'Duración de operaciones costosas (PDF, IA, correo).'))
+
+
+_VALOR_CIRCUITO = {CERRADO: 0, SEMI_ABIERTO: 1, ABIERTO: 2}
+
+
+def _estado_circuitos():
+    for dependencia, estado in estado_guardias().items():
+        yield {'dependencia': dependencia}, _VALOR_CIRCUITO[estado['estado']]
+
+
+def _resultados_parser_voz():
+    estadisticas = estadisticas_parser()
+    yield {'via': 'local'}, estadisticas['local']
+    yield {'via': 'llm'}, estadisticas['llm']
+
+
+REGISTRO.registrar(MetricaCalculada(
+    'external_circuit_state', 'Estado del circuito por dependencia (0=cerrado, 1=semi-abierto, 2=abierto).',
+    _estado_circuitos))
+REGISTRO.registrar(MetricaCalculada(
+    'voice_parser_results_total', 'Dictados resueltos por el parser local vs. el LLM.',
+    _resultados_parser_voz, tipo='counter'))
+
+
+@contextmanager
+def cronometro(operacion):
+    inicio = time.perf_counter()
+    resultado = 'ok'
+    try:
+        yield
+    except BaseException:
+        resultado = 'error'
+        raise
+    finally:
+        OPERACION_LATENCIA.observar(time.perf_counter() - inicio, operacion=operacion, resultado=resultado)
+
+
+def cronometrar(operacion):
+    """Decorador equivalente a `with cronometro(operacion)`."""
+    def decorador(funcion):
+        @wraps(funcion)
+        def envoltura(*args, **kwargs):
+            with cronometro(operacion):
+                return funcion(*args, **kwargs)
+        return envoltura
+    return decorador
+
+
+class ContadorConsultas:
+    """execute_wrapper que acumula número y tiempo de consultas SQL."""
+    def __init__(self):
+        self.consultas = 0
+        self.tiempo = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        inicio = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.tiempo += time.perf_counter() - inicio
+            self.consultas += 1
+
+
+def exportar_metricas():
+    return REGISTRO.exportar()
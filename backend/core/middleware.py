@@ -0,0 +1,171 @@
+import time
+from types import SimpleNamespace
+from contextlib import ExitStack
+
+from decouple import config
+from django.db import connections
+from django.utils.cache import patch_vary_headers
+from django.utils.text import compress_string
+
+from . import perfilado, replicas
+from .permissions import IsStaff
+from users.authentication import CachedJWTAuthentication
+from .metricas import HTTP_LATENCIA, HTTP_REQUESTS, DB_CONSULTAS, DB_TIEMPO, ContadorConsultas
+from .resiliencia import deadline
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - depende del entorno
+    brotli = None
+
+REQUEST_DEADLINE_SEGUNDOS = config('REQUEST_DEADLINE_SEGUNDOS', default=30.0, cast=float)
+# Respuestas más pequeñas no compensan el costo de comprimir
+COMPRESION_MIN_BYTES = config('COMPRESION_MIN_BYTES', default=1024, cast=int)
+COMPRESION_BROTLI_CALIDAD = config('COMPRESION_BROTLI_CALIDAD', default=4, cast=int)
+_TIPOS_COMPRIMIBLES = ('application/json', 'text/', 'application/javascript', 'application/xml', 'image/svg+xml')
+
+
+class DeadlineMiddleware:
+    """
+    Asigna a cada request un presupuesto de tiempo que heredan todas las
+    llamadas externas (IA, correo). Así una cadena de llamadas lentas no
+    puede retener al worker más allá del límite.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with deadline(REQUEST_DEADLINE_SEGUNDOS):
+            return self.get_response(request)
+
+
+class ReplicaMiddleware:
+    """Delimita el request para el read-your-writes del router de réplicas."""
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = replicas.iniciar_request(request)
+        try:
+            return self.get_response(request)
+        finally:
+            replicas.finalizar_request(request, token)
+
+
+def codificaciones_aceptadas(cabecera):
+    """Codificaciones de Accept-Encoding con q > 0 (ej: 'gzip, br;q=0.8, deflate;q=0')."""
+    aceptadas = set()
+    for parte in cabecera.split(','):
+        nombre, _, parametros = parte.strip().partition(';')
+        calidad = 1.0
+        parametro = parametros.strip()
+        if parametro.startswith('q='):
+            try:
+                calidad = float(parametro[2:])
+            except ValueError:
+                calidad = 0.0
+        if nombre and calidad > 0:
+            aceptadas.add(nombre.strip().lower())
+    return aceptadas
+
+
+class CompresionMiddleware:
+    """
+    Comprime respuestas de texto/JSON desde COMPRESION_MIN_BYTES con brotli o
+    gzip según Accept-Encoding. Las respuestas streaming (PDF) no se tocan.
+
+    Contra BREACH, gzip lleva los bytes aleatorios de Django. Brotli no tiene
+    dónde añadirlos, así que solo se usa en requests sin credenciales
+    (sin Authorization ni cookies); las autenticadas van en gzip.
+    """
+    max_random_bytes = 100
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if (response.streaming or response.has_header('Content-Encoding')
+                or len(response.content) < COMPRESION_MIN_BYTES
+                or not response.get('Content-Type', '').startswith(_TIPOS_COMPRIMIBLES)):
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        aceptadas = codificaciones_aceptadas(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        con_credenciales = 'HTTP_AUTHORIZATION' in request.META or bool(request.COOKIES)
+        if brotli is not None and 'br' in aceptadas and not con_credenciales:
+            codificacion = 'br'
+            contenido = brotli.compress(response.content, quality=COMPRESION_BROTLI_CALIDAD)
+        elif 'gzip' in aceptadas:
+            codificacion = 'gzip'
+            contenido = compress_string(response.content, max_random_bytes=self.max_random_bytes)
+        else:
+            return response
+
+        if len(contenido) >= len(response.content):
+            return response
+        response.content = contenido
+        response['Content-Length'] = str(len(contenido))
+        response['Content-Encoding'] = codificacion
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            # El contenido cambió de bytes: el ETag deja de ser fuerte
+            response['ETag'] = 'W/' + etag
+        return response
+
+
+class MetricasMiddleware:
+    """
+    Registra latencia y código de estado por ruta, y cuántas consultas SQL
+    (y cuánto tiempo en BD) consumió cada request.
+    La ruta se identifica por el view_name del router (ej: 'producto-list')
+    para mantener baja la cardinalidad de labels.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        contador = ContadorConsultas()
+        inicio = time.perf_counter()
+        with ExitStack() as stack:
+            for conexion in connections.all():
+                stack.enter_context(conexion.execute_wrapper(contador))
+            response = self.get_response(request)
+        duracion = time.perf_counter() - inicio
+
+        match = getattr(request, 'resolver_match', None)
+        ruta = (match.view_name or match.route) if match else 'sin_ruta'
+        metodo = request.method
+
+        HTTP_LATENCIA.observar(duracion, ruta=ruta, metodo=metodo)
+        HTTP_REQUESTS.inc(ruta=ruta, metodo=metodo, status=response.status_code)
+        DB_CONSULTAS.observar(contador.consultas, ruta=ruta)
+        DB_TIEMPO.observar(contador.tiempo, ruta=ruta)
+        return response
+
+
+class PerfiladoMiddleware:
+    """
+    Perfilado opt-in para staff (`X-Profile: 1` o `?_profile=1`).
+    El JWT solo se valida cuando se pide el perfil, así el resto de
+    requests no paga ningún costo extra.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not perfilado.solicitado(request) or not self._es_staff(request):
+            return self.get_response(request)
+
+        response, id_perfil = perfilado.perfilar(request, self.get_response)
+        response['X-Profile-Id'] = id_perfil or 'omitido'
+        return response
+
+    def _es_staff(self, request):
+        try:
+            autenticado = CachedJWTAuthentication().authenticate(request)
+        except Exception:
+            return False
+        if autenticado is None:
+            return False
+        return IsStaff().has_permission(SimpleNamespace(user=autenticado[0]), None)
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:23
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EmpresaResumenModel',
+            fields=[
+                ('empresa', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='resumen', serialize=False, to='core.empresamodel')),
+                ('productos', models.PositiveIntegerField(default=0)),
+                ('precios', models.JSONField(default=dict, help_text="Formato: {'USD': {'productos': 3, 'total': 300, 'min': 50, 'max': 150}}")),
+                ('actualizado', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Resumen de Empresa',
+                'verbose_name_plural': 'Resúmenes de Empresas',
+                'db_table': 'empresas_resumen',
+            },
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:32
+
+from decimal import Decimal
+
+from django.db import migrations, models
+
+# Las mismas tasas que el chat usaba fijas en el prompt
+TASAS_INICIALES = {'COP': Decimal('1'), 'USD': Decimal('4150'), 'EUR': Decimal('4350')}
+
+
+def cargar_tasas_iniciales(apps, schema_editor):
+    TasaCambioModel = apps.get_model('core', 'TasaCambioModel')
+    TasaCambioModel.objects.bulk_create(
+        [TasaCambioModel(moneda=moneda, tasa=tasa) for moneda, tasa in TASAS_INICIALES.items()],
+        ignore_conflicts=True,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_empresa_resumen'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TasaCambioModel',
+            fields=[
+                ('moneda', models.CharField(max_length=3, primary_key=True, serialize=False, verbose_name='Moneda (ISO)')),
+                ('tasa', models.DecimalField(decimal_places=6, help_text='Unidades de la moneda base por 1 unidad de esta moneda (ej: USD -> 4150)', max_digits=20, verbose_name='Tasa')),
+                ('actualizado', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Tasa de Cambio',
+                'verbose_name_plural': 'Tasas de Cambio',
+                'db_table': 'tasas_cambio',
+            },
+        ),
+        migrations.RunPython(cargar_tasas_iniciales, migrations.RunPython.noop),
+    ]
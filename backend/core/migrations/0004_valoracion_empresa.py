@@ -0,0 +1,48 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:35
+
+import django.core.serializers.json
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_tasas_cambio'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ValoracionEmpresaModel',
+            fields=[
+                ('empresa', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='valoracion', serialize=False, to='core.empresamodel')),
+                ('productos', models.PositiveIntegerField(default=0)),
+                ('totales', models.JSONField(default=dict, encoder=django.core.serializers.json.DjangoJSONEncoder, help_text="Suma de precios por moneda: {'COP': '1250000', 'USD': '301.20'}")),
+                ('canonicos', models.JSONField(default=dict, encoder=django.core.serializers.json.DjangoJSONEncoder, help_text='Cada producto sumado una vez en su moneda canónica (base del total convertido)')),
+                ('actualizado', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Valoración de Empresa',
+                'verbose_name_plural': 'Valoraciones de Empresas',
+                'db_table': 'empresas_valoracion',
+            },
+        ),
+        migrations.CreateModel(
+            name='ValoracionHistorialModel',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fecha', models.DateField()),
+                ('productos', models.PositiveIntegerField(default=0)),
+                ('totales', models.JSONField(default=dict, encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('canonicos', models.JSONField(default=dict, encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('actualizado', models.DateTimeField(auto_now=True)),
+                ('empresa', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='valoraciones', to='core.empresamodel')),
+            ],
+            options={
+                'verbose_name': 'Historial de Valoración',
+                'verbose_name_plural': 'Historial de Valoraciones',
+                'db_table': 'empresas_valoracion_historial',
+                'constraints': [models.UniqueConstraint(fields=('empresa', 'fecha'), name='valoracion_empresa_fecha_unica')],
+            },
+        ),
+    ]
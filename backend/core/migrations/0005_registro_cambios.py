@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:38
+
+import django.core.serializers.json
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_valoracion_empresa'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CambioModel',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('entidad', models.CharField(choices=[('empresa', 'Empresa'), ('producto', 'Producto')], max_length=20)),
+                ('clave', models.CharField(help_text='NIT de la empresa o id del producto', max_length=50)),
+                ('operacion', models.CharField(choices=[('crear', 'Crear'), ('actualizar', 'Actualizar'), ('eliminar', 'Eliminar')], max_length=20)),
+                ('datos', models.JSONField(blank=True, encoder=django.core.serializers.json.DjangoJSONEncoder, null=True)),
+                ('fecha', models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+            options={
+                'verbose_name': 'Cambio',
+                'verbose_name_plural': 'Cambios',
+                'db_table': 'cambios',
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_registro_cambios'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='empresamodel',
+            name='eliminado',
+            field=models.DateTimeField(blank=True, db_index=True, null=True, verbose_name='Eliminada el'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_borrado_logico'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='empresamodel',
+            name='version',
+            field=models.PositiveIntegerField(default=1, editable=False),
+        ),
+        migrations.AddField(
+            model_name='productomodel',
+            name='version',
+            field=models.PositiveIntegerField(default=1, editable=False),
+        ),
+    ]
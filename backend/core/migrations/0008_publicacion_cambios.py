@@ -0,0 +1,45 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:18
+
+from django.db import migrations, models
+from django.db.models import F, Max
+
+
+def publicar_existentes(apps, schema_editor):
+    # Los eventos ya entregados conservan su id como cursor: los consumidores no se reinician
+    CambioModel = apps.get_model('core', 'CambioModel')
+    PublicacionCambiosModel = apps.get_model('core', 'PublicacionCambiosModel')
+    CambioModel.objects.update(publicado=F('id'))
+    ultimo = CambioModel.objects.aggregate(ultimo=Max('id'))['ultimo'] or 0
+    PublicacionCambiosModel.objects.create(id=1, ultimo=ultimo)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_version_concurrencia'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PublicacionCambiosModel',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('ultimo', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Publicación de cambios',
+                'verbose_name_plural': 'Publicación de cambios',
+                'db_table': 'cambios_publicacion',
+            },
+        ),
+        migrations.AddField(
+            model_name='cambiomodel',
+            name='publicado',
+            field=models.BigIntegerField(blank=True, null=True, unique=True),
+        ),
+        migrations.AddIndex(
+            model_name='cambiomodel',
+            index=models.Index(condition=models.Q(('publicado__isnull', True)), fields=['id'], name='cambios_pendientes'),
+        ),
+        migrations.RunPython(publicar_existentes, migrations.RunPython.noop),
+    ]
@@ -1,13 +1,63 @@
-from django.db import models
+from django.db import models, router
+from django.db.models import F, Q
+from django.core.serializers.json import DjangoJSONEncoder
 from django.core.exceptions import ValidationError
-from core_domain.entities.empresa import Empresa as EmpresaEntity
-from core_domain.entities.producto import Producto as ProductoEntity
+from core_domain.validacion import validar_empresa, validar_producto
 
-class EmpresaModel(models.Model):
+class EmpresaActivaManager(models.Manager):
+    """Excluye las empresas eliminadas (pendientes de purga, ver core/purga.py)."""
+    def get_queryset(self):
+        return super().get_queryset().filter(eliminado__isnull=True)
+
+
+class ProductoActivoManager(models.Manager):
+    """Excluye los productos de empresas eliminadas (pendientes de purga)."""
+    def get_queryset(self):
+        return super().get_queryset().filter(empresa__eliminado__isnull=True)
+
+
+class ModeloVersionado(models.Model):
+    """
+    Concurrencia optimista: los repositorios actualizan con WHERE version = <leída>.
+    Los guardados por instancia (admin, shell) también incrementan la versión para
+    invalidar las versiones leídas, y luego releen el valor guardado.
+    """
+    version = models.PositiveIntegerField(default=1, editable=False)
+
+    class Meta:
+        abstract = True
+
+    def _es_insercion(self, kwargs):
+        if not self._state.adding or kwargs.get('force_update'):
+            return False
+        if self.pk is None or kwargs.get('force_insert'):
+            return True
+        # Instancia nueva con la pk de una fila existente (ej: EmpresaModel(nit=...).save()):
+        # Django hace UPDATE, y escribir version=1 reabriría versiones ya leídas
+        using = kwargs.get('using') or router.db_for_write(type(self), instance=self)
+        return not type(self)._base_manager.using(using).filter(pk=self.pk).exists()
+
+    def save(self, *args, **kwargs):
+        if self._es_insercion(kwargs):
+            return super().save(*args, **kwargs)
+        self.version = F('version') + 1
+        if kwargs.get('update_fields') is not None:
+            kwargs['update_fields'] = {*kwargs['update_fields'], 'version'}
+        super().save(*args, **kwargs)
+        # Sin esto la instancia quedaría con la expresión F() en lugar del número
+        self.refresh_from_db(fields=['version'])
+
+
+class EmpresaModel(ModeloVersionado):
     nit = models.CharField(max_length=50, primary_key=True, verbose_name="NIT")
     nombre = models.CharField(max_length=255, verbose_name="Nombre de la Empresa")
     direccion = models.CharField(max_length=255, verbose_name="Dirección")
     telefono = models.CharField(max_length=20, verbose_name="Teléfono")
+    eliminado = models.DateTimeField(null=True, blank=True, db_index=True, verbose_name="Eliminada el")
+
+    objects = EmpresaActivaManager()
+    # Incluye las eliminadas: purga, seed y administración
+    todas = models.Manager()
 
     class Meta:
         verbose_name = "Empresa"
@@ -16,7 +66,7 @@ class EmpresaModel(models.Model):
 
     def save(self, *args, **kwargs):
         try:
-            EmpresaEntity(
+            validar_empresa(
                 nit=self.nit,
                 nombre=self.nombre,
                 direccion=self.direccion,
@@ -24,14 +74,13 @@ class EmpresaModel(models.Model):
             )
         except ValueError as e:
             raise ValidationError(str(e))
-            
         super().save(*args, **kwargs)
 
     def __str__(self):
         return f"{self.nombre} ({self.nit})"
 
 
-class ProductoModel(models.Model):
+class ProductoModel(ModeloVersionado):
     codigo = models.CharField(max_length=50, unique=True, verbose_name="Código")
     nombre = models.CharField(max_length=255, verbose_name="Nombre del Producto")
     caracteristicas = models.TextField(verbose_name="Características")
@@ -49,6 +98,9 @@ class ProductoModel(models.Model):
         help_text="Formato: {'USD': 100, 'COP': 400000}"
     )
 
+    objects = ProductoActivoManager()
+    todos = models.Manager()
+
     class Meta:
         verbose_name = "Producto"
         verbose_name_plural = "Productos"
@@ -56,17 +108,147 @@ class ProductoModel(models.Model):
 
     def save(self, *args, **kwargs):
         try:
-            ProductoEntity(
+            validar_producto(
                 codigo=self.codigo,
                 nombre=self.nombre,
-                caracteristicas=self.caracteristicas,
                 empresa_nit=self.empresa_id,
                 precios=self.precios
             )
         except ValueError as e:
             raise ValidationError(str(e))
-            
         super().save(*args, **kwargs)
 
     def __str__(self):
-        return self.nombre
\ No newline at end of file
+        return self.nombre
+
+class EmpresaResumenModel(models.Model):
+    """
+    Estadísticas de productos por empresa ya calculadas (ver core/estadisticas.py).
+    Solo se usa con EMPRESA_STATS_MATERIALIZADAS=True; se refresca al escribir productos.
+    """
+    empresa = models.OneToOneField(
+        EmpresaModel,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='resumen',
+    )
+    productos = models.PositiveIntegerField(default=0)
+    precios = models.JSONField(
+        default=dict,
+        help_text="Formato: {'USD': {'productos': 3, 'total': 300, 'min': 50, 'max': 150}}"
+    )
+    actualizado = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Resumen de Empresa"
+        verbose_name_plural = "Resúmenes de Empresas"
+        db_table = "empresas_resumen"
+
+class TasaCambioModel(models.Model):
+    """
+    Tasas de cambio respecto a la moneda base (core_domain.dinero.MONEDA_BASE).
+    Se leen a través de core/tasas.py, que las mantiene en memoria.
+    """
+    moneda = models.CharField(max_length=3, primary_key=True, verbose_name="Moneda (ISO)")
+    tasa = models.DecimalField(
+        max_digits=20,
+        decimal_places=6,
+        verbose_name="Tasa",
+        help_text="Unidades de la moneda base por 1 unidad de esta moneda (ej: USD -> 4150)"
+    )
+    actualizado = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Tasa de Cambio"
+        verbose_name_plural = "Tasas de Cambio"
+        db_table = "tasas_cambio"
+
+    def __str__(self):
+        return f"{self.moneda} = {self.tasa}"
+
+class ValoracionEmpresaModel(models.Model):
+    """
+    Valor del inventario de cada empresa (ver core/valoracion.py).
+    Se actualiza con el delta de cada escritura de productos; los montos se
+    guardan como texto decimal para no perder precisión en el JSON.
+    """
+    empresa = models.OneToOneField(
+        EmpresaModel,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='valoracion',
+    )
+    productos = models.PositiveIntegerField(default=0)
+    totales = models.JSONField(
+        default=dict,
+        encoder=DjangoJSONEncoder,
+        help_text="Suma de precios por moneda: {'COP': '1250000', 'USD': '301.20'}"
+    )
+    canonicos = models.JSONField(
+        default=dict,
+        encoder=DjangoJSONEncoder,
+        help_text="Cada producto sumado una vez en su moneda canónica (base del total convertido)"
+    )
+    actualizado = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Valoración de Empresa"
+        verbose_name_plural = "Valoraciones de Empresas"
+        db_table = "empresas_valoracion"
+
+
+class ValoracionHistorialModel(models.Model):
+    """Última valoración de cada día por empresa."""
+    empresa = models.ForeignKey(
+        EmpresaModel,
+        on_delete=models.CASCADE,
+        related_name='valoraciones',
+    )
+    fecha = models.DateField()
+    productos = models.PositiveIntegerField(default=0)
+    totales = models.JSONField(default=dict, encoder=DjangoJSONEncoder)
+    canonicos = models.JSONField(default=dict, encoder=DjangoJSONEncoder)
+    actualizado = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Historial de Valoración"
+        verbose_name_plural = "Historial de Valoraciones"
+        db_table = "empresas_valoracion_historial"
+        constraints = [
+            models.UniqueConstraint(fields=['empresa', 'fecha'], name='valoracion_empresa_fecha_unica'),
+        ]
+
+class CambioModel(models.Model):
+    """
+    Registro de cambios (outbox) de empresas y productos, solo inserciones.
+    Se escribe en la misma transacción que la escritura (ver core/cambios.py).
+    """
+    ENTIDADES = [('empresa', 'Empresa'), ('producto', 'Producto')]
+    OPERACIONES = [('crear', 'Crear'), ('actualizar', 'Actualizar'), ('eliminar', 'Eliminar')]
+
+    id = models.BigAutoField(primary_key=True)
+    entidad = models.CharField(max_length=20, choices=ENTIDADES)
+    clave = models.CharField(max_length=50, help_text="NIT de la empresa o id del producto")
+    operacion = models.CharField(max_length=20, choices=OPERACIONES)
+    datos = models.JSONField(null=True, blank=True, encoder=DjangoJSONEncoder)
+    fecha = models.DateTimeField(auto_now_add=True, db_index=True)
+    # Cursor público: se asigna al publicar, cuando el evento ya está confirmado
+    publicado = models.BigIntegerField(null=True, blank=True, unique=True)
+
+    class Meta:
+        verbose_name = "Cambio"
+        verbose_name_plural = "Cambios"
+        db_table = "cambios"
+        indexes = [
+            models.Index(fields=['id'], condition=Q(publicado__isnull=True), name='cambios_pendientes'),
+        ]
+
+
+class PublicacionCambiosModel(models.Model):
+    """Último cursor publicado del registro de cambios (una sola fila, id=1)."""
+    ultimo = models.BigIntegerField(default=0)
+
+    class Meta:
+        verbose_name = "Publicación de cambios"
+        verbose_name_plural = "Publicación de cambios"
+        db_table = "cambios_publicacion"
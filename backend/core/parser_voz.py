@@ -0,0 +1,273 @@
+"""
+Extractor local (sin LLM) para dictados de productos.
+
+Cubre el patrón más común de los dictados, por ejemplo:
+    "producto Mouse inalámbrico código MOU-001 precio cincuenta mil pesos"
+Si el texto no se deja interpretar con suficiente confianza se retorna None
+y el llamador debe recurrir al LLM.
+"""
+import re
+import threading
+import unicodedata
+from decimal import Decimal, InvalidOperation
+
+# --- PALABRAS CLAVE (sin tildes, se comparan sobre el texto normalizado) ---
+CLAVES_NOMBRE = ('producto', 'nombre', 'articulo')
+CLAVES_CODIGO = ('codigo', 'referencia', 'ref')
+CLAVES_PRECIO = ('precio', 'cuesta', 'vale', 'valor')
+CLAVES_CARACTERISTICAS = ('caracteristicas', 'descripcion', 'detalles')
+
+MONEDAS = {
+    'pesos': 'COP', 'peso': 'COP', 'cop': 'COP',
+    'dolares': 'USD', 'dolar': 'USD', 'usd': 'USD',
+    'euros': 'EUR', 'euro': 'EUR', 'eur': 'EUR',
+}
+
+NUMEROS = {
+    'cero': 0, 'un': 1, 'uno': 1, 'una': 1, 'dos': 2, 'tres': 3, 'cuatro': 4,
+    'cinco': 5, 'seis': 6, 'siete': 7, 'ocho': 8, 'nueve': 9, 'diez': 10,
+    'once': 11, 'doce': 12, 'trece': 13, 'catorce': 14, 'quince': 15,
+    'dieciseis': 16, 'diecisiete': 17, 'dieciocho': 18, 'diecinueve': 19,
+    'veinte': 20, 'veintiun': 21, 'veintiuno': 21, 'veintiuna': 21, 'veintidos': 22,
+    'veintitres': 23, 'veinticuatro': 24, 'veinticinco': 25, 'veintiseis': 26,
+    'veintisiete': 27, 'veintiocho': 28, 'veintinueve': 29,
+    'treinta': 30, 'cuarenta': 40, 'cincuenta': 50, 'sesenta': 60,
+    'setenta': 70, 'ochenta': 80, 'noventa': 90,
+    'cien': 100, 'ciento': 100, 'doscientos': 200, 'doscientas': 200,
+    'trescientos': 300, 'trescientas': 300, 'cuatrocientos': 400, 'cuatrocientas': 400,
+    'quinientos': 500, 'quinientas': 500, 'seiscientos': 600, 'seiscientas': 600,
+    'setecientos': 700, 'setecientas': 700, 'ochocientos': 800, 'ochocientas': 800,
+    'novecientos': 900, 'novecientas': 900,
+}
+MULTIPLICADORES = {'mil': 1000, 'millon': 1000000, 'millones': 1000000}
+# Fracciones dictadas aparte ("... con 50 centavos"): el parser local no las combina
+FRACCIONES = ('centavo', 'centavos', 'centimo', 'centimos')
+
+# Regex precompilados (se usan en cada dictado)
+_RE_CLAVE = re.compile(
+    r'\b(' + '|'.join(CLAVES_NOMBRE + CLAVES_CODIGO + CLAVES_PRECIO + CLAVES_CARACTERISTICAS) + r')\b[\s:,]*'
+)
+# Miles con un mismo separador y decimales opcionales con el otro: 1.234.567,89 / 1,234.56 / 25 000
+# (el primer grupo no empieza en 0: "0.001" no es mil)
+_RE_MILES = re.compile(r'^[1-9]\d{0,2}(?P<sep>[.,\s])\d{3}(?:(?P=sep)\d{3})*(?:(?P<dec>[.,])\d{1,2})?$')
+_RE_DECIMAL = re.compile(r'^\d+(?:[.,]\d{1,2})?$')
+# Token numérico completo: dígitos con separadores intermedios
+_RE_NUMERO_DIGITOS = re.compile(r'\d+(?:[.,\s]\d+)*')
+_RE_CODIGO_VALIDO = re.compile(r'^[A-Za-z0-9-_]+$')
+
+# --- MÉTRICAS DE ACIERTO ---
+_lock_estadisticas = threading.Lock()
+_estadisticas = {'local': 0, 'llm': 0}
+
+
+def registrar_resultado(local):
+    with _lock_estadisticas:
+        _estadisticas['local' if local else 'llm'] += 1
+
+
+def estadisticas_parser():
+    """Cuántos dictados resolvió el parser local vs. cuántos fueron al LLM."""
+    with _lock_estadisticas:
+        local, llm = _estadisticas['local'], _estadisticas['llm']
+    total = local + llm
+    return {
+        'local': local,
+        'llm': llm,
+        'tasa_acierto': round(local / total, 4) if total else 0.0,
+    }
+
+
+def _sin_tildes(texto):
+    return ''.join(
+        c for c in unicodedata.normalize('NFD', texto)
+        if unicodedata.category(c) != 'Mn'
+    )
+
+
+def palabras_a_numero(palabras):
+    """
+    Convierte números dictados en español a entero.
+    Ej: ['dos', 'millones', 'quinientos', 'mil'] -> 2500000
+    Retorna None si alguna palabra no es numérica.
+    """
+    total, actual, vistos = 0, 0, False
+    for palabra in palabras:
+        if palabra == 'y':
+            continue
+        if palabra in NUMEROS:
+            actual += NUMEROS[palabra]
+        elif palabra == 'mil':
+            actual = max(actual, 1) * 1000
+        elif palabra in ('millon', 'millones'):
+            total += max(actual, 1) * 1000000
+            actual = 0
+        else:
+            return None
+        vistos = True
+    return total + actual if vistos else None
+
+
+def _parsear_digitos(token):
+    """Valor de un token numérico completo, o None si su formato es ambiguo."""
+    token = token.strip()
+    miles = _RE_MILES.match(token)
+    if miles:
+        decimal = miles.group('dec')
+        if decimal == miles.group('sep'):
+            return None
+        entero = token[:miles.start('dec')] if decimal else token
+        fraccion = token[miles.end('dec'):] if decimal else ''
+        entero = re.sub(r'\D', '', entero)
+        return Decimal(f"{entero}.{fraccion}" if fraccion else entero)
+    if _RE_DECIMAL.match(token):
+        return Decimal(token.replace(',', '.'))
+    return None
+
+
+def _es_numerica(palabra):
+    return palabra in NUMEROS or palabra in MULTIPLICADORES or palabra in FRACCIONES
+
+
+def parsear_precio(segmento):
+    """
+    Extrae (precio, moneda) de un fragmento como "cincuenta mil pesos",
+    "$25.000", "19.99 dolares" o "2 millones". Retorna (None, None) si no
+    encuentra un número o si queda otra cantidad sin interpretar
+    ("150000 pesos con 50 centavos"): mejor el LLM que un precio equivocado.
+    """
+    texto = _sin_tildes(segmento.lower()).replace('$', ' ')
+    moneda = None
+    for palabra in re.findall(r'[a-z]+', texto):
+        if palabra in MONEDAS:
+            moneda = MONEDAS[palabra]
+            break
+
+    # 1. Número en dígitos (opcionalmente seguido de "mil"/"millones")
+    tokens = list(_RE_NUMERO_DIGITOS.finditer(texto))
+    if tokens:
+        if len(tokens) > 1:
+            return None, None
+        match = tokens[0]
+        try:
+            valor = _parsear_digitos(match.group(0))
+        except InvalidOperation:
+            valor = None
+        if valor is None:
+            return None, None
+        despues = re.findall(r'[a-z]+', texto[match.end():])
+        if despues and despues[0] in MULTIPLICADORES:
+            valor *= MULTIPLICADORES[despues.pop(0)]
+        if any(_es_numerica(p) for p in re.findall(r'[a-z]+', texto[:match.start()]) + despues):
+            return None, None
+        return valor, moneda
+
+    # 2. Número en palabras (toma la racha de palabras numéricas)
+    palabras, resto = [], []
+    for palabra in re.findall(r'[a-z]+', texto):
+        if resto:
+            resto.append(palabra)
+        elif palabra in NUMEROS or palabra in MULTIPLICADORES or (palabra == 'y' and palabras):
+            palabras.append(palabra)
+        elif palabras:
+            resto.append(palabra)
+    if any(_es_numerica(p) for p in resto):
+        return None, None
+    valor = palabras_a_numero(palabras)
+    if valor is None:
+        return None, None
+    return Decimal(valor), moneda
+
+
+def normalizar_codigo(segmento):
+    """
+    'abc guion cero uno' -> 'ABC-01'. Whisper suele separar letras y números
+    con espacios (o dictarlos en palabras), así que se compactan.
+    """
+    texto = _sin_tildes(segmento.lower())
+    texto = re.sub(r'\bguion bajo\b', '_', texto)
+    texto = re.sub(r'\bguion\b', '-', texto)
+    tokens = [
+        str(NUMEROS[t]) if NUMEROS.get(t, 10) < 10 else t
+        for t in re.split(r'[\s.,]+', texto)
+    ]
+    return ''.join(tokens).upper()
+
+
+def _segmentar(texto):
+    """
+    Divide el dictado en pares (clave, fragmento) usando las palabras clave
+    como separadores. Las posiciones se calculan sobre el texto sin tildes,
+    que tiene la misma longitud que el original (NFC).
+    """
+    original = unicodedata.normalize('NFC', texto)
+    normalizado = _sin_tildes(original.lower())
+    if len(normalizado) != len(original):
+        normalizado = original.lower()
+
+    coincidencias = list(_RE_CLAVE.finditer(normalizado))
+    segmentos = []
+    for i, m in enumerate(coincidencias):
+        fin = coincidencias[i + 1].start() if i + 1 < len(coincidencias) else len(original)
+        fragmento = original[m.end():fin].strip(' \t\n,.;:')
+        segmentos.append((m.group(1), fragmento))
+    return segmentos
+
+
+def _categoria(clave):
+    if clave in CLAVES_NOMBRE:
+        return 'nombre'
+    if clave in CLAVES_CODIGO:
+        return 'codigo'
+    if clave in CLAVES_PRECIO:
+        return 'precio'
+    return 'caracteristicas'
+
+
+def extraer_producto_local(texto):
+    """
+    Intenta extraer nombre, código, precio y moneda sin LLM.
+    Solo retorna resultado cuando los tres campos obligatorios se
+    reconocen con certeza; en cualquier otro caso retorna None.
+    """
+    if not texto:
+        return None
+
+    datos = {}
+    vistas = set()
+    for clave, fragmento in _segmentar(texto):
+        # Una clave repetida ("precio 100 pesos precio 200 dólares") o una
+        # palabra clave dentro del valor ("Camisa de referencia alta",
+        # "Tarjeta de valor agregado") deja campos truncados o duplicados:
+        # no se adivina cuál es el bueno, decide el LLM.
+        categoria = _categoria(clave)
+        if categoria in vistas:
+            return None
+        vistas.add(categoria)
+        if not fragmento:
+            continue
+        if categoria == 'nombre':
+            datos['nombre'] = fragmento
+        elif categoria == 'codigo':
+            datos['codigo'] = normalizar_codigo(fragmento)
+        elif categoria == 'precio':
+            precio, moneda = parsear_precio(fragmento)
+            if precio is not None:
+                datos['precio'] = precio
+                datos['moneda'] = moneda or 'COP'
+        else:
+            datos['caracteristicas'] = fragmento
+
+    if not datos.get('nombre') or not datos.get('codigo') or 'precio' not in datos:
+        return None
+    if not _RE_CODIGO_VALIDO.match(datos['codigo']) or datos['precio'] <= 0:
+        return None
+
+    precio = datos['precio']
+    return {
+        'nombre': datos['nombre'],
+        'codigo': datos['codigo'],
+        'caracteristicas': datos.get('caracteristicas', ''),
+        # Mismo tipo que devolvería el LLM (JSON number)
+        'precio': int(precio) if precio == precio.to_integral_value() else float(precio),
+        'moneda': datos['moneda'],
+    }
@@ -0,0 +1,193 @@
+"""
+Perfilado bajo demanda (solo staff).
+
+Se activa con el header `X-Profile: 1` o el query param `?_profile=1`.
+El request se ejecuta dentro de cProfile y se capturan todas las consultas
+SQL con su duración y el método del repositorio (core/adapters.py) que las
+originó. El resultado se guarda como `<id>.prof` (pstats) y `<id>.json`.
+
+Para que sea seguro en producción:
+- Solo un perfil a la vez por proceso (cProfile no admite anidarse).
+- Máximo PERFILES_MAX_POR_MINUTO perfiles por proceso.
+- Se conservan los últimos PERFILES_MAX_ARCHIVOS resultados.
+"""
+import cProfile
+import io
+import json
+import os
+import pstats
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import ExitStack
+from datetime import datetime
+
+from decouple import config
+from django.conf import settings
+from django.db import connections
+
+PERFILES_DIR = config('PERFILES_DIR', default=str(settings.BASE_DIR / 'perfiles'))
+PERFILES_MAX_POR_MINUTO = config('PERFILES_MAX_POR_MINUTO', default=6, cast=int)
+PERFILES_MAX_ARCHIVOS = config('PERFILES_MAX_ARCHIVOS', default=50, cast=int)
+
+_RE_ID = re.compile(r'^[0-9a-f]{32}$')
+_ARCHIVO_ADAPTERS = os.path.join('core', 'adapters.py')
+
+_lock_perfilador = threading.Lock()
+_lock_tasa = threading.Lock()
+_inicios_recientes = deque()
+
+
+def solicitado(request):
+    return request.headers.get('X-Profile') == '1' or request.GET.get('_profile') == '1'
+
+
+def _cupo_disponible():
+    """Ventana deslizante de 60 s para limitar la tasa de perfiles."""
+    ahora = time.monotonic()
+    with _lock_tasa:
+        while _inicios_recientes and ahora - _inicios_recientes[0] > 60:
+            _inicios_recientes.popleft()
+        if len(_inicios_recientes) >= PERFILES_MAX_POR_MINUTO:
+            return False
+        _inicios_recientes.append(ahora)
+        return True
+
+
+def _origen_consulta():
+    """
+    Primer método público de core/adapters.py en la pila (ej: DjangoProductoRepository.list_by_empresa).
+    Los helpers privados (_entidades) y las comprensiones se saltan.
+    """
+    frame = sys._getframe(2)
+    respaldo = None
+    while frame is not None:
+        codigo = frame.f_code
+        if codigo.co_filename.endswith(_ARCHIVO_ADAPTERS):
+            nombre = getattr(codigo, 'co_qualname', None)
+            if nombre is None:
+                propio = frame.f_locals.get('self')
+                nombre = f"{type(propio).__name__}.{codigo.co_name}" if propio is not None else codigo.co_name
+            origen = f"{nombre}:{frame.f_lineno}"
+            if not codigo.co_name.startswith(('_', '<')):
+                return origen
+            respaldo = respaldo or origen
+        frame = frame.f_back
+    return respaldo
+
+
+class TrazaSQL:
+    """execute_wrapper que guarda cada consulta con su duración y origen."""
+    def __init__(self, alias):
+        self.alias = alias
+        self.consultas = []
+
+    def __call__(self, execute, sql, params, many, context):
+        inicio = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.consultas.append({
+                'db': self.alias,
+                'sql': sql,
+                'duracion_ms': round((time.perf_counter() - inicio) * 1000, 3),
+                'origen': _origen_consulta(),
+            })
+
+
+def _ruta(id_perfil, extension):
+    return os.path.join(PERFILES_DIR, f"{id_perfil}.{extension}")
+
+
+def _purgar_antiguos():
+    archivos = sorted(
+        (os.path.join(PERFILES_DIR, n) for n in os.listdir(PERFILES_DIR) if n.endswith('.json')),
+        key=os.path.getmtime,
+    )
+    sobrantes = max(len(archivos) - PERFILES_MAX_ARCHIVOS, 0)
+    for viejo in archivos[:sobrantes]:
+        base = viejo[:-len('.json')]
+        for extension in ('.json', '.prof'):
+            if os.path.exists(base + extension):
+                os.remove(base + extension)
+
+
+def perfilar(request, get_response):
+    """
+    Ejecuta el request perfilado. Retorna (response, id_perfil); id_perfil es
+    None si no hubo cupo y el request se atendió sin perfilar.
+    """
+    # Primero el lock: si hay otro perfil en curso no se gasta cupo de la ventana
+    if not _lock_perfilador.acquire(blocking=False):
+        return get_response(request), None
+    if not _cupo_disponible():
+        _lock_perfilador.release()
+        return get_response(request), None
+
+    trazas = []
+    perfil = cProfile.Profile()
+    try:
+        with ExitStack() as stack:
+            for conexion in connections.all():
+                traza = TrazaSQL(conexion.alias)
+                trazas.append(traza)
+                stack.enter_context(conexion.execute_wrapper(traza))
+
+            inicio = time.perf_counter()
+            perfil.enable()
+            try:
+                response = get_response(request)
+            finally:
+                perfil.disable()
+                duracion = time.perf_counter() - inicio
+    finally:
+        _lock_perfilador.release()
+
+    id_perfil = uuid.uuid4().hex
+    os.makedirs(PERFILES_DIR, exist_ok=True)
+    perfil.dump_stats(_ruta(id_perfil, 'prof'))
+
+    resumen = io.StringIO()
+    pstats.Stats(perfil, stream=resumen).sort_stats('cumulative').print_stats(25)
+    consultas = [c for t in trazas for c in t.consultas]
+
+    with open(_ruta(id_perfil, 'json'), 'w', encoding='utf-8') as f:
+        json.dump({
+            'id': id_perfil,
+            'fecha': datetime.now().isoformat(),
+            'metodo': request.method,
+            'path': request.get_full_path(),
+            'status': response.status_code,
+            'duracion_ms': round(duracion * 1000, 2),
+            'total_consultas': len(consultas),
+            'tiempo_sql_ms': round(sum(c['duracion_ms'] for c in consultas), 3),
+            'consultas': consultas,
+            'top_funciones': resumen.getvalue(),
+        }, f, ensure_ascii=False, indent=2)
+
+    _purgar_antiguos()
+    return response, id_perfil
+
+
+def listar_perfiles():
+    if not os.path.isdir(PERFILES_DIR):
+        return []
+    resultado = []
+    for nombre in sorted(os.listdir(PERFILES_DIR), reverse=True):
+        if not nombre.endswith('.json'):
+            continue
+        with open(os.path.join(PERFILES_DIR, nombre), encoding='utf-8') as f:
+            datos = json.load(f)
+        resultado.append({k: datos[k] for k in ('id', 'fecha', 'metodo', 'path', 'status', 'duracion_ms', 'total_consultas')})
+    return sorted(resultado, key=lambda p: p['fecha'], reverse=True)
+
+
+def ruta_perfil(id_perfil, formato):
+    """Ruta del artefacto o None si el id/formato no es válido o no existe."""
+    if not _RE_ID.match(id_perfil or '') or formato not in ('json', 'prof'):
+        return None
+    ruta = _ruta(id_perfil, formato)
+    return ruta if os.path.exists(ruta) else None
@@ -0,0 +1,94 @@
+"""
+Actualización masiva de precios (porcentaje, suma, valor fijo o conversión).
+
+Todo ocurre en una transacción: los productos se recorren por lotes de
+PRECIOS_TAMANO_LOTE en orden de id (filas bloqueadas con select_for_update) y
+cada lote se escribe con un solo bulk_update. Si la regla falla en cualquier
+producto (ej: precio negativo) no se guarda nada.
+
+bulk_update no envía signals: en lugar de un refresco por producto, al final
+se recalcula una vez la valoración de la empresa, se programa un refresco del
+resumen y los eventos del registro de cambios se insertan por lote.
+"""
+from decouple import config
+from django.db import transaction
+from django.db.models import Q
+
+from core_domain.dinero import a_decimal
+from core_domain.entities.cambio import ENTIDAD_PRODUCTO, OPERACION_ACTUALIZAR
+from core_domain.entities.producto import Producto
+
+from . import estadisticas, valoracion
+from .cambios import registrar_cambios
+from .models import ProductoModel
+from .proyecciones import producto_a_json
+
+PRECIOS_TAMANO_LOTE = config('PRECIOS_TAMANO_LOTE', default=1000, cast=int)
+
+_CAMPOS = ('id', 'codigo', 'nombre', 'caracteristicas', 'empresa_id', 'precios', 'version')
+
+
+def _productos(filtro, regla):
+    qs = ProductoModel.objects.filter(empresa_id=filtro.empresa_nit)
+    if filtro.buscar:
+        qs = qs.filter(Q(nombre__icontains=filtro.buscar) | Q(codigo__icontains=filtro.buscar))
+    if filtro.ids:
+        qs = qs.filter(id__in=filtro.ids)
+    if regla.operacion in ('porcentaje', 'sumar'):
+        # Solo aplican a productos que ya tienen precio en la moneda
+        qs = qs.filter(precios__has_key=regla.moneda)
+    return qs.order_by('id')
+
+
+def _nuevos_precios(precios, regla, tabla):
+    """Precios con la regla aplicada, o None si el producto no cambia."""
+    nuevo = regla.aplicar(precios, tabla)
+    if nuevo is None:
+        return None
+    actual = precios.get(regla.moneda)
+    if actual is not None and a_decimal(actual) == nuevo.monto:
+        return None
+    return {**precios, regla.moneda: nuevo.a_json()}
+
+
+def actualizar_precios(filtro, regla, tabla, lote=None):
+    """Aplica `regla` a los productos de `filtro`. Retorna cuántos cambiaron."""
+    lote = lote or PRECIOS_TAMANO_LOTE
+    qs = _productos(filtro, regla)
+    total = 0
+    with transaction.atomic():
+        ultimo = 0
+        while True:
+            filas = list(
+                qs.filter(id__gt=ultimo).select_for_update(of=('self',)).values_list(*_CAMPOS)[:lote]
+            )
+            if not filas:
+                break
+            ultimo = filas[-1][0]
+
+            cambiados = []
+            for pk, codigo, nombre, caracteristicas, empresa_nit, precios, version in filas:
+                nuevos = _nuevos_precios(precios or {}, regla, tabla)
+                if nuevos is not None:
+                    cambiados.append(Producto.desde_persistencia(
+                        codigo, nombre, caracteristicas, empresa_nit, nuevos, pk, version + 1,
+                    ))
+            if cambiados:
+                # Filas bloqueadas: version + 1 calculada aquí invalida las ediciones concurrentes
+                ProductoModel.objects.bulk_update(
+                    [ProductoModel(id=p.id, precios=p.precios, version=p.version) for p in cambiados],
+                    ['precios', 'version'],
+                )
+                registrar_cambios(
+                    (ENTIDAD_PRODUCTO, p.id, OPERACION_ACTUALIZAR, producto_a_json(p)) for p in cambiados
+                )
+                total += len(cambiados)
+            if len(filas) < lote:
+                break
+
+        if total:
+            if valoracion.VALORACION_INCREMENTAL:
+                valoracion.recalcular_valoracion(filtro.empresa_nit)
+            if estadisticas.EMPRESA_STATS_MATERIALIZADAS:
+                estadisticas.programar_refresco(filtro.empresa_nit)
+    return total
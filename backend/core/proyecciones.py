@@ -0,0 +1,53 @@
+"""
+Proyecciones de lectura: entidades del dominio -> dict listo para JSON.
+
+Equivalen a los serializers de DRF pero sin recorrer campos. Las usan las
+vistas para responder y los repositorios para los eventos de `cambios`, por
+eso no dependen de la capa REST.
+"""
+
+
+def empresa_a_json(empresa):
+    """Equivalente a EmpresaSerializer(...).data."""
+    return {
+        'nit': empresa.nit,
+        'nombre': empresa.nombre,
+        'direccion': empresa.direccion,
+        'telefono': empresa.telefono,
+        'version': empresa.version,
+    }
+
+
+def producto_a_json(producto):
+    """Equivalente a ProductoSerializer(...).data."""
+    return {
+        'id': producto.id,
+        'codigo': producto.codigo,
+        'nombre': producto.nombre,
+        'caracteristicas': producto.caracteristicas,
+        'empresa': producto.empresa_nit,
+        'precios': producto.precios,
+        'version': producto.version,
+    }
+
+
+def producto_en_moneda_a_json(producto, dinero):
+    """producto_a_json + `precio` convertido ({'moneda', 'monto'} o None si no es convertible)."""
+    data = producto_a_json(producto)
+    data['precio'] = {'moneda': dinero.moneda, 'monto': dinero.monto} if dinero else None
+    return data
+
+
+def tasas_a_json(tabla):
+    return {'base': tabla.base, 'tasas': tabla.como_dict()}
+
+
+def cambio_a_json(cambio):
+    return {
+        'id': cambio.id,
+        'entidad': cambio.entidad,
+        'clave': cambio.clave,
+        'operacion': cambio.operacion,
+        'datos': cambio.datos,
+        'fecha': cambio.fecha,
+    }
@@ -0,0 +1,100 @@
+"""
+Purga de empresas eliminadas.
+
+Eliminar una empresa solo marca `eliminado` (la API responde de inmediato) y
+los managers por defecto dejan de ver la empresa y sus productos. La purga
+borra después las filas con DELETE por lotes de PURGA_TAMANO_LOTE, cada lote
+en su propia transacción para no retener bloqueos, sin cargar los productos en
+Python ni enviar signals (el evento 'eliminar' del registro de cambios ya se
+emitió al marcarla).
+
+Se lanza en un hilo al confirmar el borrado (PURGA_EN_SEGUNDO_PLANO) y con
+`manage.py purgar_eliminadas` (cron o tras un reinicio con purgas pendientes).
+"""
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from decouple import config
+from django.db import connections, router, transaction
+from django.utils import timezone
+
+from .models import EmpresaModel
+
+logger = logging.getLogger(__name__)
+
+PURGA_TAMANO_LOTE = config('PURGA_TAMANO_LOTE', default=5000, cast=int)
+PURGA_EN_SEGUNDO_PLANO = config('PURGA_EN_SEGUNDO_PLANO', default=True, cast=bool)
+
+# Un solo hilo: las purgas se encolan en vez de competir por los mismos bloqueos
+_ejecutor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='purga')
+
+
+def _dependientes():
+    """(tabla, pk, columna) de cada tabla con FK a empresas (productos, resumen, valoración...)."""
+    return [
+        (rel.related_model._meta.db_table, rel.related_model._meta.pk.column, rel.field.column)
+        for rel in EmpresaModel._meta.related_objects
+    ]
+
+
+def _borrar_por_lotes(alias, tabla, pk, columna, valor, lote):
+    conexion = connections[alias]
+    q = conexion.ops.quote_name
+    sql = (
+        f"DELETE FROM {q(tabla)} WHERE {q(pk)} IN "
+        f"(SELECT {q(pk)} FROM {q(tabla)} WHERE {q(columna)} = %s LIMIT %s)"
+    )
+    total = 0
+    while True:
+        with transaction.atomic(using=alias), conexion.cursor() as cursor:
+            cursor.execute(sql, [valor, lote])
+            borradas = cursor.rowcount
+        total += borradas
+        if borradas < lote:
+            return total
+
+
+def purgar_empresa(nit, lote=None):
+    """Borra definitivamente una empresa eliminada y sus dependientes. Retorna {tabla: filas}."""
+    lote = lote or PURGA_TAMANO_LOTE
+    alias = router.db_for_write(EmpresaModel)
+    borradas = {
+        tabla: _borrar_por_lotes(alias, tabla, pk, columna, nit, lote)
+        for tabla, pk, columna in _dependientes()
+    }
+    # Los productos ya no pueden crearse: la empresa está fuera del manager por defecto
+    conexion = connections[alias]
+    q = conexion.ops.quote_name
+    with transaction.atomic(using=alias), conexion.cursor() as cursor:
+        cursor.execute(
+            f"DELETE FROM {q(EmpresaModel._meta.db_table)} WHERE {q('nit')} = %s AND {q('eliminado')} IS NOT NULL",
+            [nit],
+        )
+        borradas[EmpresaModel._meta.db_table] = cursor.rowcount
+    return borradas
+
+
+def purgar_eliminadas(lote=None):
+    """Purga todas las empresas marcadas como eliminadas, de la más antigua a la más reciente."""
+    nits = EmpresaModel.todas.filter(eliminado__isnull=False).order_by('eliminado').values_list('nit', flat=True)
+    return {nit: purgar_empresa(nit, lote) for nit in list(nits)}
+
+
+def marcar_todas_eliminadas():
+    """Marca todas las empresas como eliminadas (seed_db --wipe) para purgarlas por lotes."""
+    return EmpresaModel.todas.filter(eliminado__isnull=True).update(eliminado=timezone.now())
+
+
+def _purgar_en_hilo():
+    try:
+        purgar_eliminadas()
+    except Exception:
+        logger.exception("Error purgando empresas eliminadas")
+    finally:
+        connections.close_all()
+
+
+def programar_purga():
+    """Encola la purga para cuando se confirme la transacción en curso."""
+    if PURGA_EN_SEGUNDO_PLANO:
+        transaction.on_commit(lambda: _ejecutor.submit(_purgar_en_hilo))
@@ -0,0 +1,54 @@
+"""
+Renderer y parser JSON con orjson (opcional). Si orjson no está instalado se
+usan el JSONRenderer/JSONParser de DRF, así el mismo código funciona en
+cualquier entorno. Configurados globalmente en REST_FRAMEWORK.
+"""
+from decimal import Decimal
+
+from django.conf import settings
+from django.utils.encoding import force_str
+from django.utils.functional import Promise
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depende del entorno
+    orjson = None
+
+_encoder_drf = JSONEncoder()
+
+
+def _por_defecto(obj):
+    # Precios en Decimal: enteros exactos y el resto como número (igual que el encoder de DRF)
+    if isinstance(obj, Decimal):
+        return int(obj) if obj == obj.to_integral_value() else float(obj)
+    if isinstance(obj, Promise):
+        return force_str(obj)
+    # QuerySets, timedelta, generadores, etc.: mismas reglas que DRF
+    return _encoder_drf.default(obj)
+
+
+class ORJSONRenderer(JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        # ?indent / `Accept: application/json; indent=4` se sirven con el renderer de DRF
+        if orjson is None or self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        if data is None:
+            return b''
+        return orjson.dumps(data, default=_por_defecto, option=orjson.OPT_NON_STR_KEYS)
+
+
+class ORJSONParser(JSONParser):
+    renderer_class = ORJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        codificacion = (parser_context or {}).get('encoding', settings.DEFAULT_CHARSET)
+        if orjson is None or codificacion.lower().replace('-', '') != 'utf8':
+            return super().parse(stream, media_type, parser_context)
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
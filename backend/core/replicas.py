@@ -0,0 +1,146 @@
+"""
+Enrutamiento de lecturas a réplicas (DB_REPLICA_HOSTS).
+
+Solo las lecturas de los repositorios (decoradas con @lectura_en_replica) van
+a una réplica; escrituras, admin y todo lo demás siguen en 'default'.
+
+- Read-your-writes: tras una escritura, el resto del request y los siguientes
+  REPLICA_PEGAJOSA_SEGUNDOS del mismo cliente (mismo token) leen del primario.
+- Si una réplica falla, la lectura se repite en el primario y la réplica queda
+  fuera de rotación durante REPLICA_REINTENTO_SEGUNDOS.
+"""
+import contextvars
+import hashlib
+import itertools
+import threading
+import time
+from functools import wraps
+
+from decouple import config
+from django.conf import settings
+from django.core.cache import cache
+from django.db import InterfaceError, OperationalError
+
+REPLICA_PEGAJOSA_SEGUNDOS = config('REPLICA_PEGAJOSA_SEGUNDOS', default=5, cast=int)
+REPLICA_REINTENTO_SEGUNDOS = config('REPLICA_REINTENTO_SEGUNDOS', default=30.0, cast=float)
+
+PRIMARIO = 'default'
+
+# Alias elegido para la lectura en curso (None = primario)
+_alias_lectura = contextvars.ContextVar('alias_lectura', default=None)
+# Estado del request: {'primario': bool, 'escribio': bool}. None fuera de un request.
+_estado_request = contextvars.ContextVar('estado_replicas', default=None)
+
+_lock = threading.Lock()
+_caidas = {}
+_turno = itertools.count()
+
+
+def aliases_replica():
+    return [alias for alias in settings.DATABASES if alias.startswith('replica')]
+
+
+def _disponibles():
+    ahora = time.monotonic()
+    with _lock:
+        return [a for a in aliases_replica() if _caidas.get(a, 0) <= ahora]
+
+
+def marcar_caida(alias):
+    with _lock:
+        _caidas[alias] = time.monotonic() + REPLICA_REINTENTO_SEGUNDOS
+
+
+def estado_replicas():
+    ahora = time.monotonic()
+    with _lock:
+        return {a: {'disponible': _caidas.get(a, 0) <= ahora} for a in aliases_replica()}
+
+
+def _leer_del_primario():
+    estado = _estado_request.get()
+    return estado is not None and estado['primario']
+
+
+def elegir_replica():
+    """Réplica para la próxima lectura (round robin) o None si hay que usar el primario."""
+    if _leer_del_primario():
+        return None
+    disponibles = _disponibles()
+    if not disponibles:
+        return None
+    return disponibles[next(_turno) % len(disponibles)]
+
+
+def lectura_en_replica(metodo):
+    """Decorador para métodos de lectura de los repositorios."""
+    @wraps(metodo)
+    def envoltura(*args, **kwargs):
+        alias = elegir_replica()
+        if alias is None:
+            return metodo(*args, **kwargs)
+        token = _alias_lectura.set(alias)
+        try:
+            return metodo(*args, **kwargs)
+        except (OperationalError, InterfaceError):
+            marcar_caida(alias)
+        finally:
+            _alias_lectura.reset(token)
+        return metodo(*args, **kwargs)
+    return envoltura
+
+
+# =========================================================
+# READ-YOUR-WRITES
+# =========================================================
+
+def _clave_cliente(request):
+    credencial = request.META.get('HTTP_AUTHORIZATION')
+    if not credencial:
+        return None
+    return "replicas:primario:" + hashlib.sha256(credencial.encode()).hexdigest()[:32]
+
+
+def iniciar_request(request):
+    clave = _clave_cliente(request)
+    primario = bool(clave and aliases_replica() and cache.get(clave))
+    return _estado_request.set({'primario': primario, 'escribio': False})
+
+
+def finalizar_request(request, token):
+    estado = _estado_request.get()
+    _estado_request.reset(token)
+    if estado['escribio'] and aliases_replica():
+        clave = _clave_cliente(request)
+        if clave:
+            cache.set(clave, 1, REPLICA_PEGAJOSA_SEGUNDOS)
+
+
+def _registrar_escritura():
+    estado = _estado_request.get()
+    if estado is not None:
+        estado['primario'] = True
+        estado['escribio'] = True
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        return _alias_lectura.get()
+
+    def db_for_write(self, model, **hints):
+        _registrar_escritura()
+        return PRIMARIO
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Primario y réplicas tienen los mismos datos: un producto leído de la
+        # réplica puede apuntar a una empresa leída del primario
+        bases = {PRIMARIO, *aliases_replica()}
+        if obj1._state.db in bases and obj2._state.db in bases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Las réplicas reciben el esquema por replicación, nunca por `migrate`
+        if db in aliases_replica():
+            return False
+        return None
@@ -7,6 +7,9 @@ from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph,
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.enums import TA_RIGHT, TA_LEFT, TA_CENTER
 
+from .metricas import cronometrar
+from core_domain.dinero import Dinero
+
 # --- COLORES ---
 COLOR_BG_DARK = colors.HexColor("#0D0D0D")
 COLOR_BG_ACCENT = colors.HexColor("#1A1A1A")
@@ -28,6 +31,16 @@ def limpiar_texto(texto):
     # Truco: Codifica a Latin-1 (ignorando errores/emojis) y decodifica de nuevo
     return texto.encode('latin-1', 'ignore').decode('latin-1')
 
+def texto_precio(precios):
+    """Primer precio del producto con los decimales de su moneda: 'COP 1,250,000' / 'USD 19.99'."""
+    if not precios or not isinstance(precios, dict):
+        return "N/A"
+    moneda, valor = next(iter(precios.items()))
+    try:
+        return Dinero.de(valor, moneda).formato()
+    except ValueError:
+        return f"{moneda} {valor}"
+
 def draw_header_footer(canvas, doc):
     canvas.saveState()
     
@@ -72,6 +85,7 @@ def draw_header_footer(canvas, doc):
     
     canvas.restoreState()
 
+@cronometrar('reporte_pdf')
 def generar_pdf_inventario(productos, info_empresa_backup=None):
     buffer = io.BytesIO()
     
@@ -137,11 +151,7 @@ def generar_pdf_inventario(productos, info_empresa_backup=None):
         chars_raw = limpiar_texto(p.caracteristicas)
         chars = chars_raw[:40] + "..." if len(chars_raw) > 40 else chars_raw
         
-        precio_txt = "N/A"
-        if p.precios and isinstance(p.precios, dict) and len(p.precios) > 0:
-            k = list(p.precios.keys())[0]
-            v = p.precios[k]
-            precio_txt = f"{k} {v:,.0f}"
+        precio_txt = texto_precio(p.precios)
 
         row = [
             Paragraph(f"<font color='#666666' size=9>{code}</font>", styles['Normal']),
@@ -0,0 +1,198 @@
+"""
+Protección de llamadas externas (Groq, Resend).
+
+Cada dependencia tiene su propia guardia con:
+- Circuit breaker: tras N fallos seguidos se abre y falla rápido durante
+  un tiempo, luego deja pasar una llamada de prueba (semi-abierto).
+- Límite de concurrencia: semáforo para que un upstream lento no acapare
+  todos los workers.
+- Timeout acotado por el deadline del request (si hay uno activo).
+"""
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+
+from decouple import config
+
+CERRADO = 'cerrado'
+ABIERTO = 'abierto'
+SEMI_ABIERTO = 'semi_abierto'
+
+# Deadline absoluto (time.monotonic) del request en curso; None = sin límite
+_deadline = contextvars.ContextVar('deadline_llamadas_externas', default=None)
+
+
+class LlamadaExternaError(Exception):
+    """La llamada no se hizo: circuito abierto, sin cupo o deadline agotado."""
+    pass
+
+
+@contextmanager
+def deadline(segundos):
+    """
+    Fija un presupuesto de tiempo para todas las llamadas externas del bloque.
+    Si ya existe un deadline más estricto, se conserva ese.
+    """
+    nuevo = time.monotonic() + segundos
+    actual = _deadline.get()
+    token = _deadline.set(nuevo if actual is None else min(actual, nuevo))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def tiempo_restante():
+    limite = _deadline.get()
+    if limite is None:
+        return None
+    return limite - time.monotonic()
+
+
+class _Llamada:
+    def __init__(self, timeout):
+        self.timeout = timeout
+        self.fallida = False
+
+    def marcar_fallo(self):
+        """Para respuestas de error que no lanzan excepción (ej: HTTP 5xx)."""
+        self.fallida = True
+
+
+class GuardiaExterna:
+    def __init__(self, nombre, timeout, max_concurrencia, umbral_fallos, segundos_abierto):
+        self.nombre = nombre
+        self.timeout = timeout
+        self.max_concurrencia = max_concurrencia
+        self.umbral_fallos = umbral_fallos
+        self.segundos_abierto = segundos_abierto
+
+        self._semaforo = threading.BoundedSemaphore(max_concurrencia)
+        self._lock = threading.Lock()
+        self._estado = CERRADO
+        self._fallos_consecutivos = 0
+        self._abierto_desde = 0.0
+        self._prueba_en_curso = False
+        self._en_vuelo = 0
+        self._rechazadas = 0
+
+    # --- CIRCUIT BREAKER ---
+
+    def _admitir(self):
+        with self._lock:
+            if self._estado == ABIERTO:
+                if time.monotonic() - self._abierto_desde < self.segundos_abierto:
+                    self._rechazadas += 1
+                    raise LlamadaExternaError(f"Servicio {self.nombre} no disponible (circuito abierto).")
+                self._estado = SEMI_ABIERTO
+                self._prueba_en_curso = False
+
+            if self._estado == SEMI_ABIERTO:
+                if self._prueba_en_curso:
+                    self._rechazadas += 1
+                    raise LlamadaExternaError(f"Servicio {self.nombre} en recuperación.")
+                self._prueba_en_curso = True
+
+    def _registrar(self, exito):
+        with self._lock:
+            if exito:
+                self._estado = CERRADO
+                self._fallos_consecutivos = 0
+            else:
+                self._fallos_consecutivos += 1
+                if self._estado == SEMI_ABIERTO or self._fallos_consecutivos >= self.umbral_fallos:
+                    self._estado = ABIERTO
+                    self._abierto_desde = time.monotonic()
+            self._prueba_en_curso = False
+
+    def _timeout_efectivo(self):
+        restante = tiempo_restante()
+        if restante is None:
+            return self.timeout
+        if restante <= 0:
+            raise LlamadaExternaError(f"Deadline agotado antes de llamar a {self.nombre}.")
+        return min(self.timeout, restante)
+
+    @contextmanager
+    def llamada(self):
+        """
+        Uso:
+            with guardia('groq').llamada() as llamada:
+                client = Groq(api_key=..., timeout=llamada.timeout)
+        """
+        timeout = self._timeout_efectivo()
+        self._admitir()
+
+        if not self._semaforo.acquire(timeout=timeout):
+            with self._lock:
+                self._rechazadas += 1
+                self._prueba_en_curso = False
+            raise LlamadaExternaError(f"Demasiadas llamadas simultáneas a {self.nombre}.")
+
+        with self._lock:
+            self._en_vuelo += 1
+        # El tiempo esperando cupo se descuenta del presupuesto
+        actual = _Llamada(self._timeout_efectivo_tras_espera(timeout))
+        try:
+            yield actual
+        except BaseException:
+            self._registrar(exito=False)
+            raise
+        else:
+            self._registrar(exito=not actual.fallida)
+        finally:
+            with self._lock:
+                self._en_vuelo -= 1
+            self._semaforo.release()
+
+    def _timeout_efectivo_tras_espera(self, timeout):
+        restante = tiempo_restante()
+        return timeout if restante is None else max(min(timeout, restante), 0.001)
+
+    def estado(self):
+        with self._lock:
+            estado = self._estado
+            if estado == ABIERTO and time.monotonic() - self._abierto_desde >= self.segundos_abierto:
+                estado = SEMI_ABIERTO
+            return {
+                'estado': estado,
+                'fallos_consecutivos': self._fallos_consecutivos,
+                'en_vuelo': self._en_vuelo,
+                'max_concurrencia': self.max_concurrencia,
+                'rechazadas': self._rechazadas,
+                'timeout': self.timeout,
+            }
+
+    def reiniciar(self):
+        with self._lock:
+            self._estado = CERRADO
+            self._fallos_consecutivos = 0
+            self._prueba_en_curso = False
+            self._rechazadas = 0
+
+
+GUARDIAS = {
+    'groq': GuardiaExterna(
+        'groq',
+        timeout=config('GROQ_TIMEOUT', default=30.0, cast=float),
+        max_concurrencia=config('GROQ_MAX_CONCURRENCIA', default=8, cast=int),
+        umbral_fallos=config('GROQ_UMBRAL_FALLOS', default=5, cast=int),
+        segundos_abierto=config('GROQ_SEGUNDOS_ABIERTO', default=30.0, cast=float),
+    ),
+    'resend': GuardiaExterna(
+        'resend',
+        timeout=config('RESEND_TIMEOUT', default=15.0, cast=float),
+        max_concurrencia=config('RESEND_MAX_CONCURRENCIA', default=4, cast=int),
+        umbral_fallos=config('RESEND_UMBRAL_FALLOS', default=3, cast=int),
+        segundos_abierto=config('RESEND_SEGUNDOS_ABIERTO', default=60.0, cast=float),
+    ),
+}
+
+
+def guardia(nombre):
+    return GUARDIAS[nombre]
+
+
+def estado_guardias():
+    return {nombre: g.estado() for nombre, g in GUARDIAS.items()}
@@ -0,0 +1,127 @@
+"""
+Sondas de salud para el balanceador (readiness).
+
+Los resultados se cachean en memoria del proceso durante SALUD_CACHE_SEGUNDOS
+para que un health check cada segundo no se convierta en carga para la BD.
+"""
+import threading
+import time
+import uuid
+
+from decouple import config
+from django.core.cache import caches
+from django.db import connections
+
+from .replicas import estado_replicas
+from .resiliencia import estado_guardias
+
+SALUD_CACHE_SEGUNDOS = config('SALUD_CACHE_SEGUNDOS', default=5.0, cast=float)
+
+_lock = threading.Lock()
+_ultimo_resultado = None
+_ultima_sonda = 0.0
+
+
+def _medir(funcion):
+    inicio = time.perf_counter()
+    try:
+        detalle = funcion() or {}
+        ok = True
+    except Exception as e:
+        detalle = {'error': str(e)}
+        ok = False
+    return {
+        'ok': ok,
+        'latencia_ms': round((time.perf_counter() - inicio) * 1000, 2),
+        **detalle,
+    }
+
+
+def _sonda_db(alias='default'):
+    def sonda():
+        with connections[alias].cursor() as cursor:
+            cursor.execute("SELECT 1")
+            cursor.fetchone()
+    return sonda
+
+
+def modo_conexion(ajustes):
+    """Estrategia de conexión configurada en settings.DATABASES (ver config/settings.py)."""
+    if ajustes.get('OPTIONS', {}).get('pool'):
+        return 'pool'
+    if ajustes.get('DISABLE_SERVER_SIDE_CURSORS'):
+        return 'pgbouncer'
+    if ajustes.get('CONN_MAX_AGE'):
+        return 'persistente'
+    return 'por_request'
+
+
+def estado_conexiones(alias='default'):
+    """Configuración de conexión/pool vigente (no abre conexiones nuevas)."""
+    conexion = connections[alias]
+    ajustes = conexion.settings_dict
+    estado = {
+        'motor': conexion.vendor,
+        'modo': modo_conexion(ajustes),
+        'conn_max_age': ajustes.get('CONN_MAX_AGE'),
+        'conn_health_checks': ajustes.get('CONN_HEALTH_CHECKS'),
+        'conexion_abierta': conexion.connection is not None,
+    }
+    configuracion_pool = ajustes.get('OPTIONS', {}).get('pool')
+    if isinstance(configuracion_pool, dict):
+        estado['pool_config'] = configuracion_pool
+    # Solo si el pool ya existe: acceder a `conexion.pool` lo crearía
+    pool = getattr(conexion, '_connection_pools', {}).get(alias)
+    if pool is not None and hasattr(pool, 'get_stats'):
+        estado['pool'] = pool.get_stats()
+    return estado
+
+
+def _sonda_cache():
+    cache = caches['default']
+    clave = f"salud:{uuid.uuid4().hex}"
+    cache.set(clave, 1, timeout=5)
+    if cache.get(clave) != 1:
+        raise RuntimeError("La caché no devolvió el valor escrito")
+    cache.delete(clave)
+    return {'backend': cache.__class__.__name__}
+
+
+def ejecutar_sondas():
+    db = _medir(_sonda_db())
+    db.update(estado_conexiones())
+    resultado = {
+        'database': db,
+        'cache': _medir(_sonda_cache),
+        'dependencias': estado_guardias(),
+    }
+    # Las réplicas no afectan readiness: si caen, las lecturas vuelven al primario
+    replicas = estado_replicas()
+    if replicas:
+        resultado['replicas'] = {alias: {**estado, **estado_conexiones(alias)} for alias, estado in replicas.items()}
+    return resultado
+
+
+def reporte_salud(forzar=False):
+    """
+    Retorna (listo, detalle). Solo BD y caché determinan readiness: si la IA
+    o el correo están caídos el servicio sigue siendo útil (degradado).
+    """
+    global _ultimo_resultado, _ultima_sonda
+
+    with _lock:
+        vigente = _ultimo_resultado is not None and time.monotonic() - _ultima_sonda < SALUD_CACHE_SEGUNDOS
+        if forzar or not vigente:
+            _ultimo_resultado = ejecutar_sondas()
+            _ultima_sonda = time.monotonic()
+        resultado = _ultimo_resultado
+        edad = time.monotonic() - _ultima_sonda
+
+    listo = resultado['database']['ok'] and resultado['cache']['ok']
+    degradado = any(d['estado'] != 'cerrado' for d in resultado['dependencias'].values())
+    return listo, {
+        'status': 'ready' if listo else 'not_ready',
+        'degradado': degradado,
+        'edad_sonda_s': round(edad, 2),
+        **resultado,
+    }
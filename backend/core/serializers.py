@@ -1,14 +1,26 @@
+from decouple import config
 from rest_framework import serializers
-import re
+from core_domain.dinero import OPERACIONES_PRECIO
+from core_domain.validacion import PATRON_CODIGO
+
+# Tope de elementos por consulta en lote (?nits=, ?ids=, ?empresas= y `ids` de actualizar_precios)
+LOTE_MAX_ELEMENTOS = config('LOTE_MAX_ELEMENTOS', default=500, cast=int)
 
 # --- SERIALIZERS (CLEAN ARCHITECTURE) ---
 
+def campo_version():
+    """Versión leída: en una actualización, alternativa a la cabecera If-Match."""
+    return serializers.IntegerField(min_value=1, required=False)
+
 class EmpresaSerializer(serializers.Serializer):
     # Definimos campos explícitamente
     nit = serializers.CharField(max_length=50)
     nombre = serializers.CharField(max_length=255)
     direccion = serializers.CharField(max_length=255)
     telefono = serializers.CharField(max_length=20)
+    version = campo_version()
+    # Solo presente con ?include=stats
+    stats = serializers.JSONField(read_only=True, required=False)
 
     def validate_nit(self, value):
         if not value:
@@ -23,9 +35,10 @@ class ProductoSerializer(serializers.Serializer):
     # Mapeamos 'empresa_nit' del dominio al campo 'empresa' del JSON
     empresa = serializers.CharField(source='empresa_nit') 
     precios = serializers.JSONField()
+    version = campo_version()
 
     def validate_codigo(self, value):
-        if not re.match(r'^[A-Za-z0-9-_]+$', value):
+        if not PATRON_CODIGO.match(value):
             raise serializers.ValidationError("Sintaxis incorrecta. El código solo permite letras alfanuméricas, guiones (-) y guiones bajos (_).")
         return value
 
@@ -34,6 +47,20 @@ class ProductoSerializer(serializers.Serializer):
             raise serializers.ValidationError("Estructura de datos incorrecta. Se espera JSON.")
         return value
 
+class TasaCambioSerializer(serializers.Serializer):
+    tasa = serializers.DecimalField(max_digits=20, decimal_places=6, min_value=0)
+
+class ActualizacionPreciosSerializer(serializers.Serializer):
+    empresa = serializers.CharField(max_length=50)
+    operacion = serializers.ChoiceField(choices=OPERACIONES_PRECIO)
+    moneda = serializers.CharField(max_length=3)
+    # Requerido salvo para 'convertir' (lo valida la regla del dominio)
+    valor = serializers.DecimalField(max_digits=20, decimal_places=6, required=False)
+    # Filtros opcionales: texto en nombre/código y/o ids concretos
+    buscar = serializers.CharField(max_length=255, required=False, allow_blank=True)
+    ids = serializers.ListField(child=serializers.IntegerField(min_value=1), required=False,
+                                max_length=LOTE_MAX_ELEMENTOS)
+
 class SystemStatusSerializer(serializers.Serializer):
     api = serializers.CharField()
     version = serializers.CharField()
@@ -0,0 +1,72 @@
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.db import transaction
+from django.dispatch import receiver
+
+from . import estadisticas, valoracion
+from .models import EmpresaModel, ProductoModel, TasaCambioModel
+from .tasas import invalidar_tasas
+
+
+def _borrado_de_empresa(origin):
+    # Al borrar una empresa sus productos caen en cascada: no queda resumen que actualizar
+    return (getattr(origin, 'model', None) or type(origin)) is EmpresaModel
+
+
+@receiver(pre_save, sender=ProductoModel)
+def recordar_estado_anterior(sender, instance, **kwargs):
+    # Empresa y precios previos: el resumen refresca también la empresa anterior
+    # y la valoración resta el delta
+    if instance.pk and (estadisticas.EMPRESA_STATS_MATERIALIZADAS or valoracion.VALORACION_INCREMENTAL):
+        anterior = ProductoModel.objects.filter(pk=instance.pk).values_list('empresa_id', 'precios').first()
+        instance._empresa_anterior, instance._precios_anteriores = anterior or (None, None)
+
+
+def refrescar_resumenes(empresa_id, empresa_anterior=None):
+    if not estadisticas.EMPRESA_STATS_MATERIALIZADAS:
+        return
+    estadisticas.programar_refresco(empresa_id)
+    if empresa_anterior and empresa_anterior != empresa_id:
+        estadisticas.programar_refresco(empresa_anterior)
+
+
+def aplicar_valoracion(empresa_id, precios, empresa_anterior=None, precios_anteriores=None):
+    if not valoracion.VALORACION_INCREMENTAL:
+        return
+    if empresa_anterior and empresa_anterior != empresa_id:
+        valoracion.aplicar_cambio(empresa_anterior, anteriores=precios_anteriores)
+        precios_anteriores = None
+    valoracion.aplicar_cambio(empresa_id, anteriores=precios_anteriores, nuevos=precios)
+
+
+def producto_actualizado(empresa_id, precios, empresa_anterior, precios_anteriores):
+    """Lo mismo que post_save, para actualizaciones con queryset.update() (sin signals)."""
+    refrescar_resumenes(empresa_id, empresa_anterior)
+    aplicar_valoracion(empresa_id, precios, empresa_anterior, precios_anteriores)
+
+
+@receiver(post_save, sender=ProductoModel)
+@receiver(post_delete, sender=ProductoModel)
+def refrescar_resumen_empresa(sender, instance, origin=None, **kwargs):
+    if not _borrado_de_empresa(origin):
+        refrescar_resumenes(instance.empresa_id, getattr(instance, '_empresa_anterior', None))
+
+
+@receiver(post_save, sender=ProductoModel)
+def actualizar_valoracion(sender, instance, **kwargs):
+    aplicar_valoracion(
+        instance.empresa_id, instance.precios,
+        getattr(instance, '_empresa_anterior', None), getattr(instance, '_precios_anteriores', None),
+    )
+
+
+@receiver(post_delete, sender=ProductoModel)
+def descontar_valoracion(sender, instance, origin=None, **kwargs):
+    if valoracion.VALORACION_INCREMENTAL and not _borrado_de_empresa(origin):
+        valoracion.aplicar_cambio(instance.empresa_id, anteriores=instance.precios)
+
+
+@receiver(post_save, sender=TasaCambioModel)
+@receiver(post_delete, sender=TasaCambioModel)
+def invalidar_tabla_tasas(sender, instance, **kwargs):
+    # Tasas editadas desde el admin o la API: recargar al confirmar
+    transaction.on_commit(invalidar_tasas)
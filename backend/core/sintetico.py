@@ -0,0 +1,94 @@
+"""
+Generador de datos sintéticos (empresas y productos multimoneda).
+
+Es determinístico para una misma semilla, así los benchmarks y pruebas de
+carga son comparables entre commits. Todo se produce con generadores para
+poder crear catálogos grandes en memoria acotada.
+"""
+import random
+from itertools import islice
+
+from .models import EmpresaModel, ProductoModel
+
+TASA_USD = 4150
+TASA_EUR = 4400
+
+RUBROS = {
+    "TEC": ("Tecnología", ["Laptop", "Monitor", "Mouse", "Teclado", "Tablet", "Servidor", "Router", "Audífonos"]),
+    "ALI": ("Alimentos", ["Huevo", "Pollo", "Arroz", "Café", "Queso", "Leche", "Panela", "Chocolate"]),
+    "CON": ("Construcción", ["Cemento", "Varilla", "Ladrillo", "Taladro", "Pintura", "Tubo PVC", "Estuco", "Casco"]),
+    "ROP": ("Textil", ["Camisa", "Pantalón", "Chaqueta", "Zapatos", "Gorra", "Medias", "Vestido", "Bufanda"]),
+}
+ADJETIVOS = ["Pro", "Plus", "Max", "Lite", "Premium", "Básico", "Industrial", "Eco", "Ultra", "Compacto"]
+CARACTERISTICAS = [
+    "Garantía 12 meses", "Empaque individual", "Importado", "Producción nacional",
+    "Alta resistencia", "Edición limitada", "Uso profesional", "Bajo consumo",
+]
+
+
+def nit_sintetico(indice):
+    """NIT válido para la entidad Empresa (dígitos y guion)."""
+    return f"{800000000 + indice}-{indice % 10}"
+
+
+def generar_empresas(cantidad, semilla=0, inicio=0):
+    rng = random.Random(semilla)
+    for i in range(inicio, inicio + cantidad):
+        prefijo = list(RUBROS)[i % len(RUBROS)]
+        yield EmpresaModel(
+            nit=nit_sintetico(i),
+            nombre=f"{RUBROS[prefijo][0]} Sintética {i} S.A.S",
+            direccion=f"Calle {rng.randint(1, 199)} # {rng.randint(1, 99)}-{rng.randint(1, 99)}",
+            telefono=f"60{rng.randint(10000000, 99999999)}",
+        )
+
+
+def precios_sinteticos(rng):
+    """Precio base en COP y equivalentes; no todos los productos tienen las tres monedas."""
+    cop = rng.randint(1, 5000) * 1000
+    precios = {"COP": cop}
+    if rng.random() < 0.7:
+        precios["USD"] = round(cop / TASA_USD, 2)
+    if rng.random() < 0.4:
+        precios["EUR"] = round(cop / TASA_EUR, 2)
+    return precios
+
+
+def generar_productos(nit, cantidad, semilla=0):
+    rng = random.Random(f"{semilla}:{nit}")
+    indice_empresa = int(nit.split('-')[0]) - 800000000
+    prefijo = list(RUBROS)[indice_empresa % len(RUBROS)]
+    catalogo = RUBROS[prefijo][1]
+    for i in range(cantidad):
+        yield ProductoModel(
+            codigo=f"{prefijo}-{indice_empresa:06d}-{i:07d}",
+            nombre=f"{rng.choice(catalogo)} {rng.choice(ADJETIVOS)} {i}",
+            caracteristicas=", ".join(rng.sample(CARACTERISTICAS, 2)),
+            empresa_id=nit,
+            precios=precios_sinteticos(rng),
+        )
+
+
+def en_lotes(iterable, tamano):
+    iterador = iter(iterable)
+    while True:
+        lote = list(islice(iterador, tamano))
+        if not lote:
+            return
+        yield lote
+
+
+def poblar(empresas, productos_por_empresa, semilla=0, tamano_lote=1000, inicio=0, using='default'):
+    """
+    Inserta empresas y productos con bulk_create por lotes.
+    Retorna (empresas_creadas, productos_creados).
+    """
+    total_empresas = total_productos = 0
+    for lote in en_lotes(generar_empresas(empresas, semilla, inicio), tamano_lote):
+        EmpresaModel.objects.using(using).bulk_create(lote)
+        total_empresas += len(lote)
+        for empresa in lote:
+            for lote_prod in en_lotes(generar_productos(empresa.nit, productos_por_empresa, semilla), tamano_lote):
+                ProductoModel.objects.using(using).bulk_create(lote_prod)
+                total_productos += len(lote_prod)
+    return total_empresas, total_productos
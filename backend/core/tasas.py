@@ -0,0 +1,52 @@
+"""
+Tabla de tasas de cambio en memoria.
+
+Se carga de `tasas_cambio` en la primera conversión y se reutiliza durante
+TASAS_CACHE_SEGUNDOS. Guardar una tasa (API o admin) la invalida en este
+proceso al confirmar la transacción; los demás workers la recargan al vencer
+el TTL.
+"""
+import threading
+import time
+
+from decouple import config
+
+from core_domain.dinero import TablaTasas
+
+from .models import TasaCambioModel
+
+TASAS_CACHE_SEGUNDOS = config('TASAS_CACHE_SEGUNDOS', default=60.0, cast=float)
+
+_lock = threading.Lock()
+_tabla = None
+_vence = 0.0
+
+
+def cargar_tabla():
+    return TablaTasas(dict(TasaCambioModel.objects.values_list('moneda', 'tasa')))
+
+
+def tabla_tasas():
+    """Tabla vigente; solo consulta la BD si no hay una en memoria o venció."""
+    global _tabla, _vence
+    tabla = _tabla
+    if tabla is not None and time.monotonic() < _vence:
+        return tabla
+    with _lock:
+        if _tabla is None or time.monotonic() >= _vence:
+            _tabla = cargar_tabla()
+            _vence = time.monotonic() + TASAS_CACHE_SEGUNDOS
+        return _tabla
+
+
+def invalidar_tasas():
+    global _tabla
+    with _lock:
+        _tabla = None
+
+
+def guardar_tasa(moneda, tasa):
+    # El signal post_save vuelve a invalidar al confirmar la transacción
+    TasaCambioModel.objects.update_or_create(moneda=moneda, defaults={'tasa': tasa})
+    invalidar_tasas()
+    return tabla_tasas()
@@ -33,6 +33,19 @@ from core.models import EmpresaModel, ProductoModel
 from core.serializers import EmpresaSerializer, ProductoSerializer
 
 
+# ============================================================================
+# UTILIDADES DE PRUEBA
+# ============================================================================
+
+def autenticar(client, email="usuario@test.com", staff=False):
+    """Crea un usuario y deja su access token en las cabeceras de `client`."""
+    from rest_framework_simplejwt.tokens import RefreshToken
+    from users.models import User
+    usuario = User.objects.create_user(email=email, password="clave-test-123", is_staff=staff)
+    client.defaults['HTTP_AUTHORIZATION'] = f"Bearer {RefreshToken.for_user(usuario).access_token}"
+    return usuario
+
+
 # ============================================================================
 # 1. TESTS DE ENTIDADES DEL DOMINIO
 # ============================================================================
@@ -897,6 +910,1877 @@ class TestEdgeCases:
         assert "16GB" in producto.caracteristicas
 
 
+# ============================================================================
+# 9. TESTS DEL PIPELINE DE VOZ (STREAMING)
+# ============================================================================
+
+class TestPipelineVoz:
+    """Pruebas de límites y streaming del audio enviado a Whisper."""
+
+    def test_validar_audio_sin_archivo(self):
+        """✓ Debe reportar error si no llega archivo."""
+        from core.ai import validar_audio
+        assert validar_audio(None).status == 400
+
+    def test_validar_audio_excede_tamano(self):
+        """✓ Debe rechazar audios más grandes que el límite, sin leerlos."""
+        from core.ai import validar_audio, AUDIO_MAX_BYTES
+        archivo = Mock(size=AUDIO_MAX_BYTES + 1)
+        error = validar_audio(archivo)
+        assert "tamaño máximo" in error.mensaje and error.status == 413
+        archivo.read.assert_not_called()
+
+    def test_validar_audio_excede_duracion(self):
+        """✓ Debe rechazar si la duración declarada supera el máximo."""
+        from core.ai import validar_audio, AUDIO_MAX_SEGUNDOS
+        archivo = Mock(size=1000)
+        assert "duración máxima" in validar_audio(archivo, str(AUDIO_MAX_SEGUNDOS + 1)).mensaje
+        assert validar_audio(archivo, "5") is None
+
+    def test_validar_audio_duracion_invalida(self):
+        """✓ Duraciones no numéricas, negativas, NaN o infinitas son 400, no 413."""
+        from core.ai import validar_audio
+        archivo = Mock(size=1000)
+        for duracion in ("abc", "-5", "nan", "inf"):
+            assert validar_audio(archivo, duracion).status == 400
+
+    @pytest.mark.django_db
+    def test_content_length_se_revisa_antes_de_leer(self):
+        """✓ Un cuerpo declarado mayor al límite se rechaza con 413 sin parsear el multipart."""
+        from unittest.mock import patch
+        from rest_framework.test import APIClient
+        from core.ai import AUDIO_MAX_BYTES, AUDIO_MARGEN_MULTIPART_BYTES, cuerpo_excede_limite
+        assert cuerpo_excede_limite(str(AUDIO_MAX_BYTES + AUDIO_MARGEN_MULTIPART_BYTES + 1))
+        assert not cuerpo_excede_limite(None) and not cuerpo_excede_limite("x")
+
+        client = APIClient()
+        autenticar(client, "voz@test.com")
+        with patch('core.views.validar_audio') as validar:
+            response = client.post('/api/productos/interpretar_voz/', b'',
+                                   content_type='multipart/form-data; boundary=x',
+                                   CONTENT_LENGTH=str(AUDIO_MAX_BYTES * 2))
+        assert response.status_code == 413
+        validar.assert_not_called()
+
+    def test_transcripcion_usa_stream_sin_read(self):
+        """✓ Whisper debe recibir un file-like, no los bytes completos."""
+        from unittest.mock import patch
+        from django.core.files.uploadedfile import SimpleUploadedFile
+        from core import ai
+
+        archivo = SimpleUploadedFile("nota.webm", b"x" * 2048, content_type="audio/webm")
+        client = MagicMock()
+        client.audio.transcriptions.create.return_value = Mock(text="producto prueba")
+
+        with patch.object(ai, 'config', return_value='key'), \
+             patch.object(ai, 'Groq', return_value=client), \
+             patch.object(ai, 'analizar_texto_producto', return_value={"nombre": "prueba"}) as analizar:
+            resultado = ai.procesar_audio_con_ia(archivo)
+
+        nombre, stream = client.audio.transcriptions.create.call_args.kwargs['file']
+        assert nombre == "nota.webm"
+        assert not isinstance(stream, bytes)
+        analizar.assert_called_once_with("producto prueba")
+        assert resultado == {"nombre": "prueba"}
+        assert archivo.closed
+
+
+# ============================================================================
+# 10. TESTS DEL PARSER LOCAL DE VOZ (FAST-PATH)
+# ============================================================================
+
+class TestParserVozLocal:
+    """Pruebas del extractor local que evita llamar al LLM."""
+
+    def test_palabras_a_numero(self):
+        """✓ Debe convertir números dictados en español."""
+        from core.parser_voz import palabras_a_numero
+        assert palabras_a_numero(['cincuenta', 'mil']) == 50000
+        assert palabras_a_numero(['dos', 'millones', 'quinientos', 'mil']) == 2500000
+        assert palabras_a_numero(['ciento', 'veinte', 'mil', 'trescientos']) == 120300
+        assert palabras_a_numero(['treinta', 'y', 'cinco']) == 35
+        assert palabras_a_numero(['mil']) == 1000
+
+    def test_extraer_dictado_completo(self):
+        """✓ Debe extraer todos los campos de un dictado con estructura estándar."""
+        from core.parser_voz import extraer_producto_local
+        datos = extraer_producto_local(
+            "producto Mouse inalámbrico código MOU-001 precio cincuenta mil pesos"
+        )
+        assert datos == {
+            "nombre": "Mouse inalámbrico",
+            "codigo": "MOU-001",
+            "caracteristicas": "",
+            "precio": 50000,
+            "moneda": "COP",
+        }
+
+    def test_extraer_codigo_dictado_y_precio_en_digitos(self):
+        """✓ Debe compactar códigos deletreados y entender precios con separador de miles."""
+        from core.parser_voz import extraer_producto_local
+        datos = extraer_producto_local(
+            "Producto: Teclado, código t e c guion cero cero dos, características RGB, precio 19.99 dólares"
+        )
+        assert datos["codigo"] == "TEC-002"
+        assert datos["caracteristicas"] == "RGB"
+        assert datos["precio"] == 19.99
+        assert datos["moneda"] == "USD"
+
+    def test_precio_con_miles_y_decimales(self):
+        """✓ Debe leer el token numérico completo, incluidos los decimales tras los miles."""
+        from core.parser_voz import parsear_precio
+        assert parsear_precio("1.234.567,89 pesos") == (Decimal("1234567.89"), "COP")
+        assert parsear_precio("1,234.56 usd") == (Decimal("1234.56"), "USD")
+        assert parsear_precio("$25.000") == (Decimal("25000"), None)
+
+    def test_precio_ambiguo_se_delega_al_llm(self):
+        """✓ Ceros a la izquierda o cantidades sin interpretar no dan un precio equivocado."""
+        from core.parser_voz import extraer_producto_local, parsear_precio
+        assert parsear_precio("0.001 dólares") == (None, None)
+        assert parsear_precio("150000 pesos con 50 centavos") == (None, None)
+        assert parsear_precio("cincuenta mil pesos con cincuenta centavos") == (None, None)
+        assert extraer_producto_local("producto Silla código SIL-1 precio 0.001 dólares") is None
+        assert extraer_producto_local("producto Silla código SIL-1 precio 150000 pesos con 50 centavos") is None
+
+    def test_baja_confianza_retorna_none(self):
+        """✓ Si falta un campo obligatorio, se delega al LLM."""
+        from core.parser_voz import extraer_producto_local
+        assert extraer_producto_local("quiero agregar algo bonito") is None
+        assert extraer_producto_local("producto Silla precio 100") is None
+
+    def test_clave_repetida_o_dentro_de_un_valor_se_delega_al_llm(self):
+        """✓ Palabras clave dentro del nombre o campos repetidos no producen datos truncados."""
+        from core.parser_voz import extraer_producto_local
+        assert extraer_producto_local("producto Camisa de referencia alta código C1 precio 100 pesos") is None
+        assert extraer_producto_local("producto Tarjeta de valor agregado código TV1 precio 5000 pesos") is None
+        assert extraer_producto_local("producto Silla código SIL-1 precio 100 pesos precio 200 dolares") is None
+
+    def test_analizar_texto_no_llama_llm_en_fast_path(self):
+        """✓ El LLM no se consulta cuando el parser local resuelve el dictado."""
+        from unittest.mock import patch
+        from core import ai
+        from core.parser_voz import estadisticas_parser
+
+        antes = estadisticas_parser()
+        with patch.object(ai, 'Groq') as groq:
+            datos = ai.analizar_texto_producto("producto Silla código SIL-1 precio 300 mil pesos")
+        groq.assert_not_called()
+        assert datos["precio"] == 300000
+        assert estadisticas_parser()["local"] == antes["local"] + 1
+
+
+# ============================================================================
+# 11. TESTS DE PROTECCIÓN DE LLAMADAS EXTERNAS (CIRCUIT BREAKER)
+# ============================================================================
+
+class TestGuardiaExterna:
+    """Pruebas del circuit breaker, límite de concurrencia y deadline."""
+
+    def _guardia(self, **kwargs):
+        from core.resiliencia import GuardiaExterna
+        params = dict(timeout=5.0, max_concurrencia=2, umbral_fallos=2, segundos_abierto=60.0)
+        params.update(kwargs)
+        return GuardiaExterna('prueba', **params)
+
+    def _fallar(self, guardia):
+        with pytest.raises(RuntimeError):
+            with guardia.llamada():
+                raise RuntimeError("upstream caído")
+
+    def test_circuito_se_abre_tras_fallos(self):
+        """✓ Tras N fallos seguidos debe fallar rápido sin llamar al upstream."""
+        from core.resiliencia import LlamadaExternaError
+        guardia = self._guardia()
+        self._fallar(guardia)
+        self._fallar(guardia)
+        assert guardia.estado()['estado'] == 'abierto'
+
+        with pytest.raises(LlamadaExternaError, match="circuito abierto"):
+            with guardia.llamada():
+                pytest.fail("No debió ejecutarse la llamada")
+        assert guardia.estado()['rechazadas'] == 1
+
+    def test_circuito_semi_abierto_se_cierra_con_exito(self):
+        """✓ Pasado el tiempo de espera, una llamada exitosa cierra el circuito."""
+        guardia = self._guardia(segundos_abierto=0.0)
+        self._fallar(guardia)
+        self._fallar(guardia)
+        with guardia.llamada():
+            pass
+        assert guardia.estado()['estado'] == 'cerrado'
+
+    def test_marcar_fallo_sin_excepcion(self):
+        """✓ Respuestas 5xx cuentan como fallo aunque no lancen excepción."""
+        guardia = self._guardia(umbral_fallos=1)
+        with guardia.llamada() as llamada:
+            llamada.marcar_fallo()
+        assert guardia.estado()['estado'] == 'abierto'
+
+    def test_limite_concurrencia(self):
+        """✓ Sin cupo en el semáforo, la llamada se rechaza al vencer el timeout."""
+        from core.resiliencia import LlamadaExternaError
+        guardia = self._guardia(max_concurrencia=1, timeout=0.01)
+        with guardia.llamada():
+            with pytest.raises(LlamadaExternaError, match="simultáneas"):
+                with guardia.llamada():
+                    pass
+
+    def test_deadline_acota_timeout(self):
+        """✓ El timeout efectivo nunca supera el tiempo restante del request."""
+        from core.resiliencia import deadline, LlamadaExternaError
+        guardia = self._guardia(timeout=30.0)
+        with deadline(1.0):
+            with guardia.llamada() as llamada:
+                assert llamada.timeout <= 1.0
+        with deadline(-1):
+            with pytest.raises(LlamadaExternaError, match="Deadline"):
+                with guardia.llamada():
+                    pass
+
+
+# ============================================================================
+# 12. TESTS DE SALUD (LIVENESS / READINESS)
+# ============================================================================
+
+class TestSaludSistema(TestCase):
+    """Pruebas de las sondas de salud del endpoint /api/system/."""
+
+    def test_liveness_no_consulta_bd(self):
+        """✓ Liveness responde sin ejecutar consultas."""
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/system/liveness/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['status'], 'alive')
+
+    def test_readiness_reporta_latencias(self):
+        """✓ Readiness mide BD y caché e incluye el estado de dependencias externas."""
+        from core.salud import reporte_salud
+        reporte_salud(forzar=True)
+        autenticar(self.client, "salud@test.com", staff=True)
+        response = self.client.get('/api/system/readiness/')
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertTrue(data['database']['ok'])
+        self.assertIn('latencia_ms', data['database'])
+        self.assertTrue(data['cache']['ok'])
+        self.assertIn('groq', data['dependencias'])
+
+    def test_readiness_usa_resultado_cacheado(self):
+        """✓ Dentro de la ventana de caché no se vuelve a sondear la BD."""
+        from core.salud import reporte_salud
+        reporte_salud(forzar=True)
+        with self.assertNumQueries(0):
+            self.client.get('/api/system/readiness/')
+
+    def test_readiness_503_si_bd_caida(self):
+        """✓ Si la BD no responde, el servicio no está listo."""
+        from unittest.mock import patch
+        from core import salud
+
+        def sonda_fallida():
+            raise RuntimeError("sin conexión")
+
+        with patch.object(salud, '_sonda_db', return_value=sonda_fallida), \
+                patch.dict('os.environ', {'SALUD_TOKEN': 'token-salud'}):
+            salud.reporte_salud(forzar=True)
+            anonimo = self.client.get('/api/system/readiness/')
+            response = self.client.get('/api/system/readiness/', HTTP_X_SALUD_TOKEN='token-salud')
+        salud.reporte_salud(forzar=True)
+        self.assertEqual(anonimo.status_code, 503)
+        self.assertEqual(response.status_code, 503)
+        self.assertFalse(response.json()['database']['ok'])
+
+    def test_detalle_oculto_para_anonimos(self):
+        """✓ Sin staff ni SALUD_TOKEN solo se ve status/degradado (sin errores ni topología)."""
+        from unittest.mock import patch
+        from core.salud import reporte_salud
+        reporte_salud(forzar=True)
+        with patch.dict('os.environ', {'SALUD_TOKEN': 'token-salud'}):
+            readiness = self.client.get('/api/system/readiness/', HTTP_X_SALUD_TOKEN='otro')
+        self.assertEqual(set(readiness.json()), {'status', 'degradado'})
+        estado = self.client.get('/api/system/').json()
+        for clave in ('database', 'dependencias', 'parser_voz'):
+            self.assertNotIn(clave, estado)
+        autenticar(self.client, "salud@test.com", staff=True)
+        self.assertIn('dependencias', self.client.get('/api/system/').json())
+
+    def test_modo_de_conexion_reportado(self):
+        """✓ Readiness expone la estrategia de conexión configurada."""
+        from core.salud import modo_conexion, reporte_salud
+        self.assertEqual(modo_conexion({'OPTIONS': {'pool': {'max_size': 10}}, 'CONN_MAX_AGE': 0}), 'pool')
+        self.assertEqual(modo_conexion({'DISABLE_SERVER_SIDE_CURSORS': True, 'CONN_MAX_AGE': 60}), 'pgbouncer')
+        self.assertEqual(modo_conexion({'CONN_MAX_AGE': 60}), 'persistente')
+        self.assertEqual(modo_conexion({'CONN_MAX_AGE': 0}), 'por_request')
+
+        _, detalle = reporte_salud(forzar=True)
+        self.assertIn('modo', detalle['database'])
+        self.assertIn('conn_health_checks', detalle['database'])
+
+
+# ============================================================================
+# 13. TESTS DE MÉTRICAS (FORMATO PROMETHEUS)
+# ============================================================================
+
+class TestMetricas(TestCase):
+    """Pruebas del registro de métricas y del endpoint de exportación."""
+
+    def test_histograma_formato_prometheus(self):
+        """✓ Los buckets deben ser acumulativos e incluir +Inf, _sum y _count."""
+        from core.metricas import Histograma
+        h = Histograma('prueba_seconds', 'Prueba', buckets=(0.1, 1.0))
+        h.observar(0.05, ruta='a')
+        h.observar(0.5, ruta='a')
+        lineas = list(h.exportar())
+        assert 'prueba_seconds_bucket{ruta="a",le="0.1"} 1' in lineas
+        assert 'prueba_seconds_bucket{ruta="a",le="1"} 2' in lineas
+        assert 'prueba_seconds_bucket{ruta="a",le="+Inf"} 2' in lineas
+        assert 'prueba_seconds_count{ruta="a"} 2' in lineas
+
+    def test_cronometro_registra_errores(self):
+        """✓ El cronómetro etiqueta el resultado de la operación."""
+        from core.metricas import cronometro, OPERACION_LATENCIA
+        antes = OPERACION_LATENCIA.conteo(operacion='test_op', resultado='error')
+        with pytest.raises(ValueError):
+            with cronometro('test_op'):
+                raise ValueError("falla")
+        assert OPERACION_LATENCIA.conteo(operacion='test_op', resultado='error') == antes + 1
+
+    def test_middleware_registra_ruta_y_consultas(self):
+        """✓ Cada request queda registrado por view_name con sus consultas SQL."""
+        from core.metricas import HTTP_REQUESTS, DB_CONSULTAS
+        antes = HTTP_REQUESTS.valor(ruta='system-readiness', metodo='GET', status=200)
+        consultas_antes = DB_CONSULTAS.conteo(ruta='system-readiness')
+        self.client.get('/api/system/readiness/')
+        assert HTTP_REQUESTS.valor(ruta='system-readiness', metodo='GET', status=200) == antes + 1
+        assert DB_CONSULTAS.conteo(ruta='system-readiness') == consultas_antes + 1
+
+    def test_endpoint_metrics_texto_plano(self):
+        """✓ /api/system/metrics/ expone las métricas en texto plano."""
+        from unittest.mock import patch
+        self.client.get('/api/system/liveness/')
+        with patch.dict('os.environ', {'METRICS_TOKEN': 'token-metricas'}):
+            response = self.client.get('/api/system/metrics/', HTTP_X_METRICS_TOKEN='token-metricas')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain'))
+        contenido = response.content.decode()
+        self.assertIn('# TYPE http_request_duration_seconds histogram', contenido)
+        self.assertIn('http_requests_total{metodo="GET",ruta="system-liveness",status="200"}', contenido)
+        self.assertIn('external_circuit_state{dependencia="groq"} 0', contenido)
+
+    def test_endpoint_metrics_requiere_staff_o_token(self):
+        """✓ Sin METRICS_TOKEN configurado solo staff ve las métricas; un token incorrecto no basta."""
+        from unittest.mock import patch
+        self.assertEqual(self.client.get('/api/system/metrics/').status_code, 401)
+        with patch.dict('os.environ', {'METRICS_TOKEN': 'token-metricas'}):
+            incorrecto = self.client.get('/api/system/metrics/', HTTP_X_METRICS_TOKEN='otro')
+        self.assertEqual(incorrecto.status_code, 401)
+        autenticar(self.client, "metricas@test.com")
+        self.assertEqual(self.client.get('/api/system/metrics/').status_code, 403)
+        autenticar(self.client, "metricas-staff@test.com", staff=True)
+        self.assertEqual(self.client.get('/api/system/metrics/').status_code, 200)
+
+
+# ============================================================================
+# 14. TESTS DE PERFILADO BAJO DEMANDA
+# ============================================================================
+
+class TestPerfilado(TestCase):
+    """Pruebas del modo de perfilado opt-in para staff."""
+
+    def setUp(self):
+        import tempfile
+        from unittest.mock import patch
+        from rest_framework_simplejwt.tokens import RefreshToken
+        from users.models import User
+
+        self.directorio = tempfile.mkdtemp()
+        patcher = patch('core.perfilado.PERFILES_DIR', self.directorio)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        EmpresaModel.objects.create(nit="900555444-1", nombre="Perfil SAS", direccion="Calle 1", telefono="3001234567")
+        self.admin = User.objects.create_superuser(email="admin@perfil.com", password="adminpass123")
+        self.visitante = User.objects.create_user(email="user@perfil.com", password="userpass123")
+        self.token_admin = str(RefreshToken.for_user(self.admin).access_token)
+        self.token_visitante = str(RefreshToken.for_user(self.visitante).access_token)
+
+    def _get(self, token, **extra):
+        return self.client.get(
+            '/api/productos/?empresa=900555444-1',
+            HTTP_AUTHORIZATION=f"Bearer {token}",
+            **extra
+        )
+
+    def test_staff_genera_perfil_con_origen_sql(self):
+        """✓ El perfil guarda las consultas SQL con el método del adaptador que las originó."""
+        import json, os
+        response = self._get(self.token_admin, HTTP_X_PROFILE='1')
+        self.assertEqual(response.status_code, 200)
+        id_perfil = response['X-Profile-Id']
+        self.assertTrue(os.path.exists(os.path.join(self.directorio, f"{id_perfil}.prof")))
+
+        with open(os.path.join(self.directorio, f"{id_perfil}.json"), encoding='utf-8') as f:
+            datos = json.load(f)
+        origenes = [c['origen'] for c in datos['consultas'] if c['origen']]
+        self.assertTrue(any(o.startswith('DjangoProductoRepository.list_by_empresa') for o in origenes))
+
+    def test_usuario_no_staff_no_perfila(self):
+        """✓ Un usuario sin is_staff no puede activar el perfilado."""
+        response = self._get(self.token_visitante, HTTP_X_PROFILE='1')
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('X-Profile-Id', response)
+
+    def test_descarga_solo_staff(self):
+        """✓ Los artefactos solo se listan/descargan con permisos de staff."""
+        id_perfil = self._get(self.token_admin, HTTP_X_PROFILE='1')['X-Profile-Id']
+        auth = {'HTTP_AUTHORIZATION': f"Bearer {self.token_admin}"}
+
+        listado = self.client.get('/api/perfiles/', **auth)
+        self.assertEqual(listado.json()[0]['id'], id_perfil)
+        descarga = self.client.get(f'/api/perfiles/{id_perfil}/?formato=prof', **auth)
+        self.assertEqual(descarga.status_code, 200)
+
+        prohibido = self.client.get('/api/perfiles/', HTTP_AUTHORIZATION=f"Bearer {self.token_visitante}")
+        self.assertEqual(prohibido.status_code, 403)
+
+    def test_limite_de_tasa(self):
+        """✓ Sin cupo, el request se atiende normalmente sin perfilar."""
+        from unittest.mock import patch
+        with patch('core.perfilado.PERFILES_MAX_POR_MINUTO', 0):
+            response = self._get(self.token_admin, HTTP_X_PROFILE='1')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['X-Profile-Id'], 'omitido')
+
+    def test_perfilador_ocupado_no_gasta_cupo(self):
+        """✓ Si otro perfil está en curso, el request no consume cupo de la ventana."""
+        from core import perfilado
+        with perfilado._lock_perfilador:
+            antes = len(perfilado._inicios_recientes)
+            response = self._get(self.token_admin, HTTP_X_PROFILE='1')
+            self.assertEqual(len(perfilado._inicios_recientes), antes)
+        self.assertEqual(response['X-Profile-Id'], 'omitido')
+
+
+# ============================================================================
+# 15. TESTS DEL SEED SINTÉTICO
+# ============================================================================
+
+class TestSeedSintetico(TestCase):
+    """Pruebas del modo de generación masiva de seed_db."""
+
+    def _seed(self, **kwargs):
+        from io import StringIO
+        from django.core.management import call_command
+        salida = StringIO()
+        call_command('seed_db', stdout=salida, **kwargs)
+        return salida.getvalue()
+
+    def test_genera_catalogo_sin_borrar_datos(self):
+        """✓ Crea N empresas x M productos y conserva los datos existentes."""
+        EmpresaModel.objects.create(nit="900111222-3", nombre="Existente", direccion="Dir", telefono="3001234567")
+        salida = self._seed(companies=3, products_per_company=4, seed=7, batch_size=2)
+
+        self.assertEqual(EmpresaModel.objects.count(), 4)
+        self.assertEqual(ProductoModel.objects.count(), 12)
+        self.assertIn("filas/s", salida)
+
+    def test_datos_reproducibles_y_validos(self):
+        """✓ La misma semilla produce el mismo catálogo, válido para las entidades."""
+        from core.sintetico import generar_productos, nit_sintetico
+        a = [(p.codigo, p.nombre, p.precios) for p in generar_productos(nit_sintetico(5), 10, semilla=3)]
+        b = [(p.codigo, p.nombre, p.precios) for p in generar_productos(nit_sintetico(5), 10, semilla=3)]
+        self.assertEqual(a, b)
+
+        self._seed(companies=2, products_per_company=3, seed=3)
+        for empresa in EmpresaModel.objects.all():
+            Empresa(nit=empresa.nit, nombre=empresa.nombre, direccion=empresa.direccion, telefono=empresa.telefono)
+        self.assertTrue(all('COP' in p.precios for p in ProductoModel.objects.all()))
+
+    def test_wipe_explicito(self):
+        """✓ Solo con --wipe se eliminan los datos previos."""
+        self._seed(companies=2, products_per_company=2)
+        self._seed(companies=1, products_per_company=1, offset=10, wipe=True)
+        self.assertEqual(EmpresaModel.objects.count(), 1)
+        self.assertEqual(ProductoModel.objects.count(), 1)
+
+
+# ============================================================================
+# 16. TESTS DEL HARNESS DE PRUEBAS DE CARGA
+# ============================================================================
+
+class TestLoadTest:
+    """Pruebas de la configuración y el resumen del comando load_test."""
+
+    def test_parsear_mezcla(self):
+        """✓ La mezcla se interpreta como pesos por operación."""
+        from core.management.commands.load_test import parsear_mezcla
+        assert parsear_mezcla("empresas=3,chat=1") == {"empresas": 3.0, "chat": 1.0}
+
+    def test_parsear_mezcla_invalida(self):
+        """✓ Operaciones desconocidas deben rechazarse."""
+        from django.core.management.base import CommandError
+        from core.management.commands.load_test import parsear_mezcla
+        with pytest.raises(CommandError):
+            parsear_mezcla("borrar_todo=1")
+
+    def test_resumen_percentiles_y_errores(self):
+        """✓ El resumen calcula percentiles, throughput y tasa de error por operación."""
+        from core.management.commands.load_test import resumir
+        muestras = [("empresas", i / 1000, True) for i in range(1, 101)] + [("chat", 0.5, False)]
+        resumen = resumir(muestras, duracion=10)
+
+        assert resumen["global"]["requests"] == 101
+        assert resumen["operaciones"]["empresas"]["p50_ms"] == 50.0
+        assert resumen["operaciones"]["empresas"]["p99_ms"] == 99.0
+        assert resumen["operaciones"]["chat"]["tasa_error"] == 1.0
+        assert resumen["global"]["rps"] == 10.1
+
+
+# ============================================================================
+# 17. TESTS DE AUTENTICACIÓN JWT CACHEADA
+# ============================================================================
+
+class TestCachedJWTAuthentication(TestCase):
+    """Pruebas de la autenticación JWT sin SELECT de usuario por request."""
+
+    def setUp(self):
+        from users.models import User
+        self.admin = User.objects.create_superuser(email="cache@admin.com", password="adminpass123")
+        response = self.client.post(
+            '/api/auth/login/', {"email": "cache@admin.com", "password": "adminpass123"},
+            content_type='application/json'
+        )
+        self.access = response.json()['access']
+        self.auth = {'HTTP_AUTHORIZATION': f"Bearer {self.access}"}
+
+    def test_token_incluye_claims_de_autorizacion(self):
+        """✓ El token firmado lleva is_staff e is_active."""
+        from rest_framework_simplejwt.tokens import AccessToken
+        token = AccessToken(self.access)
+        self.assertTrue(token['is_staff'])
+        self.assertTrue(token['is_active'])
+
+    def test_usuario_cacheado_entre_requests(self):
+        """✓ Solo el primer request consulta la tabla de usuarios."""
+        with self.assertNumQueries(2):
+            self.client.get('/api/empresas/', **self.auth)
+        with self.assertNumQueries(1):
+            self.client.get('/api/empresas/', **self.auth)
+
+    def test_invalidacion_al_modificar_usuario(self):
+        """✓ Cambiar el usuario invalida la caché (ej: quitar is_staff)."""
+        self.client.get('/api/empresas/', **self.auth)
+        self.admin.is_staff = False
+        self.admin.save()
+
+        response = self.client.post('/api/empresas/', {
+            "nit": "900123123-1", "nombre": "X", "direccion": "Y", "telefono": "3001234567"
+        }, content_type='application/json', **self.auth)
+        self.assertEqual(response.status_code, 403)
+
+    def test_cache_sin_datos_sensibles(self):
+        """✓ En caché solo quedan id e indicadores de autorización (sin hash ni grupos)."""
+        from django.core.cache import cache
+        from users.authentication import CAMPOS_CACHEADOS, clave_usuario
+        self.client.get('/api/empresas/', **self.auth)
+        datos = cache.get(clave_usuario(self.admin.pk))
+        self.assertEqual(set(datos), set(CAMPOS_CACHEADOS))
+        self.assertNotIn('password', datos)
+
+    def test_update_por_queryset_invalida_cache(self):
+        """✓ Un .update(is_active=False) masivo (sin signals) también invalida la caché."""
+        from users.models import User
+        self.client.get('/api/empresas/', **self.auth)
+        User.objects.filter(pk=self.admin.pk).update(is_active=False)
+        response = self.client.get('/api/empresas/', **self.auth)
+        self.assertEqual(response.status_code, 401)
+
+    def test_usuario_inactivo_rechazado(self):
+        """✓ Un usuario desactivado no puede autenticarse aunque el token siga vigente."""
+        self.admin.is_active = False
+        self.admin.save()
+        response = self.client.get('/api/empresas/', **self.auth)
+        self.assertEqual(response.status_code, 401)
+
+    def test_modo_claims_sin_consultas(self):
+        """✓ Confiando en los claims, la autorización no consulta la BD."""
+        from unittest.mock import patch
+        with patch('users.authentication.JWT_CONFIAR_CLAIMS', True):
+            with self.assertNumQueries(1):
+                response = self.client.get('/api/empresas/', **self.auth)
+        self.assertEqual(response.status_code, 200)
+
+
+# ============================================================================
+# 18. TESTS DE LOGIN Y REGISTRO ACOTADOS
+# ============================================================================
+
+class TestCredencialesAcotadas(TestCase):
+    """Pruebas de hashing acotado, límites por IP y refresh con blacklist en caché."""
+
+    def setUp(self):
+        from users.models import User
+        self.user = User.objects.create_user(email="cred@test.com", password="clave-segura-123")
+
+    def login(self, password="clave-segura-123"):
+        return self.client.post(
+            '/api/auth/login/', {"email": "cred@test.com", "password": password},
+            content_type='application/json'
+        )
+
+    def test_rehash_transparente_al_hasher_preferido(self):
+        """✓ Un hash con el algoritmo anterior se migra al preferido al hacer login."""
+        from django.contrib.auth.hashers import make_password, get_hasher
+        self.user.password = make_password("clave-segura-123", hasher='pbkdf2_sha256')
+        self.user.save()
+        preferido = get_hasher('default').algorithm
+
+        self.assertEqual(self.login().status_code, 200)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password.startswith(preferido))
+
+    def test_hash_saturado_responde_503(self):
+        """✓ Sin cupo en el pool de hashing el login falla rápido con 503."""
+        from unittest.mock import patch
+        from users import hashers
+        semaforo = Mock()
+        semaforo.acquire.return_value = False
+        with patch.object(hashers, '_cupos', semaforo):
+            response = self.login()
+        self.assertEqual(response.status_code, 503)
+
+    def test_limite_de_intentos_por_ip(self):
+        """✓ Superado el límite de login por IP la respuesta es 429."""
+        from unittest.mock import patch
+        from users.throttles import LoginRateThrottle
+        with patch.object(LoginRateThrottle, 'THROTTLE_RATES', {'login': '2/min'}):
+            codigos = [self.login(password="incorrecta").status_code for _ in range(3)]
+        self.assertEqual(codigos, [401, 401, 429])
+
+    def test_refresh_rota_y_rechaza_reutilizacion(self):
+        """✓ El refresh rotado queda en la blacklist y no se puede reutilizar."""
+        refresh = self.login().json()['refresh']
+        primero = self.client.post('/api/auth/token/refresh/', {"refresh": refresh}, content_type='application/json')
+        self.assertEqual(primero.status_code, 200)
+        self.assertNotEqual(primero.json()['refresh'], refresh)
+
+        repetido = self.client.post('/api/auth/token/refresh/', {"refresh": refresh}, content_type='application/json')
+        self.assertEqual(repetido.status_code, 401)
+
+    def test_blacklist_consulta_bd_una_vez_por_jti(self):
+        """✓ Con caché compartida la BD se consulta una vez por jti; blacklist() pisa la entrada negativa."""
+        from unittest.mock import patch
+        from users.tokens import RefreshTokenCacheado
+        from rest_framework_simplejwt.exceptions import TokenError
+        token = RefreshTokenCacheado.for_user(self.user)
+        with patch('users.tokens.BLACKLIST_NEGATIVA_EN_CACHE', True):
+            with self.assertNumQueries(1):
+                token.check_blacklist()
+            with self.assertNumQueries(0):
+                token.check_blacklist()
+            token.blacklist()
+            with self.assertNumQueries(0):
+                with self.assertRaises(TokenError):
+                    token.check_blacklist()
+
+    def test_blacklist_sin_entrada_en_cache_consulta_bd(self):
+        """✓ Si la caché pierde la entrada, el token sigue rechazado porque decide la BD."""
+        from django.core.cache import cache
+        from users.tokens import RefreshTokenCacheado, clave_blacklist
+        from rest_framework_simplejwt.exceptions import TokenError
+        token = RefreshTokenCacheado.for_user(self.user)
+        token.blacklist()
+        cache.delete(clave_blacklist(token['jti']))
+        with self.assertRaises(TokenError):
+            token.check_blacklist()
+
+    def test_refresh_actualiza_claims(self):
+        """✓ Al rotar, el nuevo access token refleja el is_staff vigente."""
+        from rest_framework_simplejwt.tokens import AccessToken
+        refresh = self.login().json()['refresh']
+        self.user.is_staff = True
+        self.user.save()
+        response = self.client.post('/api/auth/token/refresh/', {"refresh": refresh}, content_type='application/json')
+        self.assertTrue(AccessToken(response.json()['access'])['is_staff'])
+
+
+# ============================================================================
+# 19. TESTS DEL ROUTER DE RÉPLICAS
+# ============================================================================
+
+class TestReplicas:
+    """Pruebas del enrutamiento de lecturas a réplicas con read-your-writes."""
+
+    def setup_method(self):
+        from core import replicas
+        replicas._caidas.clear()
+
+    def _con_replica(self):
+        from unittest.mock import patch
+        return patch('core.replicas.aliases_replica', return_value=['replica_0'])
+
+    def test_lectura_de_repositorio_va_a_replica(self):
+        """✓ Dentro de un método decorado el router lee de la réplica."""
+        from core.replicas import ReplicaRouter, lectura_en_replica
+
+        @lectura_en_replica
+        def leer():
+            return ReplicaRouter().db_for_read(EmpresaModel)
+
+        with self._con_replica():
+            assert leer() == 'replica_0'
+        assert ReplicaRouter().db_for_read(EmpresaModel) is None
+
+    def test_sin_replicas_lee_del_primario(self):
+        """✓ Sin DB_REPLICA_HOSTS todo sigue en 'default'."""
+        from core.replicas import ReplicaRouter, lectura_en_replica
+
+        @lectura_en_replica
+        def leer():
+            return ReplicaRouter().db_for_read(EmpresaModel)
+
+        assert leer() is None
+
+    def test_fallo_de_replica_reintenta_en_primario(self):
+        """✓ Si la réplica falla se repite en el primario y sale de rotación."""
+        from django.db import OperationalError
+        from core import replicas
+
+        @replicas.lectura_en_replica
+        def leer():
+            if replicas.ReplicaRouter().db_for_read(EmpresaModel) == 'replica_0':
+                raise OperationalError("réplica caída")
+            return 'primario'
+
+        with self._con_replica():
+            assert leer() == 'primario'
+            assert replicas.estado_replicas() == {'replica_0': {'disponible': False}}
+            assert replicas.elegir_replica() is None
+
+    def test_read_your_writes_en_el_request_y_el_siguiente(self):
+        """✓ Tras escribir, el mismo request y el siguiente del cliente leen del primario."""
+        from django.test import RequestFactory
+        from core import replicas
+
+        request = RequestFactory().post('/api/empresas/', HTTP_AUTHORIZATION='Bearer abc')
+        with self._con_replica():
+            token = replicas.iniciar_request(request)
+            assert replicas.elegir_replica() == 'replica_0'
+            replicas.ReplicaRouter().db_for_write(EmpresaModel)
+            assert replicas.elegir_replica() is None
+            replicas.finalizar_request(request, token)
+
+            siguiente = RequestFactory().get('/api/empresas/', HTTP_AUTHORIZATION='Bearer abc')
+            token = replicas.iniciar_request(siguiente)
+            assert replicas.elegir_replica() is None
+            replicas.finalizar_request(siguiente, token)
+
+            otro = RequestFactory().get('/api/empresas/', HTTP_AUTHORIZATION='Bearer otro')
+            token = replicas.iniciar_request(otro)
+            assert replicas.elegir_replica() == 'replica_0'
+            replicas.finalizar_request(otro, token)
+
+    def test_migraciones_y_relaciones_con_replicas(self):
+        """✓ `migrate` no escribe en réplicas y se permiten relaciones entre primario y réplica."""
+        from core.replicas import ReplicaRouter
+        router = ReplicaRouter()
+        empresa, producto = EmpresaModel(nit="900111222-3"), ProductoModel(codigo="R-1")
+        empresa._state.db, producto._state.db = 'default', 'replica_0'
+        with self._con_replica():
+            assert router.allow_migrate('replica_0', 'core') is False
+            assert router.allow_migrate('default', 'core') is None
+            assert router.allow_relation(producto, empresa) is True
+            empresa._state.db = 'otra'
+            assert router.allow_relation(producto, empresa) is None
+
+
+# ============================================================================
+# 20. TESTS DE CONSULTAS EN LOTE
+# ============================================================================
+
+class TestConsultasEnLote(TestCase):
+    """Pruebas de get_many_by_nits/get_many_by_ids/list_by_empresas y sus endpoints."""
+
+    def setUp(self):
+        from core.sintetico import poblar
+        poblar(empresas=3, productos_por_empresa=4)
+        self.nits = list(EmpresaModel.objects.order_by('nit').values_list('nit', flat=True))
+        autenticar(self.client, "lote@test.com")
+
+    def test_repositorio_empresas_en_una_consulta(self):
+        """✓ get_many_by_nits respeta el orden pedido y omite los inexistentes."""
+        from core.adapters import DjangoEmpresaRepository
+        pedidos = [self.nits[2], "000000000-0", self.nits[0], self.nits[2]]
+        with self.assertNumQueries(1):
+            empresas = DjangoEmpresaRepository().get_many_by_nits(pedidos)
+        self.assertEqual([e.nit for e in empresas], [self.nits[2], self.nits[0]])
+
+    def test_repositorio_productos_por_ids_y_por_empresas(self):
+        """✓ get_many_by_ids y list_by_empresas usan una sola consulta IN."""
+        from core.adapters import DjangoProductoRepository
+        repo = DjangoProductoRepository()
+        ids = list(ProductoModel.objects.order_by('-id').values_list('id', flat=True)[:3])
+        with self.assertNumQueries(1):
+            self.assertEqual([p.id for p in repo.get_many_by_ids(ids)], ids)
+        with self.assertNumQueries(1):
+            productos = repo.list_by_empresas(self.nits[:2])
+        self.assertEqual(len(productos), 8)
+        self.assertEqual({p.empresa_nit for p in productos}, set(self.nits[:2]))
+        self.assertEqual(repo.list_by_empresas([]), [])
+
+    def test_endpoints_en_lote(self):
+        """✓ /empresas/lote/, /productos/lote/ y ?empresas= responden en lote."""
+        empresas = self.client.get('/api/empresas/lote/', {'nits': ','.join(self.nits[:2])})
+        self.assertEqual(empresas.status_code, 200)
+        self.assertEqual([e['nit'] for e in empresas.json()], self.nits[:2])
+
+        ids = list(ProductoModel.objects.values_list('id', flat=True)[:2])
+        productos = self.client.get('/api/productos/lote/', {'ids': ','.join(map(str, ids))})
+        self.assertEqual([p['id'] for p in productos.json()], ids)
+
+        listado = self.client.get('/api/productos/', {'empresas': ','.join(self.nits)})
+        self.assertEqual(len(listado.json()), 12)
+
+    def test_lote_invalido_o_excesivo(self):
+        """✓ Parámetros vacíos, no numéricos o por encima del tope responden 400."""
+        from unittest.mock import patch
+        self.assertEqual(self.client.get('/api/empresas/lote/').status_code, 400)
+        self.assertEqual(self.client.get('/api/productos/lote/', {'ids': 'a,b'}).status_code, 400)
+        with patch('core.views.LOTE_MAX_ELEMENTOS', 2):
+            response = self.client.get('/api/productos/', {'empresas': ','.join(self.nits)})
+        self.assertEqual(response.status_code, 400)
+
+
+# ============================================================================
+# 21. TESTS DE ESTADÍSTICAS POR EMPRESA
+# ============================================================================
+
+class TestEstadisticasEmpresa(TestCase):
+    """Pruebas de ?include=stats y del resumen materializado."""
+
+    def setUp(self):
+        EmpresaModel.objects.create(nit="900111222-1", nombre="Stats SAS", direccion="Calle 1", telefono="3001234567")
+        EmpresaModel.objects.create(nit="900111222-2", nombre="Vacía SAS", direccion="Calle 2", telefono="3001234567")
+        for codigo, precios in [("ST-1", {"COP": 1000, "USD": 10}), ("ST-2", {"COP": 3000}), ("ST-3", {"USD": 2.5})]:
+            ProductoModel.objects.create(
+                codigo=codigo, nombre=codigo, caracteristicas="x", empresa_id="900111222-1", precios=precios
+            )
+        autenticar(self.client, "stats@test.com")
+
+    def test_calculo_agrupado_por_moneda(self):
+        """✓ Conteo y total/min/max por moneda en una sola consulta."""
+        from core.estadisticas import calcular_estadisticas
+        with self.assertNumQueries(1):
+            stats = calcular_estadisticas(["900111222-1", "900111222-2"])
+        self.assertEqual(stats["900111222-1"]["productos"], 3)
+        self.assertEqual(stats["900111222-1"]["precios"]["COP"], {"productos": 2, "total": 4000, "min": 1000, "max": 3000})
+        self.assertEqual(stats["900111222-1"]["precios"]["USD"]["total"], 12.5)
+        self.assertNotIn("EUR", stats["900111222-1"]["precios"])
+        self.assertNotIn("900111222-2", stats)
+
+    def test_listado_con_include_stats(self):
+        """✓ ?include=stats agrega estadísticas con un número fijo de consultas."""
+        with self.assertNumQueries(3):
+            response = self.client.get('/api/empresas/', {'include': 'stats'})
+        data = {e['nit']: e for e in response.json()}
+        self.assertEqual(data["900111222-1"]["stats"]["productos"], 3)
+        self.assertEqual(data["900111222-2"]["stats"], {"productos": 0, "precios": {}})
+
+        sin_stats = self.client.get('/api/empresas/').json()
+        self.assertNotIn('stats', sin_stats[0])
+
+    def test_resumen_materializado_se_refresca_al_escribir(self):
+        """✓ Con resumen materializado, guardar o borrar productos lo actualiza."""
+        from unittest.mock import patch
+        from core.estadisticas import estadisticas_empresas
+        from core.models import EmpresaResumenModel
+
+        with patch('core.estadisticas.EMPRESA_STATS_MATERIALIZADAS', True):
+            # Primera lectura: se llena el resumen de las empresas que no lo tienen
+            self.assertEqual(estadisticas_empresas(["900111222-1"])["900111222-1"]["productos"], 3)
+            self.assertEqual(EmpresaResumenModel.objects.count(), 1)
+
+            with self.captureOnCommitCallbacks(execute=True):
+                producto = ProductoModel.objects.get(codigo="ST-2")
+                producto.empresa_id = "900111222-2"
+                producto.save()
+
+            with self.assertNumQueries(1):
+                stats = estadisticas_empresas(["900111222-1", "900111222-2"])
+            self.assertEqual(stats["900111222-1"]["productos"], 2)
+            self.assertEqual(stats["900111222-2"]["precios"]["COP"]["total"], 3000)
+
+            with self.captureOnCommitCallbacks(execute=True):
+                ProductoModel.objects.filter(codigo="ST-1").delete()
+            self.assertEqual(EmpresaResumenModel.objects.get(empresa_id="900111222-1").productos, 1)
+
+    def test_resumen_se_llena_desde_el_primario(self):
+        """✓ Dentro de una lectura en réplica, el llenado del resumen calcula y escribe en el primario sin fijar al cliente."""
+        from django.test import RequestFactory
+        from core import replicas
+        from core.estadisticas import refrescar_resumen
+        from core.models import EmpresaResumenModel
+
+        token_request = replicas.iniciar_request(RequestFactory().get('/'))
+        # Si alguna consulta usara el router iría a un alias inexistente y fallaría
+        token_alias = replicas._alias_lectura.set('replica_0')
+        try:
+            calculadas = refrescar_resumen(["900111222-1"])
+            escribio = replicas._estado_request.get()['escribio']
+        finally:
+            replicas._alias_lectura.reset(token_alias)
+            replicas._estado_request.reset(token_request)
+        self.assertEqual(calculadas["900111222-1"]["productos"], 3)
+        self.assertEqual(EmpresaResumenModel.objects.get(empresa_id="900111222-1").productos, 3)
+        self.assertFalse(escribio)
+
+
+# ============================================================================
+# 22. TESTS DEL CAMINO RÁPIDO DE LECTURA
+# ============================================================================
+
+class TestCaminoRapidoLectura:
+    """Pruebas del constructor confiable, la proyección y el renderer orjson."""
+
+    def test_desde_persistencia_no_revalida(self):
+        """✓ El constructor confiable no ejecuta __post_init__ (datos ya validados)."""
+        producto = Producto.desde_persistencia("P-1", "Nombre", "-", "900123456-1", {"COP": 100}, id=7)
+        assert producto == Producto(codigo="P-1", nombre="Nombre", caracteristicas="-",
+                                    empresa_nit="900123456-1", precios={"COP": 100}, id=7)
+        # Un registro histórico que hoy no pasaría la validación se puede leer igual
+        empresa = Empresa.desde_persistencia("NIT-ANTIGUO", "X", "Y", "123")
+        assert empresa.nit == "NIT-ANTIGUO"
+
+    def test_entidades_con_slots(self):
+        """✓ Las entidades usan __slots__ (sin __dict__ por instancia)."""
+        producto = Producto.desde_persistencia("P-1", "N", "-", "900123456-1", {"COP": 1})
+        assert not hasattr(producto, '__dict__')
+
+    def test_proyeccion_equivale_al_serializer(self):
+        """✓ producto_a_json produce lo mismo que ProductoSerializer."""
+        from core.proyecciones import producto_a_json
+        from core.views import preparar_respuesta
+        producto = Producto.desde_persistencia("P-1", "N", "-", "900123456-1", {"USD": 1.5}, id=3)
+        assert producto_a_json(producto) == dict(ProductoSerializer(preparar_respuesta(producto)).data)
+
+    def test_preparar_respuesta_copia_superficial(self):
+        """✓ preparar_respuesta no copia en profundidad los precios."""
+        from core.views import preparar_respuesta
+        producto = Producto.desde_persistencia("P-1", "N", "-", "900123456-1", {"COP": 1}, id=1)
+        assert preparar_respuesta(producto)['precios'] is producto.precios
+
+    def test_renderer_orjson_y_respaldo(self):
+        """✓ El renderer maneja Decimal y cae a DRF si orjson no está instalado."""
+        import json
+        from unittest.mock import patch
+        from core import renderers
+        data = [{"precio": Decimal("10.50"), "nombre": "Café"}]
+        assert json.loads(renderers.ORJSONRenderer().render(data)) == [{"precio": 10.5, "nombre": "Café"}]
+        with patch.object(renderers, 'orjson', None):
+            assert json.loads(renderers.ORJSONRenderer().render(data))[0]["nombre"] == "Café"
+
+
+# ============================================================================
+# 23. TESTS DE VALIDACIÓN COMPILADA Y POR LOTES
+# ============================================================================
+
+class TestValidacionLotes:
+    """Pruebas de core_domain.validacion."""
+
+    def test_errores_empresa_reporta_todos(self):
+        """✓ errores_empresa devuelve todos los errores, no solo el primero."""
+        from core_domain.validacion import errores_empresa
+        errores = errores_empresa("ABC", "", "Calle 1", "12")
+        assert [campo for campo, _ in errores] == ['nombre', 'nit', 'telefono']
+
+    def test_entidad_conserva_primer_error(self):
+        """✓ La entidad sigue lanzando el primer error con el mismo mensaje."""
+        with pytest.raises(ValueError, match="Formato inválido"):
+            Empresa(nit="ABC", nombre="X", direccion="Y", telefono="3001234567")
+        with pytest.raises(ValueError, match="Caracteres inválidos"):
+            Empresa(nit="900-1", nombre="X", direccion="Y", telefono="300-123-45")
+
+    def test_lote_productos_con_repetidos(self):
+        """✓ El lote reporta errores por fila, incluidos códigos repetidos."""
+        from core_domain.validacion import validar_lote_productos
+        filas = [
+            {"codigo": "A-1", "nombre": "Uno", "empresa_nit": "900-1", "precios": {"COP": 1}},
+            {"codigo": "A 2", "nombre": "", "empresa_nit": "900-1", "precios": {}},
+            {"codigo": "A-1", "nombre": "Tres", "empresa_nit": "900-1", "precios": {"COP": 1}},
+        ]
+        resultado = validar_lote_productos(filas)
+        assert resultado.validas == [0]
+        assert [(e.fila, e.campo) for e in resultado.errores] == [
+            (1, 'codigo'), (1, 'nombre'), (1, 'precios'), (2, 'codigo')
+        ]
+
+
+class TestValidarLoteEndpoint(TestCase):
+    """Pruebas de POST /api/productos/validar_lote/."""
+
+    def setUp(self):
+        EmpresaModel.objects.create(nit="900777888-1", nombre="Lote SAS", direccion="Calle 1", telefono="3001234567")
+        ProductoModel.objects.create(codigo="EXISTE-1", nombre="X", caracteristicas="-",
+                                     empresa_id="900777888-1", precios={"COP": 1})
+        autenticar(self.client, "lote@admin.com", staff=True)
+
+    def test_valida_contra_la_bd_en_pocas_consultas(self):
+        """✓ Códigos existentes y empresas inexistentes se detectan con consultas IN."""
+        filas = [
+            {"codigo": "NUEVO-1", "nombre": "Ok", "caracteristicas": "-", "empresa": "900777888-1", "precios": {"COP": 1}},
+            {"codigo": "EXISTE-1", "nombre": "Dup", "caracteristicas": "-", "empresa": "900777888-1", "precios": {"COP": 1}},
+            {"codigo": "NUEVO-2", "nombre": "Sin empresa", "caracteristicas": "-", "empresa": "000-0", "precios": {"COP": 1}},
+        ] + [
+            {"codigo": f"MAS-{i}", "nombre": "Ok", "caracteristicas": "-", "empresa": "900777888-1", "precios": {"COP": 1}}
+            for i in range(200)
+        ]
+        with self.assertNumQueries(3):
+            response = self.client.post('/api/productos/validar_lote/', filas, content_type='application/json')
+        data = response.json()
+        self.assertEqual(data['total'], 203)
+        self.assertEqual(data['validas'], 201)
+        self.assertEqual([(e['fila'], e['campo']) for e in data['errores']], [(1, 'codigo'), (2, 'empresa')])
+        self.assertEqual(ProductoModel.objects.count(), 1)
+
+    def test_formato_invalido(self):
+        """✓ Un cuerpo que no es lista responde 400."""
+        response = self.client.post('/api/productos/validar_lote/', {"codigo": "X"}, content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_campos_no_escalares_son_errores_de_fila(self):
+        """✓ Listas u objetos en codigo/empresa se reportan en su fila en vez de romper con 500."""
+        filas = [
+            {"codigo": ["A"], "nombre": "X", "caracteristicas": "-", "empresa": "900777888-1", "precios": {"COP": 1}},
+            {"codigo": "OK-1", "nombre": "X", "caracteristicas": "-", "empresa": {"nit": 1}, "precios": {"COP": 1}},
+            {"codigo": "OK-2", "nombre": "X", "caracteristicas": "-", "empresa": "900777888-1", "precios": {"COP": 1}},
+        ]
+        response = self.client.post('/api/productos/validar_lote/', filas, content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data['validas'], 1)
+        self.assertEqual([(e['fila'], e['campo']) for e in data['errores']], [(0, 'codigo'), (1, 'empresa')])
+
+
+# ============================================================================
+# 24. TESTS DE JSON RÁPIDO Y COMPRESIÓN
+# ============================================================================
+
+class TestJsonYCompresion(TestCase):
+    """Pruebas del renderer/parser global y del middleware de compresión."""
+
+    def setUp(self):
+        autenticar(self.client, "json@test.com")
+        EmpresaModel.objects.bulk_create([
+            EmpresaModel(nit=f"90000{i:04d}-1", nombre=f"Empresa Comprimible {i}",
+                         direccion="Calle 1 # 2-3", telefono="6012345678")
+            for i in range(40)
+        ])
+
+    def test_renderer_y_parser_globales(self):
+        """✓ REST_FRAMEWORK usa el renderer y parser de core.renderers."""
+        from rest_framework.settings import api_settings
+        from core.renderers import ORJSONParser, ORJSONRenderer
+        assert api_settings.DEFAULT_RENDERER_CLASSES[0] is ORJSONRenderer
+        assert api_settings.DEFAULT_PARSER_CLASSES[0] is ORJSONParser
+
+    def test_parser_rechaza_json_invalido(self):
+        """✓ Un cuerpo JSON mal formado responde 400."""
+        response = self.client.post('/api/auth/login/', data='{"email": ',
+                                    content_type='application/json')
+        assert response.status_code == 400
+
+    def test_parser_lee_json_valido(self):
+        """✓ El parser orjson entrega el mismo dict que el de DRF."""
+        import io
+        from core.renderers import ORJSONParser
+        datos = ORJSONParser().parse(io.BytesIO('{"precios": {"COP": 1500.5}, "nombre": "Café"}'.encode()))
+        assert datos == {"precios": {"COP": 1500.5}, "nombre": "Café"}
+
+    def test_gzip_sobre_el_umbral(self):
+        """✓ Listados grandes se comprimen con gzip y conservan el contenido."""
+        import gzip
+        import json
+        response = self.client.get('/api/empresas/', HTTP_ACCEPT_ENCODING='gzip')
+        assert response['Content-Encoding'] == 'gzip'
+        assert 'Accept-Encoding' in response['Vary']
+        assert int(response['Content-Length']) == len(response.content)
+        assert len(json.loads(gzip.decompress(response.content))) == 40
+
+    def test_brotli_preferido(self):
+        """✓ Si el cliente acepta br, brotli está instalado y no envía credenciales se usa brotli."""
+        from django.http import JsonResponse
+        from django.test import RequestFactory
+        from core import middleware
+        if middleware.brotli is None:
+            pytest.skip("brotli no instalado")
+        compresion = middleware.CompresionMiddleware(
+            lambda request: JsonResponse([{"nombre": f"Empresa Comprimible {i}"} for i in range(100)], safe=False)
+        )
+        response = compresion(RequestFactory().get('/api/system/', HTTP_ACCEPT_ENCODING='gzip, br'))
+        assert response['Content-Encoding'] == 'br'
+        assert b'Empresa Comprimible' in middleware.brotli.decompress(response.content)
+
+    def test_autenticado_usa_gzip_con_relleno(self):
+        """✓ Con credenciales no se usa brotli (sin relleno contra BREACH) sino gzip."""
+        import gzip
+        response = self.client.get('/api/empresas/', HTTP_ACCEPT_ENCODING='gzip, br')
+        assert response['Content-Encoding'] == 'gzip'
+        assert b'Empresa Comprimible' in gzip.decompress(response.content)
+
+    def test_sin_compresion_bajo_el_umbral_o_sin_soporte(self):
+        """✓ Respuestas pequeñas o clientes sin Accept-Encoding no se comprimen."""
+        from unittest.mock import patch
+        assert not self.client.get('/api/empresas/').has_header('Content-Encoding')
+        with patch('core.middleware.COMPRESION_MIN_BYTES', 10 ** 7):
+            response = self.client.get('/api/empresas/', HTTP_ACCEPT_ENCODING='gzip')
+        assert not response.has_header('Content-Encoding')
+
+    def test_codificaciones_aceptadas(self):
+        """✓ Accept-Encoding respeta q=0."""
+        from core.middleware import codificaciones_aceptadas
+        assert codificaciones_aceptadas('gzip, br;q=0') == {'gzip'}
+        assert codificaciones_aceptadas('') == set()
+
+
+# ============================================================================
+# 25. TESTS DE DINERO Y CONVERSIÓN DE MONEDAS
+# ============================================================================
+
+class TestDinero:
+    """Pruebas de la aritmética Decimal y la tabla de tasas del dominio."""
+
+    def test_a_decimal_sin_error_binario(self):
+        """✓ Los float del JSON se convierten por su representación corta."""
+        from core_domain.dinero import a_decimal
+        assert a_decimal(19.99) == Decimal("19.99")
+        assert a_decimal(1500) == Decimal(1500)
+        with pytest.raises(ValueError):
+            a_decimal("abc")
+
+    def test_redondeo_por_moneda(self):
+        """✓ COP sin decimales, USD con dos (redondeo half-up)."""
+        from core_domain.dinero import Dinero
+        assert Dinero.de(1250000.4, "COP").formato() == "COP 1,250,000"
+        assert Dinero.de(19.995, "USD").monto == Decimal("20.00")
+        assert Dinero.de(19.99, "USD").formato() == "USD 19.99"
+
+    def test_conversion_y_origen_deterministico(self):
+        """✓ Usa la moneda destino si existe, si no la base, si no la primera soportada."""
+        from core_domain.dinero import TablaTasas
+        tabla = TablaTasas({"USD": 4000, "EUR": 4400})
+        assert tabla.precio_en({"USD": 10}, "COP").monto == Decimal("40000")
+        assert tabla.precio_en({"COP": 44000, "USD": 1}, "EUR").monto == Decimal("10.00")
+        assert tabla.precio_en({"USD": 5, "EUR": 100}, "USD").monto == Decimal("5.00")
+        assert tabla.precio_en({"EUR": 1, "USD": 1}, "COP").monto == Decimal("4400")
+        assert tabla.precio_en({"JPY": 100}, "COP") is None
+
+    def test_catalogo_equivale_a_precio_individual(self):
+        """✓ convertir_catalogo da lo mismo que precio_en producto por producto."""
+        from core_domain.dinero import TablaTasas
+        tabla = TablaTasas({"USD": Decimal("4150.5"), "EUR": 4350})
+        catalogo = [{"COP": 1000}, {"USD": 12.34}, {"EUR": 0.1, "USD": 2}, {}, {"XYZ": 1}]
+        for destino in ("COP", "USD", "EUR"):
+            assert tabla.convertir_catalogo(catalogo, destino) == [tabla.precio_en(p, destino) for p in catalogo]
+
+    def test_tasas_invalidas(self):
+        """✓ Rechaza tasas no positivas y monedas desconocidas."""
+        from core_domain.dinero import TablaTasas
+        with pytest.raises(ValueError):
+            TablaTasas({"USD": 0})
+        with pytest.raises(ValueError, match="No hay tasa"):
+            TablaTasas({"USD": 4000}).convertir_catalogo([{"COP": 1}], "JPY")
+
+    def test_obtener_precio_retorna_decimal(self):
+        """✓ Producto.obtener_precio entrega Decimal aunque el JSON traiga float."""
+        producto = Producto(codigo="P-1", nombre="N", caracteristicas="-", empresa_nit="900123456-1",
+                            precios={"USD": 0.1})
+        assert producto.obtener_precio("USD") == Decimal("0.1")
+
+
+class TestConversionMonedaAPI(TestCase):
+    """Pruebas de la tabla de tasas persistida y los endpoints de conversión."""
+
+    def setUp(self):
+        from core.tasas import invalidar_tasas
+        invalidar_tasas()
+        EmpresaModel.objects.create(nit="900123456-1", nombre="Empresa", direccion="Calle 1", telefono="6012345678")
+        ProductoModel.objects.create(codigo="P-1", nombre="Café", caracteristicas="-",
+                                     empresa_id="900123456-1", precios={"COP": 41500})
+        ProductoModel.objects.create(codigo="P-2", nombre="Laptop", caracteristicas="-",
+                                     empresa_id="900123456-1", precios={"USD": 19.99})
+        autenticar(self.client, "tasas@test.com", staff=True)
+
+    def tearDown(self):
+        from core.tasas import invalidar_tasas
+        invalidar_tasas()
+
+    def test_tasas_iniciales_y_cache_en_memoria(self):
+        """✓ La migración carga las tasas y la tabla se consulta una sola vez."""
+        from core.tasas import tabla_tasas
+        tabla_tasas()
+        with self.assertNumQueries(0):
+            tabla = tabla_tasas()
+        assert tabla.como_dict() == {"COP": 1, "USD": 4150, "EUR": 4350}
+
+    def test_listar_productos_en_moneda(self):
+        """✓ ?moneda=USD agrega el precio convertido a cada producto."""
+        response = self.client.get('/api/productos/', {'empresa': '900123456-1', 'moneda': 'usd'})
+        assert response.status_code == 200
+        precios = {p['codigo']: p['precio'] for p in response.json()}
+        assert precios == {"P-1": {"moneda": "USD", "monto": 10}, "P-2": {"moneda": "USD", "monto": 19.99}}
+
+    def test_moneda_no_soportada(self):
+        """✓ Una moneda sin tasa responde 400."""
+        response = self.client.get('/api/productos/', {'empresa': '900123456-1', 'moneda': 'JPY'})
+        assert response.status_code == 400
+
+    def test_actualizar_tasa_refresca_la_tabla(self):
+        """✓ PUT /api/tasas/USD/ guarda la tasa y las conversiones la usan de inmediato."""
+        response = self.client.put('/api/tasas/USD/', {'tasa': '4000'}, content_type='application/json')
+        assert response.status_code == 200
+        assert response.json()['tasas']['USD'] == 4000
+        response = self.client.get('/api/productos/', {'empresa': '900123456-1', 'moneda': 'COP'})
+        assert {p['codigo']: p['precio']['monto'] for p in response.json()}["P-2"] == 79960
+
+    def test_tasa_invalida(self):
+        """✓ Tasas en cero o para la moneda base responden 400."""
+        assert self.client.put('/api/tasas/USD/', {'tasa': '0'}, content_type='application/json').status_code == 400
+        assert self.client.put('/api/tasas/COP/', {'tasa': '2'}, content_type='application/json').status_code == 400
+
+    def test_reporte_formatea_por_moneda(self):
+        """✓ El PDF ya no redondea los USD a enteros."""
+        from core.reports import texto_precio
+        assert texto_precio({"USD": 19.99}) == "USD 19.99"
+        assert texto_precio({"COP": 1250000}) == "COP 1,250,000"
+        assert texto_precio({}) == "N/A"
+
+
+# ============================================================================
+# 26. TESTS DE VALORACIÓN DE INVENTARIO
+# ============================================================================
+
+class TestValoracionEntidad:
+    """Pruebas de la acumulación y conversión de la valoración del dominio."""
+
+    def test_sumar_y_restar(self):
+        """✓ Agregar y retirar un producto deja la valoración como estaba."""
+        from core_domain.entities.valoracion import Valoracion
+        valoracion = Valoracion(empresa_nit="900123456-1")
+        valoracion.sumar({"COP": 1000, "USD": 0.24})
+        valoracion.sumar({"USD": 10.1})
+        assert valoracion.productos == 2
+        assert valoracion.totales == {"COP": Decimal("1000"), "USD": Decimal("10.34")}
+        valoracion.sumar({"USD": 10.1}, -1)
+        assert valoracion.canonicos == {"COP": Decimal("1000")}
+
+    def test_total_sin_doble_conteo(self):
+        """✓ Un producto con precio en dos monedas cuenta una sola vez en el total."""
+        from core_domain.dinero import TablaTasas
+        from core_domain.entities.valoracion import Valoracion
+        valoracion = Valoracion(empresa_nit="900123456-1")
+        valoracion.sumar({"COP": 4150, "USD": 1})
+        valoracion.sumar({"USD": 2})
+        valoracion.sumar({"JPY": 100})
+        total, sin_tasa = valoracion.total_en(TablaTasas({"USD": 4150}), "COP")
+        assert total.monto == Decimal("12450")
+        assert sin_tasa == ["JPY"]
+
+
+class TestValoracionIncremental(TestCase):
+    """Pruebas de la valoración precalculada, su historial y el endpoint."""
+
+    NIT = "900123456-1"
+    OTRO = "900654321-2"
+
+    def setUp(self):
+        from core.tasas import invalidar_tasas
+        invalidar_tasas()
+        for nit in (self.NIT, self.OTRO):
+            EmpresaModel.objects.create(nit=nit, nombre="Empresa", direccion="Calle 1", telefono="6012345678")
+        ProductoModel.objects.create(codigo="P-1", nombre="Café", caracteristicas="-",
+                                     empresa_id=self.NIT, precios={"COP": 41500, "USD": 10})
+        autenticar(self.client, "valor@test.com")
+
+    def _comparar_con_calculo(self, nit):
+        from core.valoracion import calcular_valoracion, valoracion_empresa
+        guardada, calculada = valoracion_empresa(nit), calcular_valoracion(nit)
+        assert (guardada.productos, guardada.totales, guardada.canonicos) == \
+               (calculada.productos, calculada.totales, calculada.canonicos)
+
+    def test_deltas_coinciden_con_calculo_completo(self):
+        """✓ Crear, editar, mover y borrar productos mantiene la valoración exacta."""
+        from core.valoracion import valoracion_empresa
+        valoracion_empresa(self.NIT)
+        valoracion_empresa(self.OTRO)
+        p2 = ProductoModel.objects.create(codigo="P-2", nombre="Té", caracteristicas="-",
+                                          empresa_id=self.NIT, precios={"USD": 19.99})
+        p2.precios = {"USD": 5.01, "EUR": 3}
+        p2.save()
+        self._comparar_con_calculo(self.NIT)
+        p2.empresa_id = self.OTRO
+        p2.save()
+        self._comparar_con_calculo(self.NIT)
+        self._comparar_con_calculo(self.OTRO)
+        ProductoModel.objects.filter(empresa_id=self.NIT).delete()
+        self._comparar_con_calculo(self.NIT)
+        assert valoracion_empresa(self.NIT).productos == 0
+
+    def test_lectura_sin_recorrer_catalogo(self):
+        """✓ Una vez calculada, leer la valoración es una consulta por clave."""
+        from core.valoracion import valoracion_empresa
+        valoracion_empresa(self.NIT)
+        with self.assertNumQueries(1):
+            assert valoracion_empresa(self.NIT).productos == 1
+
+    def test_borrar_empresa_en_cascada(self):
+        """✓ Borrar una empresa con valoración no intenta actualizarla."""
+        from core.valoracion import valoracion_empresa
+        valoracion_empresa(self.NIT)
+        EmpresaModel.objects.filter(nit=self.NIT).delete()
+        assert valoracion_empresa(self.NIT) is None
+
+    def test_endpoint_valoracion_con_historial(self):
+        """✓ GET /empresas/{nit}/valoracion/ entrega totales, total convertido e historial."""
+        response = self.client.get(f'/api/empresas/{self.NIT}/valoracion/', {'moneda': 'USD', 'historial': 7})
+        assert response.status_code == 200
+        data = response.json()
+        assert data['productos'] == 1
+        assert data['totales'] == {"COP": 41500, "USD": 10}
+        assert data['total'] == {"moneda": "USD", "monto": 10}
+        assert data['equivalentes']['COP'] == 41500
+        assert len(data['historial']) == 1
+
+    def test_endpoint_valoracion_errores(self):
+        """✓ Empresa inexistente -> 404; moneda sin tasa -> 400."""
+        assert self.client.get('/api/empresas/000-0/valoracion/').status_code == 404
+        assert self.client.get(f'/api/empresas/{self.NIT}/valoracion/', {'moneda': 'JPY'}).status_code == 400
+
+    def test_hecho_para_el_chat(self):
+        """✓ El chat recibe el valor del inventario ya calculado."""
+        from core.ai import describir_valoracion
+        from core.di import get_tasa_cambio_repository, get_valoracion_repository
+        from core_domain.use_cases.moneda_use_cases import ObtenerValoracionEmpresaUseCase
+        valor = ObtenerValoracionEmpresaUseCase(get_valoracion_repository(), get_tasa_cambio_repository()).execute(self.NIT)
+        texto = describir_valoracion(valor)
+        assert "Productos: 1" in texto
+        assert "COP 41,500" in texto
+
+    def test_chat_con_nit_desconocido(self):
+        """✓ Un NIT inexistente no convierte el chat en 503: se responde sin valoración."""
+        from unittest.mock import patch
+        with patch('core.views.chat_con_inventario', return_value="ok") as chat:
+            response = self.client.post('/api/productos/chat_inventario/', {'nit': '000-0', 'historial': []},
+                                        content_type='application/json')
+        assert response.status_code == 200
+        assert chat.call_args.args[3] is None
+
+    def test_delta_no_se_pierde_si_el_llenado_termina_antes(self):
+        """✓ Si el llenado inicial confirma mientras la escritura espera el bloqueo, el delta se aplica."""
+        from unittest.mock import patch
+        from core import valoracion
+        bloquear = valoracion._bloquear_empresa
+
+        def llenado_concurrente(nit):
+            # Otro request llena la valoración sin ver el cambio aún no confirmado
+            valoracion.guardar_valoracion(valoracion.calcular_valoracion(nit))
+            return bloquear(nit)
+
+        with patch.object(valoracion, '_bloquear_empresa', side_effect=llenado_concurrente):
+            valoracion.aplicar_cambio(self.NIT, nuevos={"COP": 1000})
+        assert valoracion.valoracion_empresa(self.NIT).totales["COP"] == 42500
+
+
+# ============================================================================
+# 27. TESTS DEL REGISTRO DE CAMBIOS (OUTBOX)
+# ============================================================================
+
+class TestRegistroCambios(TestCase):
+    """Pruebas del outbox escrito por los repositorios y del endpoint /cambios/."""
+
+    def setUp(self):
+        from core.adapters import DjangoEmpresaRepository, DjangoProductoRepository
+        self.empresas = DjangoEmpresaRepository()
+        self.productos = DjangoProductoRepository()
+        autenticar(self.client, "cambios@test.com", staff=True)
+
+    def _escrituras(self):
+        self.empresas.save(Empresa(nit="900123456-1", nombre="Empresa", direccion="Calle 1", telefono="6012345678"))
+        producto = self.productos.save(Producto(codigo="P-1", nombre="Café", caracteristicas="-",
+                                                empresa_nit="900123456-1", precios={"COP": 1000}))
+        self.productos.save(Producto(codigo="P-1", nombre="Café Premium", caracteristicas="-",
+                                     empresa_nit="900123456-1", precios={"COP": 2000}))
+        self.productos.delete(producto.id)
+        return producto
+
+    def test_repositorios_registran_cada_escritura(self):
+        """✓ Crear, actualizar y eliminar dejan eventos en orden con el estado resultante."""
+        from core.models import CambioModel
+        producto = self._escrituras()
+        eventos = list(CambioModel.objects.order_by('id').values_list('entidad', 'clave', 'operacion'))
+        assert eventos == [
+            ('empresa', '900123456-1', 'crear'),
+            ('producto', str(producto.id), 'crear'),
+            ('producto', str(producto.id), 'actualizar'),
+            ('producto', str(producto.id), 'eliminar'),
+        ]
+        assert CambioModel.objects.get(operacion='actualizar').datos['nombre'] == "Café Premium"
+
+    def test_evento_se_revierte_con_la_escritura(self):
+        """✓ Si la transacción falla no queda evento huérfano."""
+        from django.db import transaction
+        from core.models import CambioModel
+        with pytest.raises(RuntimeError):
+            with transaction.atomic():
+                self.empresas.save(Empresa(nit="900123456-1", nombre="E", direccion="D", telefono="6012345678"))
+                raise RuntimeError("falla después de guardar")
+        assert not CambioModel.objects.exists()
+
+    def test_borrar_inexistente_no_registra(self):
+        """✓ Eliminar algo que no existe no genera evento."""
+        from core.models import CambioModel
+        self.productos.delete(999999)
+        self.empresas.delete("000-0")
+        assert not CambioModel.objects.exists()
+
+    def test_endpoint_paginado_por_cursor(self):
+        """✓ ?since=&limit= entrega páginas ordenadas y el cursor para continuar."""
+        self._escrituras()
+        primera = self.client.get('/api/cambios/', {'limit': 3}).json()
+        assert [c['operacion'] for c in primera['cambios']] == ['crear', 'crear', 'actualizar']
+        assert primera['hay_mas'] is True
+        segunda = self.client.get('/api/cambios/', {'since': primera['cursor'], 'limit': 3}).json()
+        assert [c['operacion'] for c in segunda['cambios']] == ['eliminar']
+        assert segunda['hay_mas'] is False
+        vacia = self.client.get('/api/cambios/', {'since': segunda['cursor']}).json()
+        assert vacia == {'cambios': [], 'cursor': segunda['cursor'], 'hay_mas': False}
+
+    def test_endpoint_ndjson(self):
+        """✓ ?formato=ndjson transmite un evento por línea."""
+        import json
+        self._escrituras()
+        response = self.client.get('/api/cambios/', {'formato': 'ndjson'})
+        assert response['Content-Type'] == 'application/x-ndjson'
+        lineas = [json.loads(l) for l in b''.join(response.streaming_content).splitlines()]
+        assert [l['id'] for l in lineas] == sorted(l['id'] for l in lineas)
+        assert len(lineas) == 4
+
+    def test_evento_confirmado_tarde_se_entrega(self):
+        """✓ Un id menor que confirma después de entregar uno mayor llega en la página siguiente."""
+        from core.models import CambioModel
+        self._escrituras()
+        # Simula la transacción lenta: el primer evento aún no es visible al leer
+        tardio = CambioModel.objects.order_by('id').values('id', 'entidad', 'clave', 'operacion', 'datos').first()
+        CambioModel.objects.filter(id=tardio['id']).delete()
+        primera = self.client.get('/api/cambios/').json()
+        assert [c['operacion'] for c in primera['cambios']] == ['crear', 'actualizar', 'eliminar']
+
+        CambioModel.objects.create(**tardio)
+        segunda = self.client.get('/api/cambios/', {'since': primera['cursor']}).json()
+        assert [(c['entidad'], c['operacion']) for c in segunda['cambios']] == [('empresa', 'crear')]
+        assert segunda['cursor'] > primera['cursor']
+
+    def test_lectura_sin_pendientes_no_bloquea(self):
+        """✓ Con todo publicado, leer es una consulta de existencia más la página."""
+        from core.cambios import cambios_desde
+        self._escrituras()
+        list(cambios_desde(0, 10))
+        with self.assertNumQueries(2):
+            assert len(list(cambios_desde(0, 10))) == 4
+
+    def test_endpoint_validaciones_y_permisos(self):
+        """✓ Cursor inválido -> 400; usuarios no staff -> 403."""
+        assert self.client.get('/api/cambios/', {'since': 'abc'}).status_code == 400
+        assert self.client.get('/api/cambios/', {'since': -1}).status_code == 400
+        autenticar(self.client, "normal@test.com")
+        assert self.client.get('/api/cambios/').status_code == 403
+
+
+# ============================================================================
+# 28. TESTS DE BORRADO LÓGICO Y PURGA POR LOTES
+# ============================================================================
+
+class TestBorradoLogicoEmpresa(TestCase):
+    """Pruebas del borrado lógico de empresas y la purga por lotes."""
+
+    NIT = "900123456-1"
+
+    def setUp(self):
+        EmpresaModel.objects.create(nit=self.NIT, nombre="Empresa", direccion="Calle 1", telefono="6012345678")
+        EmpresaModel.objects.create(nit="900654321-2", nombre="Otra", direccion="Calle 2", telefono="6012345678")
+        for i in range(5):
+            ProductoModel.objects.create(codigo=f"P-{i}", nombre="Producto", caracteristicas="-",
+                                         empresa_id=self.NIT, precios={"COP": 1000})
+        ProductoModel.objects.create(codigo="OTRO-1", nombre="Producto", caracteristicas="-",
+                                     empresa_id="900654321-2", precios={"COP": 1000})
+        autenticar(self.client, "purga@test.com", staff=True)
+
+    def test_eliminar_marca_sin_borrar_filas(self):
+        """✓ DELETE /empresas/{nit}/ solo marca la empresa; ella y sus productos dejan de verse."""
+        from unittest.mock import patch
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        with patch('core.purga._ejecutor') as ejecutor, self.captureOnCommitCallbacks(execute=True):
+            with CaptureQueriesContext(connection) as consultas:
+                assert self.client.delete(f'/api/empresas/{self.NIT}/').status_code == 204
+        ejecutor.submit.assert_called_once()
+        assert not [q for q in consultas.captured_queries if q['sql'].startswith('DELETE')]
+        assert ProductoModel.todos.filter(empresa_id=self.NIT).count() == 5
+        assert self.client.get(f'/api/empresas/{self.NIT}/').status_code == 404
+        assert self.client.get('/api/productos/', {'empresa': self.NIT}).json() == []
+        assert [e['nit'] for e in self.client.get('/api/empresas/').json()] == ["900654321-2"]
+
+    def test_no_se_recrea_mientras_se_purga(self):
+        """✓ Crear una empresa con un NIT pendiente de purga responde 400."""
+        from core.adapters import DjangoEmpresaRepository
+        DjangoEmpresaRepository().delete(self.NIT)
+        response = self.client.post('/api/empresas/', {'nit': self.NIT, 'nombre': 'Nueva', 'direccion': 'Calle 3',
+                                                       'telefono': '6012345678'}, content_type='application/json')
+        assert response.status_code == 400
+        producto = self.client.post('/api/productos/', {'codigo': 'P-NUEVO', 'nombre': 'N', 'caracteristicas': '-',
+                                                        'empresa': self.NIT, 'precios': {'COP': 1}},
+                                    content_type='application/json')
+        assert producto.status_code == 400
+
+    def test_codigo_de_empresa_en_purga(self):
+        """✓ Reusar el código de un producto cuya empresa se está purgando responde 400 claro, no un UNIQUE."""
+        from core.adapters import DjangoEmpresaRepository
+        DjangoEmpresaRepository().delete("900654321-2")
+        response = self.client.post('/api/productos/', {'codigo': 'OTRO-1', 'nombre': 'N', 'caracteristicas': '-',
+                                                        'empresa': self.NIT, 'precios': {'COP': 1}},
+                                    content_type='application/json')
+        assert response.status_code == 400
+        assert "purgando" in response.json()['detail']
+        assert ProductoModel.todos.get(codigo='OTRO-1').empresa_id == "900654321-2"
+
+    def test_purga_por_lotes(self):
+        """✓ La purga borra productos y dependientes en lotes y no toca otras empresas."""
+        from core.adapters import DjangoEmpresaRepository
+        from core.models import ValoracionEmpresaModel
+        from core.purga import purgar_empresa
+        from core.valoracion import valoracion_empresa
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        valoracion_empresa(self.NIT)
+        DjangoEmpresaRepository().delete(self.NIT)
+        with CaptureQueriesContext(connection) as consultas:
+            resultado = purgar_empresa(self.NIT, lote=2)
+        assert resultado['productos'] == 5
+        assert resultado['empresas'] == 1
+        assert resultado['empresas_valoracion'] == 1
+        # 2 + 2 + 1 productos: tres DELETE acotados
+        assert sum(q['sql'].startswith('DELETE FROM "productos"') for q in consultas.captured_queries) == 3
+        assert not EmpresaModel.todas.filter(nit=self.NIT).exists()
+        assert not ValoracionEmpresaModel.objects.filter(empresa_id=self.NIT).exists()
+        assert ProductoModel.objects.filter(empresa_id="900654321-2").count() == 1
+
+    def test_purga_solo_empresas_eliminadas(self):
+        """✓ purgar_empresa no borra una empresa activa."""
+        from core.purga import purgar_empresa
+        assert purgar_empresa("900654321-2")['empresas'] == 0
+
+    def test_comando_purgar_eliminadas(self):
+        """✓ manage.py purgar_eliminadas purga las pendientes."""
+        from io import StringIO
+        from django.core.management import call_command
+        from core.adapters import DjangoEmpresaRepository
+        DjangoEmpresaRepository().delete(self.NIT)
+        salida = StringIO()
+        call_command('purgar_eliminadas', '--lote', '3', stdout=salida)
+        assert f"Empresa {self.NIT} purgada" in salida.getvalue()
+        assert ProductoModel.todos.count() == 1
+
+
+# ============================================================================
+# 29. TESTS DE ACTUALIZACIÓN MASIVA DE PRECIOS
+# ============================================================================
+
+class TestReglaPrecio(TestCase):
+    """Pruebas de la regla de precios del dominio."""
+
+    def test_operaciones(self):
+        """✓ Porcentaje, suma, asignación y conversión redondean a la moneda."""
+        from decimal import Decimal
+        from core_domain.dinero import ReglaPrecio, TablaTasas
+        precios = {"COP": 41500, "USD": 10.99}
+        assert ReglaPrecio('porcentaje', 'USD', Decimal('5')).aplicar(precios).monto == Decimal('11.54')
+        assert ReglaPrecio('sumar', 'COP', Decimal('-500')).aplicar(precios).monto == Decimal('41000')
+        assert ReglaPrecio('asignar', 'EUR', Decimal('9.5')).aplicar(precios).monto == Decimal('9.50')
+        tabla = TablaTasas({'USD': 4150})
+        assert ReglaPrecio('convertir', 'USD').aplicar(precios, tabla).monto == Decimal('10.00')
+        assert ReglaPrecio('porcentaje', 'EUR', Decimal('5')).aplicar(precios) is None
+
+    def test_validaciones(self):
+        """✓ La regla rechaza operaciones, monedas y resultados inválidos."""
+        from decimal import Decimal
+        from core_domain.dinero import ReglaPrecio
+        for args in [('doblar', 'USD', Decimal(1)), ('sumar', 'usd', Decimal(1)), ('sumar', 'USD', None),
+                     ('porcentaje', 'USD', Decimal(-100))]:
+            with self.assertRaises(ValueError):
+                ReglaPrecio(*args)
+        with self.assertRaises(ValueError):
+            ReglaPrecio('sumar', 'USD', Decimal(-20)).aplicar({"USD": 10})
+
+
+class TestActualizarPreciosAPI(TestCase):
+    """Pruebas del endpoint de actualización masiva de precios."""
+
+    NIT = "900123456-1"
+    URL = '/api/productos/actualizar_precios/'
+
+    def setUp(self):
+        EmpresaModel.objects.create(nit=self.NIT, nombre="Empresa", direccion="Calle 1", telefono="6012345678")
+        EmpresaModel.objects.create(nit="900654321-2", nombre="Otra", direccion="Calle 2", telefono="6012345678")
+        for i in range(5):
+            ProductoModel.objects.create(codigo=f"LAP-{i}", nombre=f"Laptop {i}", caracteristicas="-",
+                                         empresa_id=self.NIT, precios={"COP": 100000, "USD": 20})
+        ProductoModel.objects.create(codigo="MOU-1", nombre="Mouse", caracteristicas="-",
+                                     empresa_id=self.NIT, precios={"COP": 50000})
+        ProductoModel.objects.create(codigo="LAP-X", nombre="Laptop", caracteristicas="-",
+                                     empresa_id="900654321-2", precios={"USD": 20})
+        autenticar(self.client, "precios@test.com", staff=True)
+
+    def _post(self, **datos):
+        return self.client.post(self.URL, {'empresa': self.NIT, **datos}, content_type='application/json')
+
+    def test_porcentaje_por_lotes(self):
+        """✓ Sube un porcentaje solo a los productos con la moneda, en lotes con bulk_update."""
+        from unittest.mock import patch
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        with patch('core.precios.PRECIOS_TAMANO_LOTE', 2), CaptureQueriesContext(connection) as contexto:
+            response = self._post(operacion='porcentaje', moneda='USD', valor='12.5')
+        assert response.status_code == 200
+        assert response.json() == {'actualizados': 5}
+        assert sum(1 for q in contexto.captured_queries if q['sql'].startswith('UPDATE "productos"')) == 3
+        assert {p.precios['USD'] for p in ProductoModel.objects.filter(empresa_id=self.NIT, codigo__startswith='LAP')} == {22.5}
+        assert ProductoModel.objects.get(codigo='MOU-1').precios == {"COP": 50000}
+        assert ProductoModel.objects.get(codigo='LAP-X').precios == {"USD": 20}
+
+    def test_filtros_y_eventos(self):
+        """✓ Filtra por texto e ids y registra un evento por producto cambiado."""
+        from core.models import CambioModel
+        ids = list(ProductoModel.objects.filter(codigo__in=['LAP-0', 'LAP-1', 'MOU-1']).values_list('id', flat=True))
+        response = self._post(operacion='asignar', moneda='EUR', valor=15, buscar='laptop', ids=ids)
+        assert response.json() == {'actualizados': 2}
+        assert ProductoModel.objects.get(codigo='LAP-0').precios == {"COP": 100000, "USD": 20, "EUR": 15}
+        eventos = CambioModel.objects.filter(entidad='producto', operacion='actualizar')
+        assert eventos.count() == 2
+        assert all(e.datos['precios']['EUR'] == 15 for e in eventos)
+
+    def test_todo_o_nada(self):
+        """✓ Si un precio resultante es negativo no se guarda ningún cambio."""
+        ProductoModel.objects.filter(codigo='LAP-4').update(precios={"COP": 100000, "USD": 1})
+        response = self._post(operacion='sumar', moneda='USD', valor=-5)
+        assert response.status_code == 400
+        assert sorted(ProductoModel.objects.filter(empresa_id=self.NIT, codigo__startswith='LAP')
+                      .values_list('precios__USD', flat=True)) == [1, 20, 20, 20, 20]
+
+    def test_refresca_valoracion(self):
+        """✓ La valoración de la empresa refleja los nuevos precios."""
+        from core.valoracion import valoracion_empresa
+        valoracion_empresa(self.NIT)
+        self._post(operacion='convertir', moneda='EUR')
+        totales = valoracion_empresa(self.NIT).totales
+        assert totales['EUR'] > 0
+        assert totales['USD'] == 100
+
+    def test_sin_cambios_y_validaciones(self):
+        """✓ Reaplicar el mismo valor no cuenta cambios; datos inválidos y no staff son rechazados."""
+        assert self._post(operacion='asignar', moneda='USD', valor=20).json() == {'actualizados': 1}  # solo el mouse
+        assert self._post(operacion='asignar', moneda='USD', valor=20).json() == {'actualizados': 0}
+        assert self._post(operacion='doblar', moneda='USD', valor=2).status_code == 400
+        assert self._post(operacion='convertir', moneda='JPY').status_code == 400
+        self.client.defaults.pop('HTTP_AUTHORIZATION')
+        assert self._post(operacion='sumar', moneda='USD', valor=1).status_code in (401, 403)
+
+    def test_empresa_inexistente_o_eliminada_y_tope_de_ids(self):
+        """✓ Empresa desconocida o en purga -> 404; más ids que LOTE_MAX_ELEMENTOS -> 400."""
+        from core.adapters import DjangoEmpresaRepository
+        from core.serializers import LOTE_MAX_ELEMENTOS
+        assert self._post(operacion='sumar', moneda='USD', valor=1, empresa='000-0').status_code == 404
+        DjangoEmpresaRepository().delete("900654321-2")
+        assert self._post(operacion='sumar', moneda='USD', valor=1, empresa='900654321-2').status_code == 404
+        ids = list(range(1, LOTE_MAX_ELEMENTOS + 2))
+        assert self._post(operacion='sumar', moneda='USD', valor=1, ids=ids).status_code == 400
+
+
+# ============================================================================
+# 30. TESTS DE CONCURRENCIA OPTIMISTA (VERSION / IF-MATCH)
+# ============================================================================
+
+class TestConcurrenciaOptimista(TestCase):
+    """Pruebas del control de versiones en empresas y productos."""
+
+    NIT = "900123456-1"
+
+    def setUp(self):
+        EmpresaModel.objects.create(nit=self.NIT, nombre="Empresa", direccion="Calle 1", telefono="6012345678")
+        self.producto = ProductoModel.objects.create(codigo="P-1", nombre="Producto", caracteristicas="-",
+                                                     empresa_id=self.NIT, precios={"COP": 1000})
+        autenticar(self.client, "version@test.com", staff=True)
+
+    def _empresa(self, nombre, **extra):
+        return self.client.put(f'/api/empresas/{self.NIT}/', {'nombre': nombre, 'direccion': 'Calle 1',
+                                                              'telefono': '6012345678'},
+                               content_type='application/json', **extra)
+
+    def _producto(self, nombre, **extra):
+        return self.client.patch(f'/api/productos/{self.producto.id}/', {'nombre': nombre},
+                                 content_type='application/json', **extra)
+
+    def test_etag_y_version(self):
+        """✓ GET devuelve la versión en el cuerpo y en ETag; cada actualización la incrementa."""
+        response = self.client.get(f'/api/empresas/{self.NIT}/')
+        assert response['ETag'] == '"1"'
+        assert response.json()['version'] == 1
+        actualizada = self._empresa("Nueva", HTTP_IF_MATCH=response['ETag'])
+        assert actualizada.status_code == 200
+        assert actualizada['ETag'] == '"2"'
+        assert EmpresaModel.objects.get(nit=self.NIT).version == 2
+
+    def test_conflicto_empresa(self):
+        """✓ Dos clientes con la misma versión: el segundo recibe 409 y no pisa al primero."""
+        assert self._empresa("Primero", HTTP_IF_MATCH='"1"').status_code == 200
+        response = self._empresa("Segundo", HTTP_IF_MATCH='W/"1"')
+        assert response.status_code == 409
+        assert EmpresaModel.objects.get(nit=self.NIT).nombre == "Primero"
+
+    def test_conflicto_producto_con_version_en_cuerpo(self):
+        """✓ La versión también puede ir en el cuerpo; una versión vieja responde 409."""
+        response = self.client.patch(f'/api/productos/{self.producto.id}/', {'nombre': 'A', 'version': 1},
+                                     content_type='application/json')
+        assert response.status_code == 200
+        assert response.json()['version'] == 2
+        assert self._producto("B", HTTP_IF_MATCH='"1"').status_code == 409
+        assert ProductoModel.objects.get(pk=self.producto.id).nombre == "A"
+
+    def test_un_solo_update_condicional(self):
+        """✓ La actualización es un UPDATE ... WHERE version = ? sin SELECT FOR UPDATE."""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        with CaptureQueriesContext(connection) as contexto:
+            assert self._producto("C", HTTP_IF_MATCH='"1"').status_code == 200
+        sql = [q['sql'] for q in contexto.captured_queries]
+        updates = [q for q in sql if q.startswith('UPDATE "productos"')]
+        assert len(updates) == 1 and '"version" = 1' in updates[0]
+        assert not any('FOR UPDATE' in q for q in sql if 'productos' in q)
+
+    def test_sin_version_y_escrituras_masivas(self):
+        """✓ Sin If-Match se actualiza igual; la actualización masiva y el admin también suben la versión."""
+        assert self._producto("D").status_code == 200
+        self.client.post('/api/productos/actualizar_precios/', {'empresa': self.NIT, 'operacion': 'porcentaje',
+                                                                 'moneda': 'COP', 'valor': 10},
+                         content_type='application/json')
+        modelo = ProductoModel.objects.get(pk=self.producto.id)
+        assert modelo.version == 3
+        modelo.nombre = "Desde admin"
+        modelo.save()
+        assert modelo.version == 4  # la instancia queda con el número, no con la expresión F()
+        modelo.save(update_fields=['nombre'])
+        assert modelo.version == 5
+        assert ProductoModel.objects.get(pk=self.producto.id).version == 5
+        assert self._producto("E", HTTP_IF_MATCH='"4"').status_code == 409
+
+    def test_instancia_nueva_con_pk_existente_incrementa(self):
+        """✓ Guardar una instancia sin leer con la pk de una fila existente sube la versión en vez de reiniciarla."""
+        assert self._empresa("A").status_code == 200
+        assert self._empresa("B").status_code == 200
+        assert EmpresaModel.objects.get(pk=self.NIT).version == 3
+        empresa = EmpresaModel(nit=self.NIT, nombre="Reemplazo", direccion="Calle 1", telefono="6012345678")
+        empresa.save()
+        assert empresa.version == 4
+        assert EmpresaModel.objects.get(pk=self.NIT).version == 4
+        assert self._empresa("C", HTTP_IF_MATCH='"1"').status_code == 409
+
+    def test_valoracion_con_update(self):
+        """✓ Actualizar precios por la API mantiene la valoración incremental."""
+        from core.valoracion import valoracion_empresa
+        valoracion_empresa(self.NIT)
+        response = self.client.patch(f'/api/productos/{self.producto.id}/', {'precios': {'COP': 2500}},
+                                     content_type='application/json')
+        assert response.status_code == 200
+        assert valoracion_empresa(self.NIT).totales == {'COP': 2500}
+
+    def test_if_match_invalido(self):
+        """✓ Un If-Match que no es un ETag del API responde 400."""
+        assert self._empresa("X", HTTP_IF_MATCH='"abc"').status_code == 400
+
+
+# ============================================================================
+# 31. TESTS DE ACTUALIZACIÓN DE PRODUCTOS POR ID
+# ============================================================================
+
+class TestActualizarProductoPorId(TestCase):
+    """Pruebas de la actualización parcial de productos por id."""
+
+    NIT = "900123456-1"
+
+    def setUp(self):
+        EmpresaModel.objects.create(nit=self.NIT, nombre="Empresa", direccion="Calle 1", telefono="6012345678")
+        EmpresaModel.objects.create(nit="900654321-2", nombre="Otra", direccion="Calle 2", telefono="6012345678")
+        self.producto = ProductoModel.objects.create(codigo="P-1", nombre="Producto", caracteristicas="-",
+                                                     empresa_id=self.NIT, precios={"COP": 1000})
+        ProductoModel.objects.create(codigo="P-2", nombre="Otro", caracteristicas="-",
+                                     empresa_id=self.NIT, precios={"COP": 500})
+        autenticar(self.client, "update@test.com", staff=True)
+
+    def _patch(self, datos, pk=None):
+        return self.client.patch(f'/api/productos/{pk or self.producto.id}/', datos, content_type='application/json')
+
+    def test_cambiar_codigo_no_crea_otro_producto(self):
+        """✓ Cambiar el código actualiza la misma fila (antes insertaba un producto nuevo)."""
+        response = self._patch({'codigo': 'P-1-NUEVO'})
+        assert response.status_code == 200
+        assert response.json()['id'] == self.producto.id
+        assert ProductoModel.objects.count() == 2
+        assert ProductoModel.objects.get(pk=self.producto.id).codigo == 'P-1-NUEVO'
+        assert not ProductoModel.objects.filter(codigo='P-1').exists()
+
+    def test_patch_escribe_solo_columnas_cambiadas(self):
+        """✓ PATCH hace una lectura y un UPDATE por id con solo los campos enviados."""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        with CaptureQueriesContext(connection) as contexto:
+            response = self._patch({'nombre': 'Renombrado'})
+        assert response.status_code == 200
+        assert response.json()['precios'] == {"COP": 1000}
+        productos = [q['sql'] for q in contexto.captured_queries if '"productos"' in q['sql']]
+        assert len(productos) == 2
+        update = next(q for q in productos if q.startswith('UPDATE'))
+        assert '"nombre"' in update and '"precios"' not in update and '"codigo"' not in update
+
+    def test_sin_cambios_no_escribe(self):
+        """✓ Enviar los mismos valores no escribe ni sube la versión."""
+        response = self._patch({'nombre': 'Producto', 'precios': {"COP": 1000}})
+        assert response.status_code == 200
+        assert response.json()['version'] == 1
+
+    def test_codigo_duplicado_y_no_encontrado(self):
+        """✓ Un código ya usado responde 400 sin cambios; un id inexistente responde 404."""
+        response = self._patch({'codigo': 'P-2'})
+        assert response.status_code == 400
+        assert "P-2" in response.json()['detail']
+        assert ProductoModel.objects.get(pk=self.producto.id).codigo == 'P-1'
+        assert self._patch({'nombre': 'X'}, pk=999999).status_code == 404
+
+    def test_mover_de_empresa_actualiza_valoraciones(self):
+        """✓ Mover el producto a otra empresa descuenta y suma en ambas valoraciones."""
+        from core.valoracion import valoracion_empresa
+        valoracion_empresa(self.NIT)
+        valoracion_empresa("900654321-2")
+        assert self._patch({'empresa': '900654321-2', 'precios': {'USD': 3}}).status_code == 200
+        assert valoracion_empresa(self.NIT).totales == {'COP': 500}
+        assert valoracion_empresa("900654321-2").totales == {'USD': 3}
+
+    def test_validacion_parcial(self):
+        """✓ Solo se validan los campos enviados; los desconocidos se rechazan."""
+        from core_domain.validacion import validar_cambios_producto
+        validar_cambios_producto({'precios': {'COP': 1}})
+        for cambios in ({'nombre': ''}, {'empresa_nit': ''}, {'id': 3}):
+            with self.assertRaises(ValueError):
+                validar_cambios_producto(cambios)
+
+
 # ============================================================================
 # CONFIGURACIÓN DE PYTEST
 # ============================================================================
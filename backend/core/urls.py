@@ -1,11 +1,14 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import EmpresaViewSet, ProductoViewSet, SystemViewSet
+from .views import EmpresaViewSet, ProductoViewSet, TasaCambioViewSet, CambioViewSet, SystemViewSet, PerfilViewSet
 
 router = DefaultRouter()
 router.register(r'empresas', EmpresaViewSet, basename='empresa')
 router.register(r'productos', ProductoViewSet, basename='producto')
+router.register(r'tasas', TasaCambioViewSet, basename='tasa')
+router.register(r'cambios', CambioViewSet, basename='cambio')
 router.register(r'system', SystemViewSet, basename='system')
+router.register(r'perfiles', PerfilViewSet, basename='perfil')
 
 urlpatterns = [
     path('', include(router.urls)),
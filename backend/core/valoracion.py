@@ -0,0 +1,121 @@
+"""
+Valoración del inventario por empresa (totales por moneda y total convertible).
+
+Cada escritura de productos aplica su delta a `empresas_valoracion` dentro de
+la misma transacción (fila bloqueada con select_for_update) y deja la foto del
+día en `empresas_valoracion_historial`. Leer la valoración es una consulta por
+clave, sin recorrer el catálogo. Las empresas sin fila (ej: cargadas con
+bulk_create) se calculan completas la primera vez que se leen.
+
+El cálculo completo se hace siempre en el primario y con la fila de la empresa
+bloqueada (FOR NO KEY UPDATE, no choca con los FK de los productos). Una
+escritura que no encuentra la valoración toma el mismo bloqueo antes de
+descartar su delta: si un llenado estaba en curso, espera a que confirme y
+aplica el delta sobre la fila nueva.
+"""
+from datetime import timedelta
+
+from decouple import config
+from django.db import transaction
+from django.utils import timezone
+
+from core_domain.dinero import a_decimal
+from core_domain.entities.valoracion import Valoracion
+
+from .models import EmpresaModel, ProductoModel, ValoracionEmpresaModel, ValoracionHistorialModel
+from .replicas import PRIMARIO
+
+VALORACION_INCREMENTAL = config('VALORACION_INCREMENTAL', default=True, cast=bool)
+
+
+def _a_entidad(fila):
+    return Valoracion(
+        empresa_nit=fila.empresa_id,
+        productos=fila.productos,
+        totales={moneda: a_decimal(valor) for moneda, valor in fila.totales.items()},
+        canonicos={moneda: a_decimal(valor) for moneda, valor in fila.canonicos.items()},
+        actualizado=fila.actualizado,
+        fecha=getattr(fila, 'fecha', None),
+    )
+
+
+def calcular_valoracion(nit):
+    """Valoración completa recorriendo los precios de la empresa (solo para filas faltantes)."""
+    valoracion = Valoracion(empresa_nit=nit)
+    precios_empresa = ProductoModel.objects.using(PRIMARIO).filter(empresa_id=nit).values_list('precios', flat=True)
+    for precios in precios_empresa.iterator(chunk_size=2000):
+        valoracion.sumar(precios)
+    return valoracion
+
+
+def guardar_valoracion(valoracion):
+    # Alias explícito: el llenado desde una lectura no cuenta como escritura del cliente
+    campos = {'productos': valoracion.productos, 'totales': valoracion.totales, 'canonicos': valoracion.canonicos}
+    ValoracionEmpresaModel.objects.using(PRIMARIO).bulk_create(
+        [ValoracionEmpresaModel(empresa_id=valoracion.empresa_nit, **campos)],
+        update_conflicts=True, unique_fields=['empresa'], update_fields=[*campos, 'actualizado'],
+    )
+    ValoracionHistorialModel.objects.using(PRIMARIO).bulk_create(
+        [ValoracionHistorialModel(empresa_id=valoracion.empresa_nit, fecha=timezone.localdate(), **campos)],
+        update_conflicts=True, unique_fields=['empresa', 'fecha'], update_fields=[*campos, 'actualizado'],
+    )
+
+
+def _bloquear_empresa(nit):
+    """Bloquea la fila de la empresa (incluida una pendiente de purga). Retorna si existe."""
+    return EmpresaModel.todas.using(PRIMARIO).select_for_update(no_key=True).filter(nit=nit).exists()
+
+
+def _fila_bloqueada(nit):
+    return ValoracionEmpresaModel.objects.using(PRIMARIO).select_for_update().filter(empresa_id=nit).first()
+
+
+def recalcular_valoracion(nit):
+    """Recalcula y guarda la valoración completa de `nit` (ej: tras bulk_update de precios)."""
+    with transaction.atomic(using=PRIMARIO):
+        _bloquear_empresa(nit)
+        valoracion = calcular_valoracion(nit)
+        guardar_valoracion(valoracion)
+    return valoracion
+
+
+def aplicar_cambio(nit, anteriores=None, nuevos=None):
+    """Resta los precios `anteriores` y suma los `nuevos` de un producto de la empresa `nit`."""
+    with transaction.atomic(using=PRIMARIO):
+        fila = _fila_bloqueada(nit)
+        if fila is None:
+            # Si un llenado está en curso, esperarlo: su cálculo no ve este cambio sin confirmar
+            _bloquear_empresa(nit)
+            fila = _fila_bloqueada(nit)
+        if fila is None:
+            # Sin valoración previa no hay a qué aplicar el delta: se calcula completa al leerla.
+            # (Un queryset.delete() envía post_delete cuando ya borró todo el lote.)
+            return
+        valoracion = _a_entidad(fila)
+        valoracion.sumar(anteriores, -1)
+        valoracion.sumar(nuevos)
+        guardar_valoracion(valoracion)
+
+
+def valoracion_empresa(nit):
+    """Valoración vigente de `nit`, o None si la empresa no existe."""
+    fila = ValoracionEmpresaModel.objects.filter(empresa_id=nit).first()
+    if fila is not None:
+        return _a_entidad(fila)
+    if not EmpresaModel.objects.using(PRIMARIO).filter(nit=nit).exists():
+        return None
+    with transaction.atomic(using=PRIMARIO):
+        _bloquear_empresa(nit)
+        # Otro request pudo llenarla mientras esperábamos el bloqueo
+        fila = _fila_bloqueada(nit)
+        if fila is not None:
+            return _a_entidad(fila)
+        valoracion = calcular_valoracion(nit)
+        guardar_valoracion(valoracion)
+    return valoracion
+
+
+def historial_valoracion(nit, dias):
+    desde = timezone.localdate() - timedelta(days=max(dias, 1) - 1)
+    filas = ValoracionHistorialModel.objects.filter(empresa_id=nit, fecha__gte=desde).order_by('-fecha')
+    return [_a_entidad(fila) for fila in filas]
@@ -2,14 +2,30 @@ from rest_framework import viewsets, status
 from rest_framework.permissions import IsAuthenticatedOrReadOnly, IsAuthenticated, AllowAny
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from django.http import FileResponse
-from dataclasses import asdict 
+from django.http import FileResponse, HttpResponse, Http404, StreamingHttpResponse
+from dataclasses import fields
+from functools import lru_cache
 
 from .models import EmpresaModel, ProductoModel
-from .serializers import EmpresaSerializer, ProductoSerializer, SystemStatusSerializer
+from .serializers import (
+    LOTE_MAX_ELEMENTOS, ActualizacionPreciosSerializer, EmpresaSerializer, ProductoSerializer,
+    SystemStatusSerializer, TasaCambioSerializer,
+)
+from .proyecciones import (
+    cambio_a_json, empresa_a_json, producto_a_json, producto_en_moneda_a_json, tasas_a_json,
+)
+from .renderers import ORJSONRenderer
 from .reports import generar_pdf_inventario   
-from .ai import generar_descripcion_ia, procesar_audio_con_ia, chat_con_inventario
-from .permissions import IsAdminOrReadOnly   
+from .ai import (
+    generar_descripcion_ia, procesar_audio_con_ia, chat_con_inventario, validar_audio, cuerpo_excede_limite,
+    AUDIO_MAX_BYTES, SIMULAR_SERVICIOS_EXTERNOS,
+)
+from .permissions import IsAdminOrReadOnly, IsStaff
+from .parser_voz import estadisticas_parser
+from .resiliencia import guardia, LlamadaExternaError
+from .salud import reporte_salud
+from .metricas import cronometro, exportar_metricas
+from .perfilado import listar_perfiles, ruta_perfil
 from .utils import get_email_template
 
 # --- IMPORTS DE DOMINIO (CASOS DE USO) ---
@@ -17,41 +33,102 @@ from core_domain.use_cases.empresa_use_cases import (
     CrearEmpresaUseCase, 
     ListarEmpresasUseCase,
     ObtenerEmpresaPorNitUseCase,
+    ObtenerEmpresasPorNitsUseCase,
     ActualizarEmpresaUseCase,
     EliminarEmpresaUseCase
 )
 from core_domain.use_cases.producto_use_cases import (
     CrearProductoUseCase, 
     ListarProductosPorEmpresaUseCase,
+    ListarProductosPorEmpresasUseCase,
     ObtenerProductoPorIdUseCase,
+    ObtenerProductosPorIdsUseCase,
+    ObtenerEstadisticasEmpresasUseCase,
+    ValidarLoteProductosUseCase,
     ActualizarProductoUseCase,
     EliminarProductoUseCase
 )
+from core_domain.use_cases.moneda_use_cases import (
+    ObtenerTasasCambioUseCase,
+    ActualizarTasaCambioUseCase,
+    ListarProductosEnMonedaUseCase,
+    ActualizarPreciosUseCase,
+    ObtenerValoracionEmpresaUseCase
+)
+from core_domain.use_cases.cambio_use_cases import ListarCambiosUseCase
+from core_domain.validacion import CAMPOS_PRODUCTO
 from core_domain.exceptions import (
     EntityValidationError, 
     BusinessRuleError, 
+    ConflictError,
     InfrastructureError,
     ResourceNotFoundError
 )
 
 # Inyectores
-from .di import get_empresa_repository, get_producto_repository
+from .di import (
+    get_empresa_repository, get_producto_repository, get_tasa_cambio_repository, get_valoracion_repository,
+    get_cambio_repository,
+)
 
 import requests 
 import base64   
+import hmac
 import logging
 from decouple import config 
 
 logger = logging.getLogger(__name__)
 
+# Filas máximas por importación masiva (validar_lote)
+IMPORTACION_MAX_FILAS = config('IMPORTACION_MAX_FILAS', default=10000, cast=int)
+# Eventos por página en /cambios/ (por defecto y máximo)
+CAMBIOS_LIMITE_POR_DEFECTO = config('CAMBIOS_LIMITE_POR_DEFECTO', default=500, cast=int)
+CAMBIOS_MAX_LIMITE = config('CAMBIOS_MAX_LIMITE', default=10000, cast=int)
+# Días máximos de historial en /empresas/{nit}/valoracion/?historial=
+VALORACION_MAX_DIAS = config('VALORACION_MAX_DIAS', default=366, cast=int)
+
+@lru_cache(maxsize=None)
+def _campos(clase):
+    return tuple(campo.name for campo in fields(clase))
+
 def preparar_respuesta(entidad):
     """
     Convierte la dataclass a diccionario para la respuesta JSON.
+    Copia superficial: asdict() haría deep copy de `precios` en cada entidad.
+    """
+    return {campo: getattr(entidad, campo) for campo in _campos(type(entidad))}
+
+def parametro_lista(request, nombre):
+    """
+    Lee `?nombre=a,b,c` como lista sin vacíos.
+    Lanza ValueError si supera LOTE_MAX_ELEMENTOS.
+    """
+    valores = [v.strip() for v in request.query_params.get(nombre, '').split(',') if v.strip()]
+    if len(valores) > LOTE_MAX_ELEMENTOS:
+        raise ValueError(f"Máximo {LOTE_MAX_ELEMENTOS} elementos en ?{nombre}=")
+    return valores
+
+def version_esperada(request, data):
+    """
+    Versión que el cliente leyó: cabecera If-Match (el ETag recibido, ej: "3" o W/"3")
+    o, si no la envía, el campo `version` del cuerpo. None si no envía ninguna.
+    Lanza ValueError si If-Match no es un ETag de este API.
     """
-    data = asdict(entidad)
-    if hasattr(entidad, 'id'):
-        data['id'] = entidad.id
-    return data
+    cabecera = request.headers.get('If-Match')
+    if cabecera is None:
+        return data.get('version')
+    valor = cabecera.strip()
+    if valor == '*':
+        return None
+    valor = valor.removeprefix('W/').strip('"')
+    if not valor.isdigit():
+        raise ValueError('Cabecera If-Match inválida: se espera el ETag del recurso (ej: "3")')
+    return int(valor)
+
+def con_etag(response, entidad):
+    """ETag = versión de la entidad, para enviarla después en If-Match."""
+    response['ETag'] = f'"{entidad.version}"'
+    return response
 
 # =========================================================
 # EMPRESA VIEWSET
@@ -66,8 +143,43 @@ class EmpresaViewSet(viewsets.GenericViewSet):
         try:
             repo = get_empresa_repository()
             use_case = ListarEmpresasUseCase(repo)
-            data = [preparar_respuesta(e) for e in use_case.execute()]
-            return Response(self.get_serializer(data, many=True).data)
+            data = [empresa_a_json(e) for e in use_case.execute()]
+
+            # ?include=stats: conteo y total/min/max por moneda en una consulta agrupada
+            if 'stats' in request.query_params.get('include', '').split(','):
+                stats_use_case = ObtenerEstadisticasEmpresasUseCase(get_producto_repository())
+                stats = stats_use_case.execute([e['nit'] for e in data])
+                for empresa in data:
+                    empresa['stats'] = stats[empresa['nit']]
+            return Response(data)
+        except Exception as e:
+            return Response({"detail": str(e)}, status=500)
+
+    @action(detail=False, methods=['get'])
+    def lote(self, request):
+        """Varias empresas en una sola consulta: ?nits=NIT1,NIT2"""
+        try:
+            nits = parametro_lista(request, 'nits')
+            if not nits: return Response({"detail": "?nits=NIT1,NIT2 requerido"}, status=400)
+
+            use_case = ObtenerEmpresasPorNitsUseCase(get_empresa_repository())
+            return Response([empresa_a_json(e) for e in use_case.execute(nits)])
+        except ValueError as e:
+            return Response({"detail": str(e)}, status=400)
+        except Exception as e:
+            return Response({"detail": str(e)}, status=500)
+
+    @action(detail=True, methods=['get'])
+    def valoracion(self, request, nit=None):
+        """Valor del inventario (precalculado): ?moneda=USD para el total, ?historial=30 para días anteriores."""
+        try:
+            dias = min(int(request.query_params.get('historial', 0)), VALORACION_MAX_DIAS)
+            use_case = ObtenerValoracionEmpresaUseCase(get_valoracion_repository(), get_tasa_cambio_repository())
+            return Response(use_case.execute(nit, request.query_params.get('moneda'), dias))
+        except ResourceNotFoundError as e:
+            return Response({"detail": str(e)}, status=404)
+        except (ValueError, BusinessRuleError) as e:
+            return Response({"detail": str(e)}, status=400)
         except Exception as e:
             return Response({"detail": str(e)}, status=500)
 
@@ -79,7 +191,7 @@ class EmpresaViewSet(viewsets.GenericViewSet):
             val = nit or kwargs.get('nit') or kwargs.get('pk')
             empresa = use_case.execute(val)
             
-            return Response(self.get_serializer(preparar_respuesta(empresa)).data)
+            return con_etag(Response(self.get_serializer(preparar_respuesta(empresa)).data), empresa)
         except ResourceNotFoundError as e:
             return Response({"detail": str(e)}, status=404)
         except Exception as e:
@@ -100,7 +212,7 @@ class EmpresaViewSet(viewsets.GenericViewSet):
                 direccion=data.get('direccion'), 
                 telefono=data.get('telefono')
             )
-            return Response(self.get_serializer(preparar_respuesta(res)).data, status=201)
+            return con_etag(Response(self.get_serializer(preparar_respuesta(res)).data, status=201), res)
             
         except (EntityValidationError, BusinessRuleError) as e:
             return Response({"detail": str(e)}, status=400)
@@ -126,13 +238,16 @@ class EmpresaViewSet(viewsets.GenericViewSet):
                 nit=nit_url, 
                 nombre=validated_data.get('nombre'),
                 direccion=validated_data.get('direccion'), 
-                telefono=validated_data.get('telefono')
+                telefono=validated_data.get('telefono'),
+                version=version_esperada(request, validated_data)
             )
-            return Response(self.get_serializer(preparar_respuesta(res)).data, status=200)
+            return con_etag(Response(self.get_serializer(preparar_respuesta(res)).data, status=200), res)
             
         except ResourceNotFoundError as e:
             return Response({"detail": str(e)}, status=404)
-        except (EntityValidationError, BusinessRuleError) as e:
+        except ConflictError as e:
+            return Response({"detail": str(e)}, status=409)
+        except (EntityValidationError, BusinessRuleError, ValueError) as e:
             return Response({"detail": str(e)}, status=400)
         except Exception as e:
             return Response({"detail": f"Error interno: {str(e)}"}, status=500)
@@ -167,23 +282,104 @@ class ProductoViewSet(viewsets.GenericViewSet):
     def list(self, request, *args, **kwargs):
         try:
             nit = request.query_params.get('empresa')
-            if not nit: return Response({"error": "?empresa=NIT requerido"}, status=400)
+            nits = parametro_lista(request, 'empresas')
+            if not nit and not nits:
+                return Response({"error": "?empresa=NIT o ?empresas=NIT1,NIT2 requerido"}, status=400)
             
             repo = get_producto_repository()
-            use_case = ListarProductosPorEmpresaUseCase(repo)
+            # ?moneda=USD: cada producto trae `precio` convertido con la tabla de tasas
+            moneda = request.query_params.get('moneda')
+            if moneda:
+                use_case = ListarProductosEnMonedaUseCase(repo, get_tasa_cambio_repository())
+                filas = use_case.execute(nits or [nit], moneda)
+                return Response([producto_en_moneda_a_json(p, precio) for p, precio in filas])
+
+            if nits:
+                productos = ListarProductosPorEmpresasUseCase(repo).execute(nits)
+            else:
+                productos = ListarProductosPorEmpresaUseCase(repo).execute(nit)
             
-            data = [preparar_respuesta(p) for p in use_case.execute(nit)]
-            return Response(self.get_serializer(data, many=True).data)
+            return Response([producto_a_json(p) for p in productos])
+        except (ValueError, BusinessRuleError, EntityValidationError) as e:
+            return Response({"error": str(e)}, status=400)
         except Exception as e:
             logger.error(f"Error List: {e}")
             return Response({"error": str(e)}, status=500)
 
+    @action(detail=False, methods=['post'])
+    def validar_lote(self, request):
+        """Valida una importación (lista de productos) y retorna todos los errores por fila, sin guardar."""
+        try:
+            filas = request.data
+            if not isinstance(filas, list) or not all(isinstance(f, dict) for f in filas):
+                return Response({"detail": "Se espera una lista de productos."}, status=400)
+            if len(filas) > IMPORTACION_MAX_FILAS:
+                return Response({"detail": f"Máximo {IMPORTACION_MAX_FILAS} filas por lote."}, status=400)
+
+            filas = [{**f, 'empresa_nit': f.get('empresa')} for f in filas]
+            use_case = ValidarLoteProductosUseCase(get_producto_repository(), get_empresa_repository())
+            resultado = use_case.execute(filas)
+            return Response({
+                "total": len(filas),
+                "validas": len(resultado.validas),
+                "errores": [{"fila": e.fila, "campo": e.campo, "mensaje": e.mensaje} for e in resultado.errores],
+            })
+        except Exception as e:
+            return Response({"detail": str(e)}, status=500)
+
+    @action(detail=False, methods=['post'])
+    def actualizar_precios(self, request):
+        """
+        Cambio masivo de precios en una transacción (solo staff):
+        {"empresa": NIT, "operacion": "porcentaje|sumar|asignar|convertir", "moneda": "USD",
+         "valor": 5, "buscar": "texto", "ids": [1, 2]} -> {"actualizados": n}
+        """
+        try:
+            serializer = ActualizacionPreciosSerializer(data=request.data)
+            if not serializer.is_valid():
+                return Response(serializer.errors, status=400)
+            data = serializer.validated_data
+
+            use_case = ActualizarPreciosUseCase(
+                get_producto_repository(), get_tasa_cambio_repository(), get_empresa_repository()
+            )
+            actualizados = use_case.execute(
+                empresa_nit=data['empresa'],
+                operacion=data['operacion'],
+                moneda=data['moneda'],
+                valor=data.get('valor'),
+                buscar=data.get('buscar'),
+                ids=data.get('ids'),
+            )
+            return Response({"actualizados": actualizados})
+        except ResourceNotFoundError as e:
+            return Response({"detail": str(e)}, status=404)
+        except (EntityValidationError, BusinessRuleError) as e:
+            return Response({"detail": str(e)}, status=400)
+        except Exception as e:
+            logger.error(f"Error actualizar_precios: {e}")
+            return Response({"detail": str(e)}, status=500)
+
+    @action(detail=False, methods=['get'])
+    def lote(self, request):
+        """Varios productos en una sola consulta: ?ids=1,2,3"""
+        try:
+            ids = [int(i) for i in parametro_lista(request, 'ids')]
+            if not ids: return Response({"error": "?ids=1,2,3 requerido"}, status=400)
+
+            use_case = ObtenerProductosPorIdsUseCase(get_producto_repository())
+            return Response([producto_a_json(p) for p in use_case.execute(ids)])
+        except ValueError as e:
+            return Response({"error": str(e)}, status=400)
+        except Exception as e:
+            return Response({"error": str(e)}, status=500)
+
     def retrieve(self, request, pk=None, *args, **kwargs):
         try:
             repo = get_producto_repository()
             use_case = ObtenerProductoPorIdUseCase(repo)
             prod = use_case.execute(pk)
-            return Response(self.get_serializer(preparar_respuesta(prod)).data)
+            return con_etag(Response(self.get_serializer(preparar_respuesta(prod)).data), prod)
         except ResourceNotFoundError as e:
             return Response({"detail": str(e)}, status=404)
         except Exception as e:
@@ -205,8 +401,10 @@ class ProductoViewSet(viewsets.GenericViewSet):
                 empresa_nit=data.get('empresa_nit'), 
                 precios=data.get('precios')
             )
-            return Response(self.get_serializer(preparar_respuesta(prod)).data, status=201)
-        except (EntityValidationError, ValueError) as e:
+            return con_etag(Response(self.get_serializer(preparar_respuesta(prod)).data, status=201), prod)
+        except ConflictError as e:
+            return Response({"detail": str(e)}, status=409)
+        except (EntityValidationError, BusinessRuleError, ValueError) as e:
              return Response({"detail": str(e)}, status=400)
         except Exception as e:
             logger.error(f"Error Create: {e}")
@@ -215,32 +413,22 @@ class ProductoViewSet(viewsets.GenericViewSet):
     def update(self, request, *args, **kwargs):
         try:
             pk = kwargs.get('pk') 
-            
-            repo = get_producto_repository()
-            use_case_get = ObtenerProductoPorIdUseCase(repo)
-            current_prod = use_case_get.execute(pk)
 
             partial = kwargs.pop('partial', False)
             serializer = self.get_serializer(data=request.data, partial=partial)
             serializer.is_valid(raise_exception=True)
             data = serializer.validated_data
 
-            use_case_update = ActualizarProductoUseCase(repo)
-            
-            new_empresa_nit = data.get('empresa_nit') or current_prod.empresa_nit
-
-            prod = use_case_update.execute(
-                id_producto=pk,
-                codigo=data.get('codigo', current_prod.codigo),
-                nombre=data.get('nombre', current_prod.nombre),
-                caracteristicas=data.get('caracteristicas', current_prod.caracteristicas),
-                empresa_nit=new_empresa_nit,
-                precios=data.get('precios', current_prod.precios)
-            )
-            return Response(self.get_serializer(preparar_respuesta(prod)).data, status=200)
+            # PATCH envía solo los campos a cambiar; el repositorio actualiza por id en un UPDATE
+            cambios = {campo: data[campo] for campo in CAMPOS_PRODUCTO if campo in data}
+            use_case = ActualizarProductoUseCase(get_producto_repository())
+            prod = use_case.execute(pk, cambios, version=version_esperada(request, data))
+            return con_etag(Response(self.get_serializer(preparar_respuesta(prod)).data, status=200), prod)
 
         except ResourceNotFoundError as e:
             return Response({"detail": str(e)}, status=404)
+        except ConflictError as e:
+            return Response({"detail": str(e)}, status=409)
         except Exception as e:
             logger.error(f"Error Update: {e}")
             return Response({"detail": str(e)}, status=400)
@@ -270,16 +458,38 @@ class ProductoViewSet(viewsets.GenericViewSet):
             repo = get_producto_repository()
             use_case = ListarProductosPorEmpresaUseCase(repo)
             productos = use_case.execute(nit)
+            tasas = ObtenerTasasCambioUseCase(get_tasa_cambio_repository()).execute()
             datos = [{"n": p.nombre, "p": p.precios, "cod": p.codigo, "c": p.caracteristicas} for p in productos]
-            rta = chat_con_inventario(historial, datos)
+            # Equivalencias ya calculadas: el modelo no hace aritmética de monedas
+            for moneda in tasas.monedas:
+                for fila, precio in zip(datos, tasas.convertir_catalogo((d["p"] for d in datos), moneda)):
+                    if precio is not None and moneda not in fila["p"]:
+                        fila.setdefault("eq", {})[moneda] = precio.monto
+            try:
+                valor = ObtenerValoracionEmpresaUseCase(
+                    get_valoracion_repository(), get_tasa_cambio_repository()
+                ).execute(nit) if nit else None
+            except ResourceNotFoundError:
+                # NIT desconocido: se conversa igual, sin el valor del inventario
+                valor = None
+            rta = chat_con_inventario(historial, datos, tasas, valor)
             return Response({"respuesta": rta})
         except: return Response({"error": "IA Off"}, status=503)
 
     @action(detail=False, methods=['post'], permission_classes=[IsAuthenticated])
     def interpretar_voz(self, request):
         try:
+            # Antes de request.FILES: Django aún no ha leído ni guardado el cuerpo
+            if cuerpo_excede_limite(request.META.get('CONTENT_LENGTH')):
+                return Response({"error": f"El audio supera el tamaño máximo permitido "
+                                          f"({AUDIO_MAX_BYTES // (1024 * 1024)} MB)."}, status=413)
             f = request.FILES.get('audio')
+            error = validar_audio(f, request.data.get('duracion'))
+            if error:
+                return Response({"error": error.mensaje}, status=error.status)
             return Response(procesar_audio_con_ia(f) or {"error": "N/A"})
+        except LlamadaExternaError as e:
+            return Response({"error": str(e)}, status=503)
         except: return Response({"error": "Error"}, 500)
 
     @action(detail=False, methods=['get'])
@@ -369,6 +579,7 @@ class ProductoViewSet(viewsets.GenericViewSet):
             sender_email = config('RESEND_FROM_EMAIL', default='')
 
             if not resend_api_key: return Response({"message": "Correo simulado (Falta API Key)"})
+            if SIMULAR_SERVICIOS_EXTERNOS: return Response({"message": "Correo simulado"})
 
             url = "https://api.resend.com/emails"
             html_body = get_email_template(email_destino)
@@ -382,25 +593,156 @@ class ProductoViewSet(viewsets.GenericViewSet):
             }
             
             headers = {"Authorization": f"Bearer {resend_api_key}", "Content-Type": "application/json"}
-            response = requests.post(url, json=payload, headers=headers)
+            with cronometro('resend_email'), guardia('resend').llamada() as llamada:
+                response = requests.post(url, json=payload, headers=headers, timeout=llamada.timeout)
+                if response.status_code >= 500:
+                    llamada.marcar_fallo()
             
             if response.status_code == 200:
                 return Response({"message": "Correo enviado", "id": response.json().get('id')}, status=200)
             else:
                 return Response({"error": f"Error Resend: {response.text}"}, status=400)
         
+        except LlamadaExternaError as e:
+            return Response({"error": str(e)}, status=503)
         except Exception as e:
             return Response({"error": "Error envío"}, status=500)
 
 
+# =========================================================
+# TASAS DE CAMBIO VIEWSET
+# =========================================================
+class TasaCambioViewSet(viewsets.GenericViewSet):
+    """Tabla de tasas respecto a la moneda base. Lectura para autenticados, edición solo staff."""
+    serializer_class = TasaCambioSerializer
+    permission_classes = [IsAdminOrReadOnly]
+    lookup_field = 'moneda'
+    lookup_value_regex = '[A-Za-z]{3}'
+
+    def list(self, request):
+        try:
+            tabla = ObtenerTasasCambioUseCase(get_tasa_cambio_repository()).execute()
+            return Response(tasas_a_json(tabla))
+        except Exception as e:
+            return Response({"detail": str(e)}, status=500)
+
+    def update(self, request, moneda=None, *args, **kwargs):
+        try:
+            serializer = self.get_serializer(data=request.data)
+            if not serializer.is_valid():
+                return Response(serializer.errors, status=400)
+
+            use_case = ActualizarTasaCambioUseCase(get_tasa_cambio_repository())
+            tabla = use_case.execute(moneda, serializer.validated_data['tasa'])
+            return Response(tasas_a_json(tabla))
+        except (EntityValidationError, BusinessRuleError) as e:
+            return Response({"detail": str(e)}, status=400)
+        except Exception as e:
+            return Response({"detail": str(e)}, status=500)
+
+
+# =========================================================
+# REGISTRO DE CAMBIOS VIEWSET
+# =========================================================
+def lineas_ndjson(cambios):
+    renderer = ORJSONRenderer()
+    for cambio in cambios:
+        yield renderer.render(cambio_a_json(cambio)) + b"\n"
+
+class CambioViewSet(viewsets.GenericViewSet):
+    """
+    Cambios de empresas y productos para sincronización incremental (solo staff).
+    GET /api/cambios/?since=<cursor>&limit=500 -> {"cambios": [...], "cursor": N, "hay_mas": bool}
+    Con ?formato=ndjson los eventos se transmiten uno por línea; el cursor es el último `id`.
+    """
+    permission_classes = [IsStaff]
+
+    def list(self, request):
+        try:
+            cursor = int(request.query_params.get('since', 0))
+            limite = min(int(request.query_params.get('limit', CAMBIOS_LIMITE_POR_DEFECTO)), CAMBIOS_MAX_LIMITE)
+            cambios = ListarCambiosUseCase(get_cambio_repository()).execute(cursor, limite)
+
+            if request.query_params.get('formato') == 'ndjson':
+                return StreamingHttpResponse(lineas_ndjson(cambios), content_type='application/x-ndjson')
+
+            eventos = [cambio_a_json(c) for c in cambios]
+            return Response({
+                "cambios": eventos,
+                "cursor": eventos[-1]['id'] if eventos else cursor,
+                "hay_mas": len(eventos) == limite,
+            })
+        except (ValueError, EntityValidationError) as e:
+            return Response({"detail": str(e)}, status=400)
+        except Exception as e:
+            return Response({"detail": str(e)}, status=500)
+
+
 class SystemViewSet(viewsets.GenericViewSet):
     permission_classes = [AllowAny]
     serializer_class = SystemStatusSerializer
 
+    def _staff_o_token(self, request, variable, cabecera):
+        # Staff o quien envíe el token configurado en `variable` (ej: el
+        # monitoreo). Sin token configurado solo entra staff.
+        if request.user and request.user.is_staff:
+            return True
+        token = config(variable, default='')
+        enviado = request.headers.get(cabecera, '')
+        return bool(token) and hmac.compare_digest(enviado.encode(), token.encode())
+
+    def _ver_detalle(self, request):
+        # El detalle (errores de BD, pool, réplicas, breakers) no es público
+        return self._staff_o_token(request, 'SALUD_TOKEN', 'X-Salud-Token')
+
     def list(self, request):
-        return Response({
+        listo, salud = reporte_salud()
+        respuesta = {
             "api": "Lite Thinking Backend",
             "version": "1.0.0", 
             "status": "Online",
-            "database": "Connected"
-        })
\ No newline at end of file
+            "degradado": salud['degradado'],
+        }
+        if self._ver_detalle(request):
+            respuesta.update({
+                "database": "Connected" if salud['database']['ok'] else "Disconnected",
+                "parser_voz": estadisticas_parser(),
+                "dependencias": salud['dependencias'],
+            })
+        return Response(respuesta)
+
+    @action(detail=False, methods=['get'])
+    def metrics(self, request):
+        # Formato de texto de Prometheus (no pasa por el renderer JSON de DRF).
+        # Rutas, latencias y estado de dependencias no son públicos.
+        if not self._staff_o_token(request, 'METRICS_TOKEN', 'X-Metrics-Token'):
+            return HttpResponse(status=403 if request.user.is_authenticated else 401)
+        return HttpResponse(exportar_metricas(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+    @action(detail=False, methods=['get'])
+    def liveness(self, request):
+        # Solo confirma que el proceso responde; no toca dependencias.
+        return Response({"status": "alive"})
+
+    @action(detail=False, methods=['get'])
+    def readiness(self, request):
+        listo, salud = reporte_salud()
+        if not self._ver_detalle(request):
+            salud = {"status": salud['status'], "degradado": salud['degradado']}
+        return Response(salud, status=200 if listo else 503)
+
+
+class PerfilViewSet(viewsets.ViewSet):
+    """Descarga de perfiles generados con `X-Profile: 1` (solo staff)."""
+    permission_classes = [IsStaff]
+    lookup_value_regex = '[0-9a-f]{32}'
+
+    def list(self, request):
+        return Response(listar_perfiles())
+
+    def retrieve(self, request, pk=None):
+        formato = request.query_params.get('formato', 'json')
+        ruta = ruta_perfil(pk, formato)
+        if not ruta:
+            raise Http404("Perfil no encontrado")
+        return FileResponse(open(ruta, 'rb'), as_attachment=True, filename=f"perfil-{pk}.{formato}")
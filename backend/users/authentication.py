@@ -0,0 +1,92 @@
+from decouple import config
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+# Segundos que un usuario queda en caché tras leerse de la BD
+AUTH_USUARIO_CACHE_SEGUNDOS = config('AUTH_USUARIO_CACHE_SEGUNDOS', default=60, cast=int)
+# Si es True, el usuario se arma solo con los claims firmados del token (0 consultas).
+# Contra: un cambio de is_staff/is_active solo aplica cuando el token expira.
+JWT_CONFIAR_CLAIMS = config('JWT_CONFIAR_CLAIMS', default=False, cast=bool)
+
+
+# Lo único que se guarda en caché: lo necesario para autorizar, nunca el hash
+# de la contraseña ni grupos/permisos (esos se cargan de la BD si se piden).
+CAMPOS_CACHEADOS = ('id', 'is_active', 'is_staff', 'is_superuser')
+
+
+def clave_usuario(user_id):
+    return f"auth:usuario:{user_id}"
+
+
+def invalidar_usuario(user_id):
+    cache.delete(clave_usuario(user_id))
+
+
+def invalidar_usuarios(ids):
+    cache.delete_many([clave_usuario(user_id) for user_id in ids])
+
+
+def _usuario_liviano(datos):
+    """
+    Instancia diferida con solo CAMPOS_CACHEADOS: cualquier otro campo se lee de
+    la BD al accederlo y un save() solo escribe los campos cargados.
+    """
+    User = get_user_model()
+    # from_db espera los valores en el orden de los campos del modelo
+    campos = [f.attname for f in User._meta.concrete_fields if f.attname in datos]
+    return User.from_db(None, campos, [datos[campo] for campo in campos])
+
+
+def obtener_usuario(user_id):
+    """Usuario desde la caché o la BD. Lanza User.DoesNotExist si no existe."""
+    clave = clave_usuario(user_id)
+    datos = cache.get(clave)
+    if datos is None:
+        fila = (
+            get_user_model().objects
+            .filter(**{api_settings.USER_ID_FIELD: user_id})
+            .values(*CAMPOS_CACHEADOS)
+            .get()
+        )
+        datos = dict(fila)
+        cache.set(clave, datos, AUTH_USUARIO_CACHE_SEGUNDOS)
+    return _usuario_liviano(datos)
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication sin el SELECT de User en cada request:
+    - Modo claims (JWT_CONFIAR_CLAIMS): usa is_staff/is_active embebidos en el token.
+    - Modo caché (por defecto): cachea CAMPOS_CACHEADOS del usuario con TTL corto;
+      se invalida al guardar/eliminar el usuario (ver users/signals.py) y en los
+      update() por queryset (ver UserQuerySet).
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken("Token contained no recognizable user identification")
+
+        if JWT_CONFIAR_CLAIMS and 'is_staff' in validated_token:
+            if not validated_token.get('is_active', True):
+                raise AuthenticationFailed("User is inactive", code="user_inactive")
+            return TokenUser(validated_token)
+
+        try:
+            user = obtener_usuario(user_id)
+        except self.user_model.DoesNotExist:
+            raise AuthenticationFailed("User not found", code="user_not_found")
+
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed("User is inactive", code="user_inactive")
+        if api_settings.CHECK_REVOKE_TOKEN:
+            # Solo en este modo se necesita el hash; se lee de la BD, no de la caché
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed("The user's password has been changed.", code="password_changed")
+        return user
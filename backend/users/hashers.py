@@ -0,0 +1,62 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from decouple import config
+from django.contrib.auth.hashers import Argon2PasswordHasher, PBKDF2PasswordHasher
+from rest_framework.exceptions import APIException
+
+# Hashes simultáneos por proceso. PBKDF2 (OpenSSL) y Argon2 liberan el GIL,
+# así que el pool usa varios núcleos sin dejar que una ráfaga de logins los acapare.
+HASH_MAX_CONCURRENCIA = config('HASH_MAX_CONCURRENCIA', default=os.cpu_count() or 2, cast=int)
+HASH_MAX_COLA = config('HASH_MAX_COLA', default=HASH_MAX_CONCURRENCIA * 4, cast=int)
+HASH_MAX_ESPERA_SEGUNDOS = config('HASH_MAX_ESPERA_SEGUNDOS', default=5.0, cast=float)
+
+_pool = ThreadPoolExecutor(max_workers=HASH_MAX_CONCURRENCIA, thread_name_prefix='hash')
+_cupos = threading.BoundedSemaphore(HASH_MAX_CONCURRENCIA + HASH_MAX_COLA)
+_hilo = threading.local()
+
+
+class HashSaturadoError(APIException):
+    status_code = 503
+    default_detail = "Servicio de autenticación saturado. Intente de nuevo en unos segundos."
+    default_code = 'hash_saturado'
+
+
+def _en_pool(funcion, *args):
+    _hilo.en_pool = True
+    try:
+        return funcion(*args)
+    finally:
+        _hilo.en_pool = False
+
+
+def ejecutar_acotado(funcion, *args):
+    """Ejecuta el hash en el pool; si la cola está llena, falla rápido con 503."""
+    if getattr(_hilo, 'en_pool', False):
+        # verify() de PBKDF2 llama a encode(): ya estamos dentro del pool
+        return funcion(*args)
+    if not _cupos.acquire(timeout=HASH_MAX_ESPERA_SEGUNDOS):
+        raise HashSaturadoError()
+    try:
+        return _pool.submit(_en_pool, funcion, *args).result()
+    finally:
+        _cupos.release()
+
+
+class HashAcotadoMixin:
+    """Conserva el `algorithm` del hasher base, así los hashes existentes siguen siendo válidos."""
+
+    def encode(self, password, salt, *args):
+        return ejecutar_acotado(super().encode, password, salt, *args)
+
+    def verify(self, password, encoded):
+        return ejecutar_acotado(super().verify, password, encoded)
+
+
+class PBKDF2AcotadoHasher(HashAcotadoMixin, PBKDF2PasswordHasher):
+    pass
+
+
+class Argon2AcotadoHasher(HashAcotadoMixin, Argon2PasswordHasher):
+    pass
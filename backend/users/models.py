@@ -1,7 +1,18 @@
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager, PermissionsMixin
 from django.db import models
 
-class UserManager(BaseUserManager):
+class UserQuerySet(models.QuerySet):
+    def update(self, **kwargs):
+        # update() no envía post_save: la caché de autenticación se invalida aquí
+        # para que un .update(is_active=False) masivo aplique de inmediato.
+        from .authentication import invalidar_usuarios
+        ids = list(self.values_list('pk', flat=True))
+        filas = super().update(**kwargs)
+        invalidar_usuarios(ids)
+        return filas
+
+
+class UserManager(BaseUserManager.from_queryset(UserQuerySet)):
     def create_user(self, email, password=None, **extra_fields):
         if not email:
             raise ValueError('El usuario debe tener un correo electrónico')
@@ -0,0 +1,20 @@
+from rest_framework.throttling import SimpleRateThrottle
+
+
+class IPRateThrottle(SimpleRateThrottle):
+    """Límite por IP, esté o no autenticado el cliente."""
+
+    def get_cache_key(self, request, view):
+        return self.cache_format % {'scope': self.scope, 'ident': self.get_ident(request)}
+
+
+class LoginRateThrottle(IPRateThrottle):
+    scope = 'login'
+
+
+class RegistroRateThrottle(IPRateThrottle):
+    scope = 'registro'
+
+
+class RefreshRateThrottle(IPRateThrottle):
+    scope = 'refresh'
@@ -0,0 +1,66 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.utils import datetime_from_epoch, datetime_to_epoch
+
+# La BD es la fuente de verdad de la blacklist; la caché solo evita repetir la
+# consulta. Un "no está en la blacklist" solo se recuerda con caché compartida
+# (Redis/Memcached): con LocMem cada proceso tiene su propia caché y no vería
+# el blacklist() hecho por otro proceso.
+BLACKLIST_NEGATIVA_EN_CACHE = 'LocMemCache' not in settings.CACHES['default']['BACKEND']
+EN_BLACKLIST, FUERA_DE_BLACKLIST = 1, 0
+
+
+def clave_blacklist(jti):
+    return f"auth:blacklist:{jti}"
+
+
+class RefreshTokenCacheado(RefreshToken):
+    """
+    RefreshToken con la blacklist respaldada en caché y sin el SELECT de User
+    que hace simplejwt en blacklist()/outstand() (se usa el user_id del payload).
+    """
+
+    def _segundos_restantes(self):
+        # Basta con recordarlo hasta que expire: después el token es inválido de todos modos
+        restante = self.payload['exp'] - datetime_to_epoch(self.current_time)
+        return max(int(restante), 1)
+
+    def check_blacklist(self):
+        clave = clave_blacklist(self.payload[api_settings.JTI_CLAIM])
+        estado = cache.get(clave)
+        if estado == EN_BLACKLIST:
+            raise TokenError(_("Token is blacklisted"))
+        if estado == FUERA_DE_BLACKLIST:
+            return
+        # Fallo de caché (expulsada, reiniciada o nunca escrita): decide la BD
+        super().check_blacklist()
+        if BLACKLIST_NEGATIVA_EN_CACHE:
+            # add() y no set(): si blacklist() escribió entre la consulta y
+            # este punto, su entrada no se pisa
+            cache.add(clave, FUERA_DE_BLACKLIST, self._segundos_restantes())
+
+    def _registrar_pendiente(self):
+        return OutstandingToken.objects.get_or_create(
+            jti=self.payload[api_settings.JTI_CLAIM],
+            defaults={
+                'user_id': self.payload.get(api_settings.USER_ID_CLAIM),
+                'created_at': self.current_time,
+                'token': str(self),
+                'expires_at': datetime_from_epoch(self.payload['exp']),
+            },
+        )
+
+    def blacklist(self):
+        token, _creado = self._registrar_pendiente()
+        resultado = BlacklistedToken.objects.get_or_create(token=token)
+        # set() sobrescribe la entrada negativa que haya dejado check_blacklist()
+        cache.set(clave_blacklist(self.payload[api_settings.JTI_CLAIM]), EN_BLACKLIST, self._segundos_restantes())
+        return resultado
+
+    def outstand(self):
+        return self._registrar_pendiente()
@@ -1,19 +1,75 @@
+from django.contrib.auth import get_user_model
 from rest_framework import generics
 from rest_framework.permissions import AllowAny
 from .serializers import UserRegistrationSerializer
+from .authentication import obtener_usuario
+from .throttles import LoginRateThrottle, RegistroRateThrottle, RefreshRateThrottle
+from .tokens import RefreshTokenCacheado
 
-from rest_framework_simplejwt.views import TokenObtainPairView
-from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
 
 class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
+    token_class = RefreshTokenCacheado
+
+    @classmethod
+    def get_token(cls, user):
+        token = super().get_token(user)
+        # Claims firmados para autorizar sin consultar la BD (ver CachedJWTAuthentication)
+        token['is_staff'] = user.is_staff
+        token['is_active'] = user.is_active
+        return token
+
     def validate(self, attrs):
         data = super().validate(attrs)
         data['is_admin'] = self.user.is_staff 
         data['email'] = self.user.email
         return data
+
+class CustomTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    Igual que el de simplejwt pero con el usuario desde la caché y los claims
+    is_staff/is_active actualizados en cada rotación.
+    """
+    token_class = RefreshTokenCacheado
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs["refresh"])
+
+        user_id = refresh.payload.get(api_settings.USER_ID_CLAIM)
+        try:
+            user = obtener_usuario(user_id)
+        except get_user_model().DoesNotExist:
+            user = None
+        if user is None or not api_settings.USER_AUTHENTICATION_RULE(user):
+            raise AuthenticationFailed(self.error_messages["no_active_account"], "no_active_account")
+
+        refresh['is_staff'] = user.is_staff
+        refresh['is_active'] = user.is_active
+        data = {"access": str(refresh.access_token)}
+
+        if api_settings.ROTATE_REFRESH_TOKENS:
+            if api_settings.BLACKLIST_AFTER_ROTATION:
+                refresh.blacklist()
+            refresh.set_jti()
+            refresh.set_exp()
+            refresh.set_iat()
+            refresh.outstand()
+            data["refresh"] = str(refresh)
+
+        return data
+
 class CustomLoginView(TokenObtainPairView):
     serializer_class = CustomTokenObtainPairSerializer
+    throttle_classes = [LoginRateThrottle]
+
+class CustomTokenRefreshView(TokenRefreshView):
+    serializer_class = CustomTokenRefreshSerializer
+    throttle_classes = [RefreshRateThrottle]
 
 class UserRegistrationView(generics.CreateAPIView):
     serializer_class = UserRegistrationSerializer
-    permission_classes = [AllowAny]
\ No newline at end of file
+    permission_classes = [AllowAny]
+    throttle_classes = [RegistroRateThrottle]
@@ -0,0 +1,185 @@
+"""
+Aritmética de precios con Decimal y conversión entre monedas.
+
+- a_decimal: normaliza lo que llega del JSON (float/int/str) sin arrastrar el
+  error binario de los float (0.1 -> Decimal('0.1'), no 0.1000000000000000055...).
+- Dinero: monto + moneda, redondeado a los decimales de la moneda.
+- TablaTasas: tasas respecto a una moneda base (cuántas unidades de la base
+  vale 1 unidad de cada moneda). Convierte un precio o un catálogo completo.
+"""
+from dataclasses import dataclass
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+from typing import Any, Dict, Iterable, List, Optional
+
+MONEDA_BASE = 'COP'
+
+# Decimales con los que se presenta cada moneda (el resto usa 2)
+DECIMALES_MONEDA = {'COP': 0}
+DECIMALES_POR_DEFECTO = 2
+
+
+def a_decimal(valor: Any) -> Decimal:
+    """Convierte un precio a Decimal. Lanza ValueError si no es numérico."""
+    if isinstance(valor, Decimal):
+        return valor
+    if isinstance(valor, bool):
+        raise ValueError(f"Precio inválido: {valor!r}")
+    try:
+        # str() usa la representación corta del float: 19.99 -> '19.99'
+        return Decimal(str(valor)) if isinstance(valor, float) else Decimal(valor)
+    except (InvalidOperation, TypeError):
+        raise ValueError(f"Precio inválido: {valor!r}")
+
+
+def cuanto(moneda: str) -> Decimal:
+    """Unidad mínima de la moneda para redondear (COP -> 1, USD -> 0.01)."""
+    return Decimal(1).scaleb(-DECIMALES_MONEDA.get(moneda, DECIMALES_POR_DEFECTO))
+
+
+def redondear(monto: Decimal, moneda: str) -> Decimal:
+    return monto.quantize(cuanto(moneda), rounding=ROUND_HALF_UP)
+
+
+@dataclass(frozen=True, slots=True)
+class Dinero:
+    monto: Decimal
+    moneda: str
+
+    @classmethod
+    def de(cls, monto: Any, moneda: str) -> "Dinero":
+        return cls(redondear(a_decimal(monto), moneda), moneda)
+
+    def formato(self) -> str:
+        """Texto para reportes: 'COP 1,250,000' / 'USD 19.99'."""
+        return f"{self.moneda} {self.monto:,}"
+
+    def a_json(self):
+        """Número para el JSON de precios: int si es entero, si no float (ya redondeado)."""
+        return int(self.monto) if self.monto == self.monto.to_integral_value() else float(self.monto)
+
+
+class TablaTasas:
+    """
+    Tasas de cambio inmutables respecto a `base`.
+    tasas = {'COP': 1, 'USD': 4150, 'EUR': 4350} -> 1 USD = 4150 COP.
+    """
+    __slots__ = ('base', '_tasas')
+
+    def __init__(self, tasas: Dict[str, Any], base: str = MONEDA_BASE):
+        self.base = base
+        self._tasas = {moneda.upper(): a_decimal(valor) for moneda, valor in tasas.items()}
+        self._tasas[base] = Decimal(1)
+        for moneda, valor in self._tasas.items():
+            if valor <= 0:
+                raise ValueError(f"La tasa de {moneda} debe ser mayor a cero")
+
+    @property
+    def monedas(self) -> List[str]:
+        return sorted(self._tasas)
+
+    def soporta(self, moneda: str) -> bool:
+        return moneda in self._tasas
+
+    def como_dict(self) -> Dict[str, Decimal]:
+        return dict(self._tasas)
+
+    def factor(self, origen: str, destino: str) -> Decimal:
+        """Multiplicador para pasar 1 unidad de `origen` a `destino`."""
+        for moneda in (origen, destino):
+            if moneda not in self._tasas:
+                raise ValueError(f"No hay tasa de cambio para {moneda}")
+        return self._tasas[origen] / self._tasas[destino]
+
+    def convertir(self, dinero: Dinero, destino: str) -> Dinero:
+        if dinero.moneda == destino:
+            return dinero
+        return Dinero(redondear(dinero.monto * self.factor(dinero.moneda, destino), destino), destino)
+
+    def origen_para(self, precios: Dict[str, Any], destino: str) -> Optional[str]:
+        """
+        Moneda del producto desde la cual convertir, de forma determinística:
+        la propia `destino` si existe, si no la base, si no la primera soportada (orden alfabético).
+        """
+        if destino in precios:
+            return destino
+        if self.base in precios:
+            return self.base
+        return next((m for m in sorted(precios) if m in self._tasas), None)
+
+    def precio_en(self, precios: Dict[str, Any], destino: str) -> Optional[Dinero]:
+        """Precio de un producto en `destino`, o None si no tiene monedas convertibles."""
+        origen = self.origen_para(precios or {}, destino)
+        if origen is None:
+            return None
+        return self.convertir(Dinero.de(precios[origen], origen), destino)
+
+    def convertir_catalogo(self, catalogo: Iterable[Dict[str, Any]], destino: str) -> List[Optional[Dinero]]:
+        """
+        precio_en() para muchos productos: los factores y el cuanto de redondeo
+        se calculan una sola vez por moneda de origen.
+        """
+        if destino not in self._tasas:
+            raise ValueError(f"No hay tasa de cambio para {destino}")
+        paso = cuanto(destino)
+        factores = {moneda: self.factor(moneda, destino) for moneda in self._tasas}
+        resultado = []
+        for precios in catalogo:
+            origen = self.origen_para(precios or {}, destino)
+            if origen is None:
+                resultado.append(None)
+                continue
+            monto = a_decimal(precios[origen]) * factores[origen]
+            resultado.append(Dinero(monto.quantize(paso, rounding=ROUND_HALF_UP), destino))
+        return resultado
+
+
+# =========================================================
+# REGLAS DE ACTUALIZACIÓN MASIVA DE PRECIOS
+# =========================================================
+
+OPERACIONES_PRECIO = ('porcentaje', 'sumar', 'asignar', 'convertir')
+
+
+@dataclass(frozen=True, slots=True)
+class ReglaPrecio:
+    """
+    Cambio de precio en `moneda` para muchos productos:
+    - porcentaje: +5 sube un 5 %, -10 baja un 10 % (solo productos con precio en `moneda`).
+    - sumar: suma `valor` (negativo para restar).
+    - asignar: fija `valor` (agrega la moneda si el producto no la tenía).
+    - convertir: calcula `moneda` desde el precio canónico del producto con la tabla de tasas.
+    """
+    operacion: str
+    moneda: str
+    valor: Optional[Decimal] = None
+
+    def __post_init__(self):
+        if self.operacion not in OPERACIONES_PRECIO:
+            raise ValueError(f"Operación inválida: {self.operacion}. Use {', '.join(OPERACIONES_PRECIO)}")
+        if len(self.moneda) != 3 or not self.moneda.isalpha() or not self.moneda.isupper():
+            raise ValueError("La moneda debe ser un código ISO de 3 letras en mayúsculas (ej: USD)")
+        if self.operacion != 'convertir' and self.valor is None:
+            raise ValueError(f"La operación {self.operacion} requiere un valor")
+        if self.operacion == 'porcentaje' and self.valor <= -100:
+            raise ValueError("El porcentaje debe ser mayor a -100")
+        if self.operacion == 'asignar' and self.valor < 0:
+            raise ValueError("El precio no puede ser negativo")
+
+    def aplicar(self, precios: Dict[str, Any], tabla: Optional[TablaTasas] = None) -> Optional[Dinero]:
+        """Nuevo precio en `moneda` para un producto, o None si la regla no le aplica."""
+        actual = precios.get(self.moneda)
+        if self.operacion == 'asignar':
+            monto = a_decimal(self.valor)
+        elif self.operacion == 'convertir':
+            otros = {m: v for m, v in precios.items() if m != self.moneda}
+            return tabla.precio_en(otros, self.moneda) if otros else None
+        elif actual is None:
+            return None
+        elif self.operacion == 'porcentaje':
+            monto = a_decimal(actual) * (1 + a_decimal(self.valor) / 100)
+        else:
+            monto = a_decimal(actual) + a_decimal(self.valor)
+        nuevo = Dinero.de(monto, self.moneda)
+        if nuevo.monto < 0:
+            raise ValueError(f"El precio resultante en {self.moneda} sería negativo ({nuevo.monto})")
+        return nuevo
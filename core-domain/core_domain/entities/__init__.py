@@ -1,2 +1,4 @@
 from .empresa import Empresa
-from .producto import Producto
\ No newline at end of file
+from .producto import Producto
+from .valoracion import Valoracion
+from .cambio import Cambio
\ No newline at end of file
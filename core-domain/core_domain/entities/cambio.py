@@ -0,0 +1,23 @@
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+ENTIDAD_EMPRESA = 'empresa'
+ENTIDAD_PRODUCTO = 'producto'
+
+OPERACION_CREAR = 'crear'
+OPERACION_ACTUALIZAR = 'actualizar'
+OPERACION_ELIMINAR = 'eliminar'
+
+@dataclass(slots=True)
+class Cambio:
+    """
+    Evento del registro de cambios. `id` es el cursor (creciente);
+    `datos` es el estado después de la escritura (None al eliminar).
+    """
+    id: int
+    entidad: str
+    clave: str
+    operacion: str
+    datos: Optional[Dict[str, Any]]
+    fecha: datetime
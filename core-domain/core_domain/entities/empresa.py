@@ -1,34 +1,28 @@
 from dataclasses import dataclass
-import re
+from ..validacion import validar_empresa
 
-@dataclass
+@dataclass(slots=True)
 class Empresa:
     nit: str
     nombre: str
     direccion: str
     telefono: str
+    # Control de concurrencia optimista: cada actualización la incrementa
+    version: int = 1
 
     def __post_init__(self):
-        
-        if not self.nit or not self.nit.strip():
-            raise ValueError("El NIT es obligatorio para una empresa")
-            
-        if not self.nombre or not self.nombre.strip():
-            raise ValueError("El nombre de la empresa es obligatorio")
-            
-        if not self.direccion or not self.direccion.strip():
-            raise ValueError("La dirección es obligatoria")
+        validar_empresa(self.nit, self.nombre, self.direccion, self.telefono)
 
-        if not self.telefono or not self.telefono.strip():
-            raise ValueError("El teléfono es obligatorio")
-        
-        if not re.match(r'^[0-9-]+$', self.nit):
-            raise ValueError("Formato inválido. El NIT solo debe contener caracteres numéricos y guiones (-).")
-        
-        tel_limpio = self.telefono.strip()
-        
-        if len(tel_limpio) < 7:
-            raise ValueError("Longitud insuficiente. El teléfono debe tener al menos 7 dígitos.")
-        
-        if not re.match(r'^\+?[0-9]+$', tel_limpio):
-             raise ValueError("Caracteres inválidos. El teléfono solo admite dígitos numéricos (y prefijo +).")
\ No newline at end of file
+    @classmethod
+    def desde_persistencia(cls, nit: str, nombre: str, direccion: str, telefono: str, version: int = 1) -> "Empresa":
+        """
+        Reconstruye una empresa leída de la BD sin repetir __post_init__:
+        los datos ya se validaron al guardarse.
+        """
+        empresa = object.__new__(cls)
+        empresa.nit = nit
+        empresa.nombre = nombre
+        empresa.direccion = direccion
+        empresa.telefono = telefono
+        empresa.version = version
+        return empresa
@@ -1,8 +1,10 @@
 from dataclasses import dataclass
 from typing import Dict, Optional 
 from decimal import Decimal
+from ..validacion import validar_producto
+from ..dinero import a_decimal
 
-@dataclass
+@dataclass(slots=True)
 class Producto:
     codigo: str
     nombre: str
@@ -11,18 +13,32 @@ class Producto:
 
     precios: Dict[str, Decimal]
     id: Optional[int] = None 
+    # Control de concurrencia optimista: cada actualización la incrementa
+    version: int = 1
 
     def __post_init__(self):
-        if not self.codigo:
-            raise ValueError("El código del producto es obligatorio")
-        if not self.nombre:
-            raise ValueError("El nombre del producto es obligatorio")
-        if not self.empresa_nit:
-            raise ValueError("Todo producto debe estar asociado a una empresa (NIT)")
-        if not self.precios:
-            raise ValueError("El producto debe tener al menos un precio asignado")
+        validar_producto(self.codigo, self.nombre, self.empresa_nit, self.precios)
+
+    @classmethod
+    def desde_persistencia(cls, codigo: str, nombre: str, caracteristicas: str,
+                           empresa_nit: str, precios: Dict[str, Decimal], id: Optional[int] = None,
+                           version: int = 1) -> "Producto":
+        """
+        Reconstruye un producto leído de la BD sin repetir __post_init__:
+        los datos ya se validaron al guardarse.
+        """
+        producto = object.__new__(cls)
+        producto.codigo = codigo
+        producto.nombre = nombre
+        producto.caracteristicas = caracteristicas
+        producto.empresa_nit = empresa_nit
+        producto.precios = precios
+        producto.id = id
+        producto.version = version
+        return producto
 
     def obtener_precio(self, moneda: str) -> Decimal:
         if moneda not in self.precios:
             raise ValueError(f"El producto no tiene precio configurado para {moneda}")
-        return self.precios[moneda]
\ No newline at end of file
+        # Los precios llegan del JSON como float/int
+        return a_decimal(self.precios[moneda])
\ No newline at end of file
@@ -0,0 +1,56 @@
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Tuple
+from ..dinero import MONEDA_BASE, Dinero, TablaTasas, a_decimal
+
+def moneda_canonica(precios: Dict[str, Any], base: str = MONEDA_BASE) -> Optional[str]:
+    """Moneda con la que un producto cuenta en la valoración: la base si la tiene, si no la primera alfabética."""
+    if not precios:
+        return None
+    return base if base in precios else min(precios)
+
+@dataclass(slots=True)
+class Valoracion:
+    """
+    Valor del inventario de una empresa.
+
+    - totales: suma de los precios publicados en cada moneda (un producto con
+      COP y USD suma en ambas).
+    - canonicos: cada producto sumado una sola vez en su moneda canónica; de
+      aquí sale el total convertido, así las tasas se aplican al leer.
+    """
+    empresa_nit: str
+    productos: int = 0
+    totales: Dict[str, Decimal] = field(default_factory=dict)
+    canonicos: Dict[str, Decimal] = field(default_factory=dict)
+    actualizado: Optional[datetime] = None
+    fecha: Optional[date] = None
+
+    def sumar(self, precios: Dict[str, Any], signo: int = 1) -> None:
+        """Agrega (signo=1) o retira (signo=-1) un producto. O(monedas del producto)."""
+        if precios is None:
+            return
+        self.productos += signo
+        for moneda, valor in precios.items():
+            self.totales[moneda] = self.totales.get(moneda, Decimal(0)) + signo * a_decimal(valor)
+        canonica = moneda_canonica(precios)
+        if canonica is not None:
+            self.canonicos[canonica] = self.canonicos.get(canonica, Decimal(0)) + signo * a_decimal(precios[canonica])
+        # Monedas que quedaron en cero sin productos no aportan información
+        for acumulado in (self.totales, self.canonicos):
+            for moneda in [m for m, v in acumulado.items() if v == 0]:
+                del acumulado[moneda]
+
+    def total_en(self, tabla: TablaTasas, moneda: str) -> Tuple[Dinero, List[str]]:
+        """Total convertido a `moneda` y las monedas que no se pudieron convertir (sin tasa)."""
+        if not tabla.soporta(moneda):
+            raise ValueError(f"No hay tasa de cambio para {moneda}")
+        total = Decimal(0)
+        sin_tasa = []
+        for origen, monto in sorted(self.canonicos.items()):
+            if tabla.soporta(origen):
+                total += monto * tabla.factor(origen, moneda)
+            else:
+                sin_tasa.append(origen)
+        return Dinero.de(total, moneda), sin_tasa
@@ -14,6 +14,10 @@ class ResourceNotFoundError(DomainError):
     """Error cuando se busca algo y no existe."""
     pass
 
+class ConflictError(DomainError):
+    """Error cuando otro usuario modificó el recurso desde que se leyó (versión desactualizada)."""
+    pass
+
 class InfrastructureError(DomainError):
     """Error crítico de base de datos o sistemas externos."""
     pass
\ No newline at end of file
@@ -1,7 +1,19 @@
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Any, Dict, Iterator, List, Optional
 from ..entities.empresa import Empresa
 from ..entities.producto import Producto
+from ..entities.valoracion import Valoracion
+from ..entities.cambio import Cambio
+from ..dinero import ReglaPrecio, TablaTasas
+
+@dataclass(frozen=True)
+class FiltroProductos:
+    """Criterios para seleccionar productos de una empresa en operaciones masivas."""
+    empresa_nit: str
+    buscar: Optional[str] = None  # texto en nombre o código
+    ids: Optional[List[int]] = None
 
 class EmpresaRepository(ABC):
     """
@@ -9,7 +21,11 @@ class EmpresaRepository(ABC):
     DEBE cumplir para trabajar con Empresas.
     """
     @abstractmethod
-    def save(self, empresa: Empresa) -> Empresa:
+    def save(self, empresa: Empresa, version: Optional[int] = None) -> Empresa:
+        """
+        Crea o actualiza. Con `version` solo actualiza si la guardada sigue siendo
+        esa; si no, lanza ConflictError.
+        """
         pass
 
     @abstractmethod
@@ -19,6 +35,11 @@ class EmpresaRepository(ABC):
     @abstractmethod
     def list_all(self) -> List[Empresa]:
         pass
+
+    @abstractmethod
+    def get_many_by_nits(self, nits: List[str]) -> List[Empresa]:
+        """Empresas existentes entre `nits`, en el orden pedido (una sola consulta)."""
+        pass
     
     @abstractmethod
     def delete(self, nit: str) -> None:
@@ -29,17 +50,95 @@ class ProductoRepository(ABC):
     Contrato para trabajar con Productos.
     """
     @abstractmethod
-    def save(self, producto: Producto) -> Producto:
+    def save(self, producto: Producto, version: Optional[int] = None) -> Producto:
+        """
+        Crea o actualiza. Con `version` solo actualiza si la guardada sigue siendo
+        esa; si no, lanza ConflictError.
+        """
+        pass
+
+    @abstractmethod
+    def update(self, id_producto: int, cambios: Dict[str, Any], version: Optional[int] = None) -> Optional[Producto]:
+        """
+        Actualiza por id solo los campos de `cambios` (ej: {'nombre': ..., 'precios': ...}),
+        incluido el código. Retorna el producto actualizado o None si no existe.
+        Con `version` solo actualiza si la guardada sigue siendo esa; si no, lanza ConflictError.
+        """
         pass
 
     @abstractmethod
     def get_by_codigo(self, codigo: str) -> Optional[Producto]:
         pass
     
+    @abstractmethod
+    def get_many_by_ids(self, ids: List[int]) -> List[Producto]:
+        """Productos existentes entre `ids`, en el orden pedido (una sola consulta)."""
+        pass
+
+    @abstractmethod
+    def get_many_by_codigos(self, codigos: List[str]) -> List[Producto]:
+        pass
+
     @abstractmethod
     def list_by_empresa(self, nit_empresa: str) -> List[Producto]:
         pass
+
+    @abstractmethod
+    def list_by_empresas(self, nits_empresas: List[str]) -> List[Producto]:
+        pass
+
+    @abstractmethod
+    def stats_by_empresas(self, nits_empresas: List[str]) -> Dict[str, dict]:
+        """
+        {nit: {'productos': n, 'precios': {moneda: {'productos', 'total', 'min', 'max'}}}}.
+        Las empresas sin productos pueden no aparecer.
+        """
+        pass
+
+    @abstractmethod
+    def update_prices(self, filtro: FiltroProductos, regla: ReglaPrecio, tabla: TablaTasas) -> int:
+        """
+        Aplica `regla` a los productos que cumplen `filtro` en una sola transacción
+        (todo o nada). Retorna cuántos productos cambiaron de precio.
+        """
+        pass
         
     @abstractmethod
     def delete(self, id_producto: int) -> None:
-        pass
\ No newline at end of file
+        pass
+
+class TasaCambioRepository(ABC):
+    """
+    Contrato para la tabla de tasas de cambio (respecto a la moneda base).
+    """
+    @abstractmethod
+    def get_tabla(self) -> TablaTasas:
+        pass
+
+    @abstractmethod
+    def save(self, moneda: str, tasa: Decimal) -> TablaTasas:
+        """Guarda la tasa de `moneda` y retorna la tabla ya actualizada."""
+        pass
+
+class ValoracionRepository(ABC):
+    """
+    Contrato para las valoraciones de inventario precalculadas por empresa.
+    """
+    @abstractmethod
+    def get_by_nit(self, nit: str) -> Optional[Valoracion]:
+        """Valoración vigente, o None si la empresa no existe."""
+        pass
+
+    @abstractmethod
+    def historial(self, nit: str, dias: int) -> List[Valoracion]:
+        """Una valoración por día (la última del día), de la más reciente a la más antigua."""
+        pass
+
+class CambioRepository(ABC):
+    """
+    Contrato para el registro de cambios (outbox) de empresas y productos.
+    """
+    @abstractmethod
+    def list_since(self, cursor: int, limite: int) -> Iterator[Cambio]:
+        """Cambios con id > cursor en orden de id, como máximo `limite`."""
+        pass
@@ -0,0 +1,19 @@
+from typing import Iterator
+from ..entities.cambio import Cambio
+from ..ports.repositories import CambioRepository
+from ..exceptions import EntityValidationError, InfrastructureError
+
+class ListarCambiosUseCase:
+    """Cambios posteriores a `cursor` para sincronización incremental."""
+    def __init__(self, repository: CambioRepository):
+        self.repository = repository
+
+    def execute(self, cursor: int, limite: int) -> Iterator[Cambio]:
+        if cursor < 0:
+            raise EntityValidationError("El cursor debe ser un entero mayor o igual a cero")
+        if limite < 1:
+            raise EntityValidationError("El límite debe ser mayor a cero")
+        try:
+            return self.repository.list_since(cursor, limite)
+        except Exception as e:
+            raise InfrastructureError(f"Error consultando cambios: {str(e)}")
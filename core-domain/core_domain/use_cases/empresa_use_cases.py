@@ -1,7 +1,9 @@
-from typing import List
+from typing import List, Optional
 from ..entities.empresa import Empresa
 from ..ports.repositories import EmpresaRepository
-from ..exceptions import EntityValidationError, BusinessRuleError, InfrastructureError, ResourceNotFoundError
+from ..exceptions import (
+    BusinessRuleError, ConflictError, EntityValidationError, InfrastructureError, ResourceNotFoundError,
+)
 
 class CrearEmpresaUseCase:
     def __init__(self, repository: EmpresaRepository):
@@ -32,7 +34,7 @@ class ActualizarEmpresaUseCase:
     def __init__(self, repository: EmpresaRepository):
         self.repository = repository
 
-    def execute(self, nit: str, nombre: str, direccion: str, telefono: str) -> Empresa:
+    def execute(self, nit: str, nombre: str, direccion: str, telefono: str, version: Optional[int] = None) -> Empresa:
         try:
             # 1. Regla de Negocio: Debe existir para actualizarse
             if not self.repository.get_by_nit(nit):
@@ -44,12 +46,23 @@ class ActualizarEmpresaUseCase:
             except ValueError as e:
                 raise EntityValidationError(f"Datos inválidos: {str(e)}")
 
-            return self.repository.save(empresa)
-        except (ResourceNotFoundError, EntityValidationError) as e:
+            # 3. Con `version` (la que leyó el cliente) falla si otro la modificó antes
+            return self.repository.save(empresa, version)
+        except (ResourceNotFoundError, EntityValidationError, BusinessRuleError, ConflictError) as e:
             raise e
         except Exception as e:
             raise InfrastructureError(f"Error actualizando empresa: {str(e)}")
 
+class ObtenerEmpresasPorNitsUseCase:
+    def __init__(self, repository: EmpresaRepository):
+        self.repository = repository
+
+    def execute(self, nits: List[str]) -> List[Empresa]:
+        try:
+            return self.repository.get_many_by_nits(nits)
+        except Exception as e:
+            raise InfrastructureError(f"Error consultando empresas: {str(e)}")
+
 class ObtenerEmpresaPorNitUseCase:
     def __init__(self, repository: EmpresaRepository):
         self.repository = repository
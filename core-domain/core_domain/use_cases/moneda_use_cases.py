@@ -0,0 +1,149 @@
+from typing import List, Optional, Tuple
+from ..dinero import Dinero, ReglaPrecio, TablaTasas, a_decimal
+from ..entities.producto import Producto
+from ..entities.valoracion import Valoracion
+from ..ports.repositories import (
+    EmpresaRepository, FiltroProductos, ProductoRepository, TasaCambioRepository, ValoracionRepository,
+)
+from ..exceptions import BusinessRuleError, EntityValidationError, InfrastructureError, ResourceNotFoundError
+
+class ObtenerTasasCambioUseCase:
+    def __init__(self, repository: TasaCambioRepository):
+        self.repository = repository
+
+    def execute(self) -> TablaTasas:
+        try:
+            return self.repository.get_tabla()
+        except Exception as e:
+            raise InfrastructureError(f"Error consultando tasas de cambio: {str(e)}")
+
+class ActualizarTasaCambioUseCase:
+    def __init__(self, repository: TasaCambioRepository):
+        self.repository = repository
+
+    def execute(self, moneda: str, tasa) -> TablaTasas:
+        moneda = (moneda or '').strip().upper()
+        if len(moneda) != 3 or not moneda.isalpha():
+            raise EntityValidationError("La moneda debe ser un código ISO de 3 letras (ej: USD)")
+        try:
+            valor = a_decimal(tasa)
+        except ValueError as e:
+            raise EntityValidationError(str(e))
+        if not valor.is_finite() or valor <= 0:
+            raise EntityValidationError("La tasa debe ser mayor a cero")
+        try:
+            tabla = self.repository.get_tabla()
+            if moneda == tabla.base and valor != 1:
+                raise BusinessRuleError(f"La tasa de la moneda base ({tabla.base}) siempre es 1")
+            return self.repository.save(moneda, valor)
+        except BusinessRuleError as e:
+            raise e
+        except Exception as e:
+            raise InfrastructureError(f"Error guardando tasa de cambio: {str(e)}")
+
+class ListarProductosEnMonedaUseCase:
+    """
+    Productos de una o varias empresas con su precio en `moneda`, convertido
+    con la tabla de tasas (None si el producto no tiene monedas convertibles).
+    """
+    def __init__(self, repository: ProductoRepository, tasas_repository: TasaCambioRepository):
+        self.repository = repository
+        self.tasas_repository = tasas_repository
+
+    def execute(self, nits_empresas: List[str], moneda: str) -> List[Tuple[Producto, Optional[Dinero]]]:
+        moneda = (moneda or '').strip().upper()
+        try:
+            tabla = self.tasas_repository.get_tabla()
+        except Exception as e:
+            raise InfrastructureError(f"Error consultando tasas de cambio: {str(e)}")
+        if not tabla.soporta(moneda):
+            raise BusinessRuleError(f"Moneda no soportada: {moneda}. Disponibles: {', '.join(tabla.monedas)}")
+        try:
+            productos = self.repository.list_by_empresas(nits_empresas)
+            precios = tabla.convertir_catalogo((p.precios for p in productos), moneda)
+        except ValueError as e:
+            raise EntityValidationError(f"Precio inválido en el catálogo: {str(e)}")
+        except Exception as e:
+            raise InfrastructureError(f"Error consultando productos: {str(e)}")
+        return list(zip(productos, precios))
+
+class ActualizarPreciosUseCase:
+    """
+    Cambio masivo de precios en una moneda (porcentaje, suma, valor fijo o
+    conversión con la tabla de tasas) sobre los productos de una empresa que
+    cumplen el filtro. Se aplica a todos o a ninguno.
+    """
+    def __init__(self, repository: ProductoRepository, tasas_repository: TasaCambioRepository,
+                 empresa_repository: EmpresaRepository):
+        self.repository = repository
+        self.tasas_repository = tasas_repository
+        self.empresa_repository = empresa_repository
+
+    def execute(self, empresa_nit: str, operacion: str, moneda: str, valor=None,
+                buscar: Optional[str] = None, ids: Optional[List[int]] = None) -> int:
+        try:
+            regla = ReglaPrecio(operacion, (moneda or '').strip().upper(), None if valor is None else a_decimal(valor))
+        except ValueError as e:
+            raise EntityValidationError(str(e))
+        try:
+            empresa = self.empresa_repository.get_by_nit(empresa_nit)
+        except Exception as e:
+            raise InfrastructureError(f"Error consultando empresa: {str(e)}")
+        if empresa is None:
+            raise ResourceNotFoundError(f"Empresa {empresa_nit} no encontrada")
+        try:
+            tabla = self.tasas_repository.get_tabla()
+        except Exception as e:
+            raise InfrastructureError(f"Error consultando tasas de cambio: {str(e)}")
+        if regla.operacion == 'convertir' and not tabla.soporta(regla.moneda):
+            raise BusinessRuleError(f"Moneda no soportada: {regla.moneda}. Disponibles: {', '.join(tabla.monedas)}")
+
+        filtro = FiltroProductos(empresa_nit=empresa_nit, buscar=(buscar or '').strip() or None, ids=ids or None)
+        try:
+            return self.repository.update_prices(filtro, regla, tabla)
+        except ValueError as e:
+            # Ej: un precio resultante negativo; la transacción ya se revirtió completa
+            raise BusinessRuleError(str(e))
+        except Exception as e:
+            raise InfrastructureError(f"Error actualizando precios: {str(e)}")
+
+class ObtenerValoracionEmpresaUseCase:
+    """
+    Valor del inventario de una empresa: totales por moneda y total convertido a
+    `moneda` (la base si no se indica), con historial diario opcional.
+    """
+    def __init__(self, repository: ValoracionRepository, tasas_repository: TasaCambioRepository):
+        self.repository = repository
+        self.tasas_repository = tasas_repository
+
+    def execute(self, nit: str, moneda: Optional[str] = None, dias_historial: int = 0) -> dict:
+        try:
+            tabla = self.tasas_repository.get_tabla()
+            valoracion = self.repository.get_by_nit(nit)
+            historial = self.repository.historial(nit, dias_historial) if dias_historial and valoracion else []
+        except Exception as e:
+            raise InfrastructureError(f"Error consultando valoración: {str(e)}")
+        if valoracion is None:
+            raise ResourceNotFoundError(f"Empresa {nit} no encontrada")
+
+        moneda = (moneda or tabla.base).strip().upper()
+        if not tabla.soporta(moneda):
+            raise BusinessRuleError(f"Moneda no soportada: {moneda}. Disponibles: {', '.join(tabla.monedas)}")
+        return {
+            **self._resumen(valoracion, tabla, moneda),
+            'historial': [{'fecha': v.fecha, **self._resumen(v, tabla, moneda)} for v in historial],
+        }
+
+    @staticmethod
+    def _resumen(valoracion: Valoracion, tabla: TablaTasas, moneda: str) -> dict:
+        total, sin_tasa = valoracion.total_en(tabla, moneda)
+        equivalentes = {m: valoracion.total_en(tabla, m)[0].monto for m in tabla.monedas}
+        return {
+            'empresa': valoracion.empresa_nit,
+            'productos': valoracion.productos,
+            'totales': dict(sorted(valoracion.totales.items())),
+            'total': {'moneda': total.moneda, 'monto': total.monto},
+            'equivalentes': equivalentes,
+            'sin_tasa': sin_tasa,
+            'actualizado': valoracion.actualizado,
+        }
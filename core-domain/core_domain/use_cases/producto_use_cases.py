@@ -1,7 +1,12 @@
-from typing import List
+from typing import Any, Dict, List, Optional
 from ..entities.producto import Producto
-from ..ports.repositories import ProductoRepository
-from ..exceptions import InfrastructureError, ResourceNotFoundError, EntityValidationError
+from ..ports.repositories import EmpresaRepository, ProductoRepository
+from ..validacion import (
+    ErrorFila, ResultadoLote, como_texto, validar_cambios_producto, validar_lote_productos,
+)
+from ..exceptions import (
+    BusinessRuleError, ConflictError, EntityValidationError, InfrastructureError, ResourceNotFoundError,
+)
 
 class CrearProductoUseCase:
     def __init__(self, repository: ProductoRepository):
@@ -19,32 +24,33 @@ class CrearProductoUseCase:
             return self.repository.save(producto)
         except ValueError as e:
             raise EntityValidationError(f"Datos de producto inválidos: {str(e)}")
+        except (BusinessRuleError, ConflictError) as e:
+            raise e
         except Exception as e:
             raise InfrastructureError(f"Error guardando producto: {str(e)}")
 
 class ActualizarProductoUseCase:
+    """
+    Actualización por id (PUT con todos los campos o PATCH con algunos). Solo se
+    validan y escriben los campos recibidos; cambiar el código no crea otro producto.
+    """
     def __init__(self, repository: ProductoRepository):
         self.repository = repository
 
-    def execute(self, id_producto: int, codigo: str, nombre: str, caracteristicas: str, empresa_nit: str, precios: dict) -> Producto:
+    def execute(self, id_producto: int, cambios: Dict[str, Any], version: Optional[int] = None) -> Producto:
         try:
-            producto_existente = self.repository.get_by_id(id_producto)
-            if not producto_existente:
-                raise ResourceNotFoundError(f"El producto con ID {id_producto} no existe")
-
-            # Crear entidad con datos nuevos
-            producto = Producto(
-                codigo=codigo,
-                nombre=nombre,
-                caracteristicas=caracteristicas,
-                empresa_nit=empresa_nit,
-                precios=precios
-            )
-            return self.repository.save(producto)
-        except (ResourceNotFoundError, ValueError) as e:
+            validar_cambios_producto(cambios)
+        except ValueError as e:
+            raise EntityValidationError(f"Datos de producto inválidos: {str(e)}")
+        try:
+            producto = self.repository.update(id_producto, cambios, version)
+        except (BusinessRuleError, ConflictError, ValueError) as e:
             raise e
         except Exception as e:
             raise InfrastructureError(f"Error actualizando producto: {str(e)}")
+        if producto is None:
+            raise ResourceNotFoundError(f"El producto con ID {id_producto} no existe")
+        return producto
 
 class ObtenerProductoPorIdUseCase:
     def __init__(self, repository: ProductoRepository):
@@ -71,6 +77,38 @@ class ListarProductosPorEmpresaUseCase:
         except Exception as e:
             raise InfrastructureError(f"Error consultando productos: {str(e)}")
 
+class ObtenerProductosPorIdsUseCase:
+    def __init__(self, repository: ProductoRepository):
+        self.repository = repository
+
+    def execute(self, ids: List[int]) -> List[Producto]:
+        try:
+            return self.repository.get_many_by_ids(ids)
+        except Exception as e:
+            raise InfrastructureError(f"Error consultando productos: {str(e)}")
+
+class ListarProductosPorEmpresasUseCase:
+    def __init__(self, repository: ProductoRepository):
+        self.repository = repository
+
+    def execute(self, nits_empresas: List[str]) -> List[Producto]:
+        try:
+            return self.repository.list_by_empresas(nits_empresas)
+        except Exception as e:
+            raise InfrastructureError(f"Error consultando productos: {str(e)}")
+
+class ObtenerEstadisticasEmpresasUseCase:
+    def __init__(self, repository: ProductoRepository):
+        self.repository = repository
+
+    def execute(self, nits_empresas: List[str]) -> Dict[str, dict]:
+        try:
+            estadisticas = self.repository.stats_by_empresas(nits_empresas)
+            vacias = {'productos': 0, 'precios': {}}
+            return {nit: estadisticas.get(nit, vacias) for nit in nits_empresas}
+        except Exception as e:
+            raise InfrastructureError(f"Error calculando estadísticas: {str(e)}")
+
 class EliminarProductoUseCase:
     def __init__(self, repository: ProductoRepository):
         self.repository = repository
@@ -83,4 +121,39 @@ class EliminarProductoUseCase:
         except ResourceNotFoundError as e:
             raise e
         except Exception as e:
-            raise InfrastructureError(f"Error eliminando producto: {str(e)}")
\ No newline at end of file
+            raise InfrastructureError(f"Error eliminando producto: {str(e)}")
+
+class ValidarLoteProductosUseCase:
+    """
+    Valida una importación completa sin guardar nada y reporta todos los errores:
+    reglas de la entidad, códigos repetidos, códigos ya existentes y empresas inexistentes.
+    """
+    def __init__(self, repository: ProductoRepository, empresa_repository: EmpresaRepository):
+        self.repository = repository
+        self.empresa_repository = empresa_repository
+
+    def execute(self, filas: List[dict]) -> ResultadoLote:
+        resultado = validar_lote_productos(filas)
+        # Mismo texto que usó la validación: listas u objetos quedan vacíos y no se consultan
+        claves = [(como_texto(f.get('empresa_nit')), como_texto(f.get('codigo'))) for f in filas]
+        try:
+            nits = {nit for nit, _ in claves if nit}
+            codigos = [codigo for _, codigo in claves if codigo]
+            existentes = {e.nit for e in self.empresa_repository.get_many_by_nits(list(nits))}
+            ocupados = {p.codigo for p in self.repository.get_many_by_codigos(codigos)}
+        except Exception as e:
+            raise InfrastructureError(f"Error validando lote: {str(e)}")
+
+        con_error = {e.fila for e in resultado.errores}
+        for i, (nit, codigo) in enumerate(claves):
+            nuevos = []
+            if nit and nit not in existentes:
+                nuevos.append(ErrorFila(i, 'empresa', f"Empresa {nit} no encontrada."))
+            if codigo in ocupados:
+                nuevos.append(ErrorFila(i, 'codigo', f"Ya existe un producto con el código {codigo}"))
+            if nuevos:
+                resultado.errores.extend(nuevos)
+                con_error.add(i)
+        resultado.validas = [i for i in resultado.validas if i not in con_error]
+        resultado.errores.sort(key=lambda e: e.fila)
+        return resultado
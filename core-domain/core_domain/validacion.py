@@ -0,0 +1,188 @@
+"""
+Reglas de validación de las entidades, con los patrones compilados una sola vez.
+
+- validar_empresa / validar_producto: lanzan ValueError con el primer error
+  (lo usan las entidades en __post_init__).
+- errores_empresa / errores_producto: retornan todos los errores de un registro.
+- validar_cambios_producto: como validar_producto, solo para los campos de una
+  actualización parcial.
+- validar_lote_*: validan miles de filas de una importación y reportan todos
+  los errores por fila, incluidos NIT/códigos repetidos dentro del lote.
+"""
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+PATRON_NIT = re.compile(r'^[0-9-]+$')
+PATRON_TELEFONO = re.compile(r'^\+?[0-9]+$')
+PATRON_CODIGO = re.compile(r'^[A-Za-z0-9-_]+$')
+
+TELEFONO_MIN_DIGITOS = 7
+
+
+def _vacio(valor) -> bool:
+    return not valor or not valor.strip()
+
+
+# =========================================================
+# EMPRESA
+# =========================================================
+
+def _reglas_empresa(nit, nombre, direccion, telefono):
+    """Genera (campo, mensaje) en el mismo orden en que la entidad los reporta."""
+    if _vacio(nit):
+        yield 'nit', "El NIT es obligatorio para una empresa"
+    if _vacio(nombre):
+        yield 'nombre', "El nombre de la empresa es obligatorio"
+    if _vacio(direccion):
+        yield 'direccion', "La dirección es obligatoria"
+    if _vacio(telefono):
+        yield 'telefono', "El teléfono es obligatorio"
+    if nit and not PATRON_NIT.match(nit):
+        yield 'nit', "Formato inválido. El NIT solo debe contener caracteres numéricos y guiones (-)."
+    if telefono and telefono.strip():
+        tel_limpio = telefono.strip()
+        if len(tel_limpio) < TELEFONO_MIN_DIGITOS:
+            yield 'telefono', "Longitud insuficiente. El teléfono debe tener al menos 7 dígitos."
+        elif not PATRON_TELEFONO.match(tel_limpio):
+            yield 'telefono', "Caracteres inválidos. El teléfono solo admite dígitos numéricos (y prefijo +)."
+
+
+def validar_empresa(nit: str, nombre: str, direccion: str, telefono: str) -> None:
+    for _campo, mensaje in _reglas_empresa(nit, nombre, direccion, telefono):
+        raise ValueError(mensaje)
+
+
+def errores_empresa(nit: str, nombre: str, direccion: str, telefono: str) -> List[Tuple[str, str]]:
+    return list(_reglas_empresa(nit, nombre, direccion, telefono))
+
+
+# =========================================================
+# PRODUCTO
+# =========================================================
+
+def _reglas_producto(codigo, nombre, empresa_nit, precios, validar_codigo):
+    if not codigo:
+        yield 'codigo', "El código del producto es obligatorio"
+    elif validar_codigo and not PATRON_CODIGO.match(codigo):
+        yield 'codigo', ("Sintaxis incorrecta. El código solo permite letras alfanuméricas, "
+                         "guiones (-) y guiones bajos (_).")
+    if not nombre:
+        yield 'nombre', "El nombre del producto es obligatorio"
+    if not empresa_nit:
+        yield 'empresa', "Todo producto debe estar asociado a una empresa (NIT)"
+    if not precios:
+        yield 'precios', "El producto debe tener al menos un precio asignado"
+
+
+def validar_producto(codigo: str, nombre: str, empresa_nit: str, precios: Dict[str, Any]) -> None:
+    # La sintaxis del código la valida la API; la entidad conserva sus reglas originales
+    for _campo, mensaje in _reglas_producto(codigo, nombre, empresa_nit, precios, validar_codigo=False):
+        raise ValueError(mensaje)
+
+
+# Campos de la entidad que se pueden actualizar y el nombre con el que los reportan las reglas
+CAMPOS_PRODUCTO = ('codigo', 'nombre', 'caracteristicas', 'empresa_nit', 'precios')
+_CAMPO_REGLA_PRODUCTO = {'empresa': 'empresa_nit'}
+
+
+def validar_cambios_producto(cambios: Dict[str, Any]) -> None:
+    """Valida solo los campos presentes en `cambios` (actualización parcial): las reglas son por campo."""
+    desconocidos = sorted(set(cambios) - set(CAMPOS_PRODUCTO))
+    if desconocidos:
+        raise ValueError(f"Campos no actualizables: {', '.join(desconocidos)}")
+    reglas = _reglas_producto(cambios.get('codigo'), cambios.get('nombre'), cambios.get('empresa_nit'),
+                              cambios.get('precios'), validar_codigo=False)
+    for campo, mensaje in reglas:
+        if _CAMPO_REGLA_PRODUCTO.get(campo, campo) in cambios:
+            raise ValueError(mensaje)
+
+
+def errores_producto(codigo: str, nombre: str, empresa_nit: str, precios: Dict[str, Any]) -> List[Tuple[str, str]]:
+    return list(_reglas_producto(codigo, nombre, empresa_nit, precios, validar_codigo=True))
+
+
+# =========================================================
+# LOTES (IMPORTACIONES)
+# =========================================================
+
+@dataclass
+class ErrorFila:
+    fila: int
+    campo: str
+    mensaje: str
+
+
+@dataclass
+class ResultadoLote:
+    validas: List[int] = field(default_factory=list)
+    errores: List[ErrorFila] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return not self.errores
+
+
+def como_texto(valor: Optional[Any]) -> str:
+    """Valor de una celda como texto. Listas y objetos cuentan como vacíos (ver _errores_tipo)."""
+    if valor is None or isinstance(valor, (list, dict)):
+        return ''
+    return valor if isinstance(valor, str) else str(valor)
+
+
+def _errores_tipo(fila: Dict[str, Any], campos: Dict[str, str]) -> List[Tuple[str, str]]:
+    """(campo, mensaje) de los campos de texto que llegaron como lista u objeto."""
+    return [(regla, "Se espera un texto, no una lista u objeto.")
+            for campo, regla in campos.items() if isinstance(fila.get(campo), (list, dict))]
+
+
+def _combinar(tipo: List[Tuple[str, str]], reglas: List[Tuple[str, str]]) -> List[Tuple[str, str]]:
+    # Un campo con tipo incorrecto se reporta una vez (no además como "obligatorio")
+    invalidos = {campo for campo, _ in tipo}
+    return tipo + [(campo, mensaje) for campo, mensaje in reglas if campo not in invalidos]
+
+
+# Campo de la fila -> nombre con el que lo reportan las reglas
+_TEXTO_EMPRESA = {'nit': 'nit', 'nombre': 'nombre', 'direccion': 'direccion', 'telefono': 'telefono'}
+_TEXTO_PRODUCTO = {'codigo': 'codigo', 'nombre': 'nombre', 'caracteristicas': 'caracteristicas',
+                   'empresa_nit': 'empresa'}
+
+
+def validar_lote_empresas(filas: Iterable[Dict[str, Any]]) -> ResultadoLote:
+    resultado = ResultadoLote()
+    vistos = {}
+    for i, fila in enumerate(filas):
+        nit = como_texto(fila.get('nit'))
+        errores = _combinar(_errores_tipo(fila, _TEXTO_EMPRESA), errores_empresa(
+            nit, como_texto(fila.get('nombre')), como_texto(fila.get('direccion')), como_texto(fila.get('telefono')),
+        ))
+        if nit and nit in vistos:
+            errores.append(('nit', f"NIT repetido en el lote (fila {vistos[nit]})"))
+        vistos.setdefault(nit, i)
+        _registrar(resultado, i, errores)
+    return resultado
+
+
+def validar_lote_productos(filas: Iterable[Dict[str, Any]]) -> ResultadoLote:
+    resultado = ResultadoLote()
+    vistos = {}
+    for i, fila in enumerate(filas):
+        codigo = como_texto(fila.get('codigo'))
+        precios = fila.get('precios')
+        errores = _combinar(_errores_tipo(fila, _TEXTO_PRODUCTO), errores_producto(
+            codigo, como_texto(fila.get('nombre')), como_texto(fila.get('empresa_nit')), precios,
+        ))
+        if precios and not isinstance(precios, dict):
+            errores.append(('precios', "Estructura de datos incorrecta. Se espera JSON."))
+        if codigo and codigo in vistos:
+            errores.append(('codigo', f"Código repetido en el lote (fila {vistos[codigo]})"))
+        vistos.setdefault(codigo, i)
+        _registrar(resultado, i, errores)
+    return resultado
+
+
+def _registrar(resultado: ResultadoLote, indice: int, errores: List[Tuple[str, str]]) -> None:
+    if errores:
+        resultado.errores.extend(ErrorFila(indice, campo, mensaje) for campo, mensaje in errores)
+    else:
+        resultado.validas.append(indice)
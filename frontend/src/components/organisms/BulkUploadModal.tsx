@@ -3,7 +3,7 @@ import { X, UploadCloud, FileSpreadsheet, CheckCircle, AlertTriangle, Download,
 import { Button } from '../atoms/Button';
 import { generateAndDownloadTemplate } from '../../utils/excelParser';
 import { parseInventoryExcel } from '../../utils/excelParser';
-import { createProducto } from '../../services/productoService';
+import { createProducto, validarLoteProductos } from '../../services/productoService';
 import { useToast } from '../../context/ToastContext';
 
 interface BulkUploadModalProps {
@@ -47,6 +47,17 @@ export const BulkUploadModal = ({ isOpen, onClose, empresaNit, onSuccess }: Bulk
       let successCount = 0;
       let errorCount = 0;
 
+      // Validación del lote completo en el servidor (códigos repetidos/existentes, empresa) antes de crear
+      const candidatas = rows.filter(r => !r.error && r.data);
+      const erroresServidor = new Map<number, string>();
+      if (candidatas.length > 0) {
+        const validacion = await validarLoteProductos(candidatas.map(r => r.data!));
+        validacion.errores.forEach(e => {
+          const fila = candidatas[e.fila].rowNumber;
+          if (!erroresServidor.has(fila)) erroresServidor.set(fila, e.mensaje);
+        });
+      }
+
       for (let i = 0; i < rows.length; i++) {
         const item = rows[i];
         
@@ -58,6 +69,12 @@ export const BulkUploadModal = ({ isOpen, onClose, empresaNit, onSuccess }: Bulk
            continue;
         }
 
+        if (erroresServidor.has(item.rowNumber)) {
+           setLogs(prev => [...prev, { row: item.rowNumber, msg: erroresServidor.get(item.rowNumber)!, type: 'error' }]);
+           errorCount++;
+           continue;
+        }
+
         try {
           await createProducto(item.data);
           // setLogs(prev => [...prev, { row: item.rowNumber, msg: `"${item.data?.nombre}" creado`, type: 'success' }]);
@@ -5,6 +5,8 @@ export interface Empresa {
   nombre: string;
   direccion: string;
   telefono: string;
+  // Versión leída; al enviarla en una actualización, el API responde 409 si otro la modificó antes
+  version?: number;
 }
 
 export const getEmpresas = async (): Promise<Empresa[]> => {
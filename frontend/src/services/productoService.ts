@@ -7,6 +7,8 @@ export interface Producto {
   caracteristicas: string;
   empresa: string;
   precios: Record<string, number>;
+  // Versión leída; al enviarla en una actualización, el API responde 409 si otro la modificó antes
+  version?: number;
 }
 
 export const getProductos = async (nit?: string): Promise<Producto[]> => {
@@ -20,6 +22,23 @@ export const createProducto = async (data: Producto): Promise<Producto> => {
   return response.data;
 };
 
+export interface ErrorLote {
+  fila: number;
+  campo: string;
+  mensaje: string;
+}
+
+export interface ResultadoValidacionLote {
+  total: number;
+  validas: number;
+  errores: ErrorLote[];
+}
+
+export const validarLoteProductos = async (productos: Producto[]): Promise<ResultadoValidacionLote> => {
+  const response = await api.post<ResultadoValidacionLote>('productos/validar_lote/', productos);
+  return response.data;
+};
+
 export const generarDescripcionIA = async (nombre: string): Promise<string> => {
   const response = await api.post<{ descripcion: string }>('productos/generar_descripcion/', {
     nombre: nombre,